@@ -0,0 +1,19 @@
+from more_polars_utils.benchmarks.codecs import benchmark_codecs
+from more_polars_utils.benchmarks.suite import (
+    BENCHMARKS,
+    BenchmarkResult,
+    run_benchmarks,
+    save_baseline,
+    load_baseline,
+    compare_to_baseline,
+)
+
+__all__ = [
+    "BENCHMARKS",
+    "BenchmarkResult",
+    "run_benchmarks",
+    "save_baseline",
+    "load_baseline",
+    "compare_to_baseline",
+    "benchmark_codecs",
+]
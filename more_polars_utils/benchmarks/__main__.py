@@ -0,0 +1,44 @@
+import argparse
+import sys
+import tempfile
+
+import polars as pl
+
+from more_polars_utils.benchmarks.suite import (
+    BENCHMARKS, run_benchmarks, save_baseline, load_baseline, compare_to_baseline
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m more_polars_utils.benchmarks",
+        description="Benchmark more_polars_utils on synthetic orders",
+    )
+    parser.add_argument("--scale-factor", type=float, default=1.0, help="1,000,000 orders per unit")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--benchmark", action="append", choices=sorted(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--save", help="Write the results to this JSON baseline")
+    parser.add_argument("--compare", help="Compare the results to this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run_benchmarks(workdir, args.scale_factor, args.benchmark, args.repeat)
+
+    with pl.Config(tbl_rows=-1):
+        print(pl.DataFrame(results))
+
+        if args.save:
+            save_baseline(results, args.save, args.scale_factor)
+
+        if args.compare:
+            comparison = compare_to_baseline(results, load_baseline(args.compare), args.tolerance)
+            print(comparison)
+            if comparison["regression"].any():
+                return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
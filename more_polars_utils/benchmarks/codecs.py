@@ -0,0 +1,75 @@
+import os
+import tempfile
+from typing import List, Optional, Tuple, Union
+
+import polars as pl
+
+from more_polars_utils.benchmarks.suite import time_function
+from more_polars_utils.common.write_options import WriteOptions
+
+DEFAULT_CODECS: List[Tuple[str, Optional[int]]] = [
+    ("uncompressed", None),
+    ("snappy", None),
+    ("lz4", None),
+    ("zstd", 1),
+    ("zstd", 3),
+    ("zstd", 9),
+    ("gzip", 6),
+    ("brotli", 5),
+]
+
+
+def benchmark_codecs(
+        df: Union[pl.DataFrame, pl.LazyFrame],
+        codecs: Optional[List[Tuple[str, Optional[int]]]] = None,
+        sample_rows: int = 1_000_000,
+        options: Optional[WriteOptions] = None,
+        repeat: int = 3
+) -> pl.DataFrame:
+    """
+    Compare parquet codecs on a sample of a dataframe
+
+    The sample is the first `sample_rows` rows rather than a random sample, so that the
+    clustering of the data, which drives how well it compresses, is preserved.
+
+    :param df: The dataframe
+    :param codecs: Pairs of codec and level, defaults to `DEFAULT_CODECS`
+    :param sample_rows: The number of rows to write
+    :param options: Other write options, such as `sort_by` and `row_group_size`, applied to every codec
+    :param repeat: The number of timed writes and reads of each codec
+    :return: One row per codec with the file size, compression ratio and median write and read times, smallest first
+    """
+
+    options = options if options is not None else WriteOptions()
+    sample = options.prepare(df.head(sample_rows))
+    if isinstance(sample, pl.LazyFrame):
+        sample = sample.collect()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for compression, compression_level in codecs if codecs is not None else DEFAULT_CODECS:
+            path = os.path.join(directory, f"{compression}-{compression_level}.parquet")
+            kwargs = {**options.parquet_kwargs(), "compression": compression, "compression_level": compression_level}
+
+            write = time_function(compression, lambda: sample.write_parquet(path, **kwargs), repeat, warmup=0)
+            read = time_function(compression, lambda: pl.read_parquet(path), repeat)
+            rows.append({
+                "compression": compression,
+                "compression_level": compression_level,
+                "size_bytes": os.path.getsize(path),
+                "write_seconds": write.median_seconds,
+                "read_seconds": read.median_seconds,
+            })
+
+    uncompressed_size = sample.estimated_size()
+    return (
+        pl.DataFrame(rows, schema={
+            "compression": pl.Utf8,
+            "compression_level": pl.Int64,
+            "size_bytes": pl.Int64,
+            "write_seconds": pl.Float64,
+            "read_seconds": pl.Float64,
+        })
+        .with_columns((pl.lit(uncompressed_size) / pl.col("size_bytes")).alias("compression_ratio"))
+        .sort("size_bytes")
+    )
@@ -0,0 +1,241 @@
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+import polars as pl
+
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset, Project, ProjectConfiguration, ASSET_MANAGER
+from more_polars_utils.common.dataframe_ext import frequency_count, check_unique
+from more_polars_utils.common.io import read_parquet, write_parquet, read_ipc, write_ipc, parquet_file_size, remove
+from more_polars_utils.examples.synthetic import generate_orders, write_orders_dataset
+
+# A benchmark returns a function to time, after doing any setup it needs
+Benchmark = Callable[["BenchmarkContext"], Callable[[], Any]]
+
+ORDERS_ASSET_NAME = "benchmark_orders"
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    repeat: int
+    min_seconds: float
+    median_seconds: float
+    max_seconds: float
+
+
+class BenchmarkContext:
+    """
+    The synthetic data shared by all benchmarks of a run, generated once in `workdir`
+    """
+
+    def __init__(self, workdir: str, scale_factor: float):
+        self.workdir = workdir
+        self.scale_factor = scale_factor
+        self.orders = generate_orders(scale_factor)
+        self.parquet_path = f"{workdir}/orders.parquet"
+        self.orders.write_parquet(self.parquet_path)
+        self.dataset_path = write_orders_dataset(f"{workdir}/orders_dataset", scale_factor)
+        self.project = Project()
+        self.project.set_configuration(ProjectConfiguration(
+            project_name="benchmarks",
+            asset_path=f"{workdir}/assets",
+            scratch_path=f"{workdir}/scratch",
+        ))
+
+
+def _frequency_count(context: BenchmarkContext):
+    return lambda: frequency_count(context.orders, "customer_id")
+
+
+def _frequency_count_approximate(context: BenchmarkContext):
+    return lambda: frequency_count(context.orders, "customer_id", approximate=True, top_k=100)
+
+
+def _check_unique(context: BenchmarkContext):
+    return lambda: check_unique(context.orders, "order_id")
+
+
+def _read_parquet(context: BenchmarkContext):
+    return lambda: read_parquet(context.parquet_path)
+
+
+def _read_parquet_partitioned(context: BenchmarkContext):
+    return lambda: read_parquet(context.dataset_path)
+
+
+def _read_ipc(context: BenchmarkContext):
+    path = f"{context.workdir}/orders.arrow"
+    write_ipc(context.orders, path)
+    return lambda: read_ipc(path)
+
+
+def _write_parquet(context: BenchmarkContext):
+    return lambda: write_parquet(context.orders, f"{context.workdir}/write.parquet")
+
+
+def _write_parquet_partitioned(context: BenchmarkContext):
+    orders = context.orders.with_columns(pl.col("order_date").str.slice(0, 7).alias("order_month"))
+    return lambda: write_parquet(orders, f"{context.workdir}/write_partitioned", partition_by=["order_month"])
+
+
+def _parquet_file_size(context: BenchmarkContext):
+    return lambda: parquet_file_size(context.dataset_path)
+
+
+def _orders_asset(context: BenchmarkContext, force_reload: bool) -> PolarsParquetAsset:
+    return PolarsParquetAsset(
+        lambda: context.orders,
+        project=context.project,
+        asset_name=ORDERS_ASSET_NAME,
+        force_reload=force_reload,
+        use_memory_cache=False,
+    )
+
+
+def _asset_cache_miss(context: BenchmarkContext):
+    return _orders_asset(context, force_reload=True)
+
+
+def _asset_cache_hit(context: BenchmarkContext):
+    asset = _orders_asset(context, force_reload=False)
+    asset()
+    return asset
+
+
+def _import_time(context: BenchmarkContext):
+    # A fresh interpreter each time, since the package is already imported in this one
+    command = [sys.executable, "-c", "import more_polars_utils"]
+    return lambda: subprocess.run(command, check=True)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "frequency_count": _frequency_count,
+    "frequency_count_approximate": _frequency_count_approximate,
+    "check_unique": _check_unique,
+    "read_parquet": _read_parquet,
+    "read_parquet_partitioned": _read_parquet_partitioned,
+    "read_ipc": _read_ipc,
+    "write_parquet": _write_parquet,
+    "write_parquet_partitioned": _write_parquet_partitioned,
+    "parquet_file_size": _parquet_file_size,
+    "asset_cache_miss": _asset_cache_miss,
+    "asset_cache_hit": _asset_cache_hit,
+    "import_time": _import_time,
+}
+
+
+def time_function(name: str, func: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> BenchmarkResult:
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return BenchmarkResult(
+        name=name,
+        repeat=repeat,
+        min_seconds=min(timings),
+        median_seconds=statistics.median(timings),
+        max_seconds=max(timings),
+    )
+
+
+def run_benchmarks(
+        workdir: str,
+        scale_factor: float = 1.0,
+        names: Optional[List[str]] = None,
+        repeat: int = 5,
+        warmup: int = 1
+) -> List[BenchmarkResult]:
+    """
+    Run benchmarks against synthetic orders of the given scale factor
+
+    :param workdir: A local directory for the generated data and outputs
+    :param scale_factor: 1,000,000 orders per unit of scale factor
+    :param names: The benchmarks to run, defaults to all of `BENCHMARKS`
+    :param repeat: The number of timed runs of each benchmark
+    :param warmup: The number of untimed runs before timing
+    :return: One result per benchmark
+    """
+
+    context = BenchmarkContext(workdir, scale_factor)
+    # Assets register themselves globally, so restore whatever the benchmark asset replaced
+    registered = ASSET_MANAGER.assets.get(ORDERS_ASSET_NAME)
+    results = []
+    try:
+        for name in names if names is not None else list(BENCHMARKS):
+            results.append(time_function(name, BENCHMARKS[name](context), repeat, warmup))
+    finally:
+        if registered is None:
+            ASSET_MANAGER.unregister(ORDERS_ASSET_NAME)
+        else:
+            ASSET_MANAGER.register(ORDERS_ASSET_NAME, registered)
+        remove(f"{workdir}/assets")
+    return results
+
+
+def _package_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("more-polars-utils")
+    except Exception:
+        return "unknown"
+
+
+def save_baseline(results: List[BenchmarkResult], path: str, scale_factor: float):
+    baseline = {
+        "version": _package_version(),
+        "polars_version": pl.__version__,
+        "python_version": platform.python_version(),
+        "machine": platform.machine(),
+        "scale_factor": scale_factor,
+        "results": {result.name: asdict(result) for result in results},
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+
+
+def load_baseline(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_to_baseline(results: List[BenchmarkResult], baseline: dict, tolerance: float = 0.2) -> pl.DataFrame:
+    """
+    Compare median timings to a saved baseline
+
+    :param results: The results of the current run
+    :param baseline: A baseline loaded with `load_baseline`
+    :param tolerance: The relative slowdown flagged as a regression
+    :return: One row per benchmark with the baseline and current medians, their ratio, and a `regression` flag
+    """
+
+    rows = []
+    for result in results:
+        previous = baseline["results"].get(result.name)
+        baseline_seconds = previous["median_seconds"] if previous is not None else None
+        ratio = result.median_seconds / baseline_seconds if baseline_seconds else None
+        rows.append({
+            "name": result.name,
+            "baseline_seconds": baseline_seconds,
+            "median_seconds": result.median_seconds,
+            "ratio": ratio,
+            "regression": ratio is not None and ratio > 1 + tolerance,
+        })
+
+    return pl.DataFrame(rows, schema={
+        "name": pl.Utf8,
+        "baseline_seconds": pl.Float64,
+        "median_seconds": pl.Float64,
+        "ratio": pl.Float64,
+        "regression": pl.Boolean,
+    })
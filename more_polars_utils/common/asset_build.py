@@ -0,0 +1,143 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Callable, Any
+
+
+@dataclass
+class BuildReport:
+    durations: Dict[str, float] = field(default_factory=dict)
+    order: List[str] = field(default_factory=list)
+    critical_path: List[str] = field(default_factory=list)
+    critical_path_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    def __str__(self) -> str:
+        path = " -> ".join(self.critical_path)
+        return (
+            f"Built {len(self.order)} assets in {self.wall_seconds:.2f}s, "
+            f"critical path {self.critical_path_seconds:.2f}s: {path}"
+        )
+
+
+def topological_order(graph: Dict[str, List[str]]) -> List[str]:
+    """
+    Order the nodes of a dependency graph so that every node comes after its dependencies
+
+    :param graph: Mapping of node to the nodes it depends on
+    :return: The nodes in dependency order
+    """
+
+    order: List[str] = []
+    state: Dict[str, str] = {}
+
+    def visit(node: str, stack: List[str]):
+        if state.get(node) == "done":
+            return
+        if state.get(node) == "visiting":
+            cycle = " -> ".join(stack[stack.index(node):] + [node])
+            raise ValueError(f"Dependency cycle detected: {cycle}")
+
+        state[node] = "visiting"
+        for dependency in graph[node]:
+            visit(dependency, stack + [node])
+        state[node] = "done"
+        order.append(node)
+
+    for node in graph:
+        visit(node, [])
+
+    return order
+
+
+def critical_path(graph: Dict[str, List[str]], durations: Dict[str, float]) -> List[str]:
+    """
+    Find the chain of dependent nodes with the longest total duration
+
+    :param graph: Mapping of node to the nodes it depends on
+    :param durations: The duration of each node
+    :return: The nodes on the critical path, in dependency order
+    """
+
+    finish: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+    for node in topological_order(graph):
+        slowest = max(graph[node], key=lambda dependency: finish[dependency], default=None)
+        previous[node] = slowest
+        finish[node] = durations.get(node, 0.0) + (finish[slowest] if slowest is not None else 0.0)
+
+    if not finish:
+        return []
+
+    step: Optional[str] = max(finish, key=lambda n: finish[n])
+    path = []
+    while step is not None:
+        path.append(step)
+        step = previous[step]
+    return path[::-1]
+
+
+def run_graph(
+        graph: Dict[str, List[str]],
+        run: Callable[[str], Any],
+        max_workers: int = 4,
+        costs: Optional[Dict[str, int]] = None,
+        budget: Optional[int] = None) -> BuildReport:
+    """
+    Run every node of a dependency graph on a thread pool, starting each node once its dependencies finish
+
+    :param graph: Mapping of node to the nodes it depends on
+    :param run: Called with each node name
+    :param max_workers: The maximum number of nodes to run concurrently
+    :param costs: Estimated memory cost of each node, in bytes
+    :param budget: The maximum total cost of the nodes running at once, a node exceeding the budget runs alone
+    :return: A report with the duration of each node and the critical path
+    """
+
+    costs = costs if costs is not None else {}
+    order = topological_order(graph)
+    remaining = {node: set(graph[node]) for node in order}
+    report = BuildReport()
+    running: Dict[Future, str] = {}
+    started: Dict[str, float] = {}
+    running_cost = 0
+    build_start = time.perf_counter()
+
+    def fits(node: str) -> bool:
+        if budget is None or not running:
+            return True
+        return running_cost + costs.get(node, 0) <= budget
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while remaining or running:
+            ready = [node for node in order if node in remaining and not remaining[node]]
+            for node in ready:
+                if len(running) >= max_workers:
+                    break
+                if not fits(node):
+                    continue
+                del remaining[node]
+                running_cost += costs.get(node, 0)
+                started[node] = time.perf_counter()
+                running[executor.submit(run, node)] = node
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                running_cost -= costs.get(node, 0)
+                report.durations[node] = time.perf_counter() - started[node]
+
+                error = future.exception()
+                if error is not None:
+                    # Let the nodes already running finish, but start nothing new
+                    wait(running)
+                    raise error
+
+                report.order.append(node)
+                for dependencies in remaining.values():
+                    dependencies.discard(node)
+
+    report.wall_seconds = time.perf_counter() - build_start
+    report.critical_path = critical_path(graph, report.durations)
+    report.critical_path_seconds = sum(report.durations[node] for node in report.critical_path)
+    return report
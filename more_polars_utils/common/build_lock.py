@@ -0,0 +1,187 @@
+import json
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from more_polars_utils.common.io import file_exists, invalidate_metadata, list_nested_partitions, \
+    make_directories, read_text, write_text, remove, remove_empty_directory
+
+# How long a lease is valid without being renewed, and how often the holder renews it
+LEASE_SECONDS = 60.0
+RENEW_SECONDS = 20.0
+
+# How often a waiting process checks whether the lease was released
+POLL_SECONDS = 1.0
+
+
+class BuildLock:
+    """
+    A lease on building an asset, shared by every thread and process using the same storage
+
+    Each contender writes a lease file of its own into the directory `path`, then lists the
+    directory. It holds the lease if no other live lease is listed, and otherwise removes its own
+    and tries again later. Listings are consistent with completed writes on local filesystems and
+    on S3, so two contenders may both back off but never both hold the lease, and no conditional
+    writes are needed.
+
+    The holder marks its lease with the time it acquired it, and renews it while it builds. A lease
+    that has not been renewed for `lease_seconds` belongs to a crashed or stalled process, and is
+    removed by the next contender. Every lease has its own key, so removing a stale lease never
+    removes another contender's. A holder gives up only when its lease was removed, or when another
+    lease was acquired after its own, which happens only if it was taken over while stalled. The
+    leases of contenders that are only checking are not acquired, and never make it give up. On
+    giving up it sets `lost`. Its build still completes, and since writes are staged, the only cost
+    is the duplicated work.
+
+    Contenders remove each other's stale leases and the directory itself, so a lease or the directory
+    may vanish at any point. Either is then treated as absent, and the contender tries again.
+
+        with BuildLock(f"{asset.data_path()}.lock"):
+            ...
+
+    :param path: The lease directory
+    :param lease_seconds: How long the lease is valid without renewal
+    :param poll_seconds: How often to check whether the lease was released
+    """
+
+    def __init__(self, path: str, lease_seconds: Optional[float] = None, poll_seconds: Optional[float] = None):
+        self.path = path
+        self.lease_seconds = lease_seconds if lease_seconds is not None else LEASE_SECONDS
+        self.poll_seconds = poll_seconds if poll_seconds is not None else POLL_SECONDS
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex}"
+        self.lease_path = f"{path}/{self.owner}.json"
+        self.waited_seconds = 0.0
+        self.acquired_at: Optional[datetime] = None
+        self.lost = False
+        self._stop_renewing = threading.Event()
+        self._renewer: Optional[threading.Thread] = None
+        # When each unreadable lease was first seen, their age is measured from then
+        self._unreadable_since: Dict[str, float] = {}
+
+    def _write_lease(self):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+        lease = {
+            "owner": self.owner,
+            "expires_at": expires_at.isoformat(),
+            "acquired_at": self.acquired_at.isoformat() if self.acquired_at is not None else None,
+        }
+        write_text(json.dumps(lease), self.lease_path)
+
+    def _read_lease(self, lease_path: str) -> Optional[dict]:
+        # The lease, or None if it expired or was removed
+        try:
+            lease = json.loads(read_text(lease_path))
+            expires_at = datetime.fromisoformat(lease["expires_at"])
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, KeyError, ValueError):
+            # The contender has not finished writing its lease yet, or left it unreadable
+            first_seen = self._unreadable_since.setdefault(lease_path, time.monotonic())
+            if time.monotonic() - first_seen > self.lease_seconds:
+                return None
+            return {"acquired_at": None}
+
+        self._unreadable_since.pop(lease_path, None)
+        return lease if datetime.now(timezone.utc) <= expires_at else None
+
+    def _other_live_leases(self) -> List[dict]:
+        # Stale leases of other contenders are removed along the way
+        invalidate_metadata(self.path)
+        live = []
+        for lease_path in list_nested_partitions(self.path, "json"):
+            if lease_path == self.lease_path:
+                continue
+            lease = self._read_lease(lease_path)
+            if lease is not None:
+                live.append(lease)
+            else:
+                self._remove_lease(lease_path)
+        return live
+
+    def _remove_lease(self, lease_path: str):
+        self._unreadable_since.pop(lease_path, None)
+        try:
+            remove(lease_path)
+        except FileNotFoundError:
+            # Already removed by another contender
+            pass
+
+    def try_acquire(self) -> bool:
+        self.acquired_at = None
+        try:
+            make_directories(self.path, exist_ok=True)
+            self._write_lease()
+        except (FileExistsError, FileNotFoundError):
+            # The directory was removed by a holder releasing the lease while being created or
+            # written to, try again later
+            return False
+
+        if self._other_live_leases():
+            self._remove_lease(self.lease_path)
+            return False
+
+        self.acquired_at = datetime.now(timezone.utc)
+        self._write_lease()
+        self.lost = False
+        return True
+
+    def _taken_over(self) -> bool:
+        # Whether another lease was acquired after this one, which only happens once this one expired
+        assert (self.acquired_at is not None)
+        for lease in self._other_live_leases():
+            acquired_at = lease.get("acquired_at")
+            if acquired_at is not None and datetime.fromisoformat(acquired_at) > self.acquired_at:
+                return True
+        return False
+
+    def acquire(self):
+        start = time.perf_counter()
+        while not self.try_acquire():
+            # Jitter, so that contenders that backed off together do not collide again
+            time.sleep(self.poll_seconds * random.uniform(0.5, 1.5))
+        self.waited_seconds = time.perf_counter() - start
+
+        self._stop_renewing.clear()
+        self._renewer = threading.Thread(target=self._renew, daemon=True)
+        self._renewer.start()
+
+    def _renew(self):
+        interval = min(RENEW_SECONDS, self.lease_seconds / 3)
+        while not self._stop_renewing.wait(interval):
+            invalidate_metadata(self.lease_path)
+            if not file_exists(self.lease_path):
+                # The lease expired while this process was stalled, and was removed by a contender
+                self.lost = True
+                return
+            try:
+                self._write_lease()
+            except FileNotFoundError:
+                # The lease directory was removed by a later holder releasing it
+                self.lost = True
+                return
+            if self._taken_over():
+                # The lease was removed and taken over between the check and the renewal
+                self._remove_lease(self.lease_path)
+                self.lost = True
+                return
+
+    def release(self):
+        self._stop_renewing.set()
+        if self._renewer is not None:
+            self._renewer.join()
+            self._renewer = None
+
+        self._remove_lease(self.lease_path)
+        remove_empty_directory(self.path)
+
+    def __enter__(self) -> "BuildLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
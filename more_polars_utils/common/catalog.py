@@ -0,0 +1,216 @@
+import json
+from dataclasses import dataclass, asdict, field
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import polars as pl
+
+from more_polars_utils.common.io import file_exists, file_sizes, make_directories, read_text, write_text, \
+    staged_write
+
+if TYPE_CHECKING:
+    from more_polars_utils.common.dataframe_assets import PolarsParquetAsset
+
+
+@dataclass
+class CatalogEntry:
+    """
+    Metadata of a written asset, recorded so that it can be planned without opening the data files
+
+    Each item of `files` has the file `path` relative to the asset path, its `size_bytes`,
+    `num_rows`, hive `partition` values, and `row_groups` with per-column min, max and null counts.
+    """
+
+    asset_name: str
+    path: str
+    storage_format: str
+    fingerprint: Optional[str]
+    written_at: str
+    schema: Dict[str, str]
+    num_rows: int
+    size_bytes: int
+    files: List[dict] = field(default_factory=list)
+
+    @property
+    def file_count(self) -> int:
+        return len(self.files)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, entry: dict) -> "CatalogEntry":
+        return cls(**entry)
+
+    def row_groups(self) -> pl.DataFrame:
+        """
+        One row per column of every row group, with its statistics as strings
+        """
+
+        rows = [
+            {
+                "file": file["path"],
+                "row_group": index,
+                "num_rows": row_group["num_rows"],
+                "size_bytes": row_group["size_bytes"],
+                "column": column,
+                "min": None if statistics["min"] is None else str(statistics["min"]),
+                "max": None if statistics["max"] is None else str(statistics["max"]),
+                "null_count": statistics["null_count"],
+            }
+            for file in self.files
+            for index, row_group in enumerate(file["row_groups"])
+            for column, statistics in row_group["columns"].items()
+        ]
+        return pl.DataFrame(rows, schema={
+            "file": pl.Utf8,
+            "row_group": pl.Int64,
+            "num_rows": pl.Int64,
+            "size_bytes": pl.Int64,
+            "column": pl.Utf8,
+            "min": pl.Utf8,
+            "max": pl.Utf8,
+            "null_count": pl.Int64,
+        })
+
+    def prune(self, column: str, min_value: Any = None, max_value: Any = None) -> List[str]:
+        """
+        The data files that may hold rows where `column` is between `min_value` and `max_value`
+
+        Files are pruned by their hive partition value for `column`, or otherwise by the min/max
+        statistics of their row groups. Files without statistics for `column` are always kept.
+
+        :param column: The column to filter on
+        :param min_value: The inclusive lower bound, or None for no lower bound
+        :param max_value: The inclusive upper bound, or None for no upper bound
+        :return: The full paths of the matching files
+        """
+
+        bounds = (_comparable(min_value), _comparable(max_value))
+        matching = []
+        for file in self.files:
+            if column in file["partition"]:
+                value = _partition_value(file["partition"][column], bounds)
+                keep = _overlaps(value, value, *bounds)
+            elif file["row_groups"]:
+                keep = any(
+                    column not in row_group["columns"]
+                    or _overlaps(row_group["columns"][column]["min"], row_group["columns"][column]["max"], *bounds)
+                    for row_group in file["row_groups"]
+                )
+            else:
+                keep = True
+
+            if keep:
+                matching.append(f"{self.path}/{file['path']}" if file["path"] else self.path)
+        return matching
+
+
+def _comparable(value: Any) -> Any:
+    # Date statistics are recorded as ISO strings
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def _partition_value(value: str, bounds: tuple) -> Any:
+    bound = next((bound for bound in bounds if bound is not None), None)
+    if isinstance(bound, (int, float)) and not isinstance(bound, bool):
+        try:
+            return type(bound)(value)
+        except ValueError:
+            return None
+    return value
+
+
+def _overlaps(low: Any, high: Any, min_value: Any, max_value: Any) -> bool:
+    if low is None or high is None:
+        return True
+    try:
+        return (max_value is None or low <= max_value) and (min_value is None or high >= min_value)
+    except TypeError:
+        return True
+
+
+def _partition(relative_path: str) -> Dict[str, str]:
+    return dict(
+        segment.split("=", 1)
+        for segment in relative_path.split("/")[:-1]
+        if "=" in segment
+    )
+
+
+def catalog_directory(asset: "PolarsParquetAsset") -> str:
+    return f"{asset.storage_path()}/_catalog"
+
+
+def catalog_path(asset: "PolarsParquetAsset") -> str:
+    return f"{catalog_directory(asset)}/{asset.catalog_name()}.json"
+
+
+def describe_asset(asset: "PolarsParquetAsset", fingerprint: Optional[str], path: Optional[str] = None) -> CatalogEntry:
+    """
+    Build the catalog entry of an asset from its file listing and footers
+
+    :param path: The data to describe, by default the data the asset's manifest points to
+    """
+
+    path = path if path is not None else asset.committed_path()
+    storage_format = asset.storage_format
+    prefix_length = len(path.rstrip("/")) + 1
+
+    files = []
+    for file_path, size_bytes in sorted(file_sizes(path, storage_format.extension).items()):
+        relative_path = file_path[prefix_length:] if file_path != path else ""
+        files.append({
+            "path": relative_path,
+            "size_bytes": size_bytes,
+            "partition": _partition(relative_path),
+            **storage_format.describe_file(file_path),
+        })
+
+    return CatalogEntry(
+        asset_name=asset.asset_name,
+        path=path,
+        storage_format=storage_format.name,
+        fingerprint=fingerprint,
+        written_at=datetime.now(timezone.utc).isoformat(),
+        schema={name: str(dtype) for name, dtype in storage_format.scan(path).schema.items()},
+        num_rows=sum(file["num_rows"] for file in files),
+        size_bytes=sum(file["size_bytes"] for file in files),
+        files=files,
+    )
+
+
+def write_catalog_entry(asset: "PolarsParquetAsset", fingerprint: Optional[str], path: Optional[str] = None) -> CatalogEntry:
+    entry = describe_asset(asset, fingerprint, path)
+    make_directories(catalog_directory(asset), exist_ok=True)
+    with staged_write(catalog_path(asset)) as staging_path:
+        write_text(json.dumps(entry.to_dict(), default=str), staging_path)
+    return entry
+
+
+def read_catalog_file(path: str) -> Optional[CatalogEntry]:
+    if not file_exists(path):
+        return None
+    try:
+        return CatalogEntry.from_dict(json.loads(read_text(path)))
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def read_catalog_entry(asset: "PolarsParquetAsset") -> Optional[CatalogEntry]:
+    return read_catalog_file(catalog_path(asset))
+
+
+def read_catalog_directory(storage_path: str) -> Dict[str, CatalogEntry]:
+    """
+    Every readable catalog entry of the assets stored in `storage_path`
+
+    :return: Mapping of catalog file path to entry
+    """
+
+    directory = f"{storage_path}/_catalog"
+    if not file_exists(directory):
+        return {}
+
+    entries = {path: read_catalog_file(path) for path in file_sizes(directory, "json")}
+    return {path: entry for path, entry in entries.items() if entry is not None}
@@ -1,21 +1,177 @@
+import copy
 import functools
+import inspect
+import json
+import time
+import uuid
 from dataclasses import dataclass
 from datetime import datetime
-from time import sleep
-from typing import Optional, Callable, List, Union
+from typing import Any, Dict, Optional, Callable, List, Tuple, Union
 
 import polars as pl
 
-from more_polars_utils.common.io import write_parquet, read_parquet, file_exists, make_directories, file_last_modified
+from more_polars_utils.common.asset_build import BuildReport, run_graph
+from more_polars_utils.common.build_lock import BuildLock
+from more_polars_utils.common.catalog import CatalogEntry, catalog_path, read_catalog_entry, write_catalog_entry
+from more_polars_utils.common.deferred import Deferred, as_deferred
+from more_polars_utils.common.instrumentation import AssetInstrumentation, AssetCallRecord
+from more_polars_utils.common.fingerprint import code_fingerprint, argument_fingerprint, frame_fingerprint
+from more_polars_utils.common.memory_cache import MEMORY_CACHE
+from more_polars_utils.common.process_pool import PROCESS_POOL, exchange_directory
+from more_polars_utils.common.scratch_cache import SCRATCH_CACHE
+from more_polars_utils.common.io import file_exists, make_directories, file_last_modified, read_text, write_text, \
+    prefetch_metadata, invalidate_metadata, staged_write, file_sizes, remove, is_directory, list_nested_partitions
+from more_polars_utils.common.io.partitions import hive_value
+from more_polars_utils.common.storage_formats import StorageFormat, get_storage_format
+from more_polars_utils.common.write_options import WriteOptions
 
 
 class AssetManager:
     def __init__(self):
         self.assets = dict()
+        self.instrumentation = AssetInstrumentation()
 
     def register(self, key, asset):
         self.assets[key] = asset
 
+    def unregister(self, key):
+        self.assets.pop(key, None)
+
+    def metrics(self) -> pl.DataFrame:
+        """
+        Instrumentation records of every asset call in this process, one row per call
+        """
+
+        return self.instrumentation.to_frame()
+
+    def catalog(self) -> pl.DataFrame:
+        """
+        Catalog entries of the registered assets that are built and up to date, without reading their data
+
+        :return: One row per asset, with its storage format, row count, file count and size
+        """
+
+        entries = [asset.catalog_entry() for asset in self.assets.values()]
+        return pl.DataFrame(
+            [
+                {
+                    "asset_name": entry.asset_name,
+                    "path": entry.path,
+                    "storage_format": entry.storage_format,
+                    "num_rows": entry.num_rows,
+                    "file_count": entry.file_count,
+                    "size_bytes": entry.size_bytes,
+                    "written_at": entry.written_at,
+                }
+                for entry in entries
+                if entry is not None
+            ],
+            schema={
+                "asset_name": pl.Utf8,
+                "path": pl.Utf8,
+                "storage_format": pl.Utf8,
+                "num_rows": pl.Int64,
+                "file_count": pl.Int64,
+                "size_bytes": pl.Int64,
+                "written_at": pl.Utf8,
+            },
+        )
+
+    def _registered_scratch_paths(self, scratch_path: str) -> List[str]:
+        # The data paths of registered temporary assets, and the directories of their variants
+        return [
+            path
+            for asset in self.assets.values()
+            if asset.is_temporary and asset.project._scratch_path == scratch_path
+            for path in (asset.data_path(), asset.variants_path())
+        ]
+
+    def scratch_usage(self, project: Optional["Project"] = None) -> pl.DataFrame:
+        """
+        The temporary assets in the scratch path of a project, least recently used first
+
+        :param project: The project, defaults to the active project
+        :return: One row per asset with its size, last access time and whether it is registered
+        """
+
+        scratch_path = (project or ACTIVE_PROJECT).scratch_path
+        return SCRATCH_CACHE.usage(scratch_path, self._registered_scratch_paths(scratch_path))
+
+    def collect_garbage(self, project: Optional["Project"] = None, max_bytes: Optional[int] = None) -> List[str]:
+        """
+        Remove the temporary assets of unregistered assets from a scratch path, then evict the least
+        recently used ones until it fits in the budget
+
+        Only assets registered in this process count as registered, so import every module
+        defining temporary assets of the project before collecting.
+
+        :param project: The project, defaults to the active project
+        :param max_bytes: The budget, defaults to `SCRATCH_CACHE.max_bytes`, skipped when neither is set
+        :return: The data paths of the removed assets
+        """
+
+        scratch_path = (project or ACTIVE_PROJECT).scratch_path
+        removed = SCRATCH_CACHE.remove_unregistered(scratch_path, self._registered_scratch_paths(scratch_path))
+        if max_bytes is not None or SCRATCH_CACHE.enabled:
+            removed += SCRATCH_CACHE.evict(scratch_path, max_bytes)
+        return removed
+
+    def _dependency_graph(self, targets: List[str]) -> dict:
+        graph: dict = {}
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name in graph:
+                continue
+            graph[name] = [dependency.asset_name for dependency in self.assets[name].resolved_dependencies()]
+            pending.extend(graph[name])
+        return graph
+
+    def build(
+            self,
+            targets: Optional[List[Union[str, "PolarsParquetAsset"]]] = None,
+            max_workers: int = 4,
+            memory_budget: Optional[int] = None,
+            verbose: bool = False) -> BuildReport:
+        """
+        Build the targets and all of their dependencies, running independent assets concurrently
+
+        Assets are called without arguments, so every asset in the graph must be buildable on its own.
+
+        :param targets: The assets to build, defaults to every registered asset
+        :param max_workers: The maximum number of assets to build concurrently
+        :param memory_budget: The maximum total size in bytes of the assets building at once,
+            estimated from their cached parquet. Bounds concurrent work so that Polars' own
+            thread pool is not oversubscribed by many large builds.
+        :param verbose: Print the build report, including the critical path
+        :return: The build report
+        """
+
+        if targets is None:
+            target_names = list(self.assets)
+        else:
+            target_names = [target if isinstance(target, str) else target.asset_name for target in targets]
+
+        graph = self._dependency_graph(target_names)
+
+        # Resolve the freshness checks of the whole graph with one listing per storage prefix
+        for storage_path in {self.assets[name].storage_path() for name in graph}:
+            prefetch_metadata(storage_path)
+
+        costs = {name: self.assets[name].cache_size() or 0 for name in graph} if memory_budget is not None else None
+
+        report = run_graph(
+            graph,
+            lambda name: self.assets[name].refresh(),
+            max_workers=max_workers,
+            costs=costs,
+            budget=memory_budget,
+        )
+
+        if verbose:
+            print(report)
+        return report
+
 
 ASSET_MANAGER = AssetManager()
 
@@ -75,6 +231,20 @@ class Project:
 ACTIVE_PROJECT = Project()
 
 
+def _estimated_size(*values) -> int:
+    return sum(
+        int(value.estimated_size())
+        for value in values
+        if isinstance(value, pl.DataFrame)
+    )
+
+
+def _partition_fingerprints(df: pl.DataFrame, column: str) -> Dict[str, str]:
+    # Keyed by the hive directory value of each partition, as written by `write_parquet`
+    groups = df.partition_by([column], as_dict=True)
+    return {hive_value(key[0] if isinstance(key, tuple) else key): frame_fingerprint(group) for key, group in groups.items()}
+
+
 class PolarsParquetAsset:
 
     def __init__(
@@ -86,7 +256,15 @@ class PolarsParquetAsset:
             asset_name: str = None,
             verbose=False,
             is_temporary: bool = False,
-            force_reload: bool = False):
+            force_reload: bool = False,
+            lazy: bool = False,
+            use_memory_cache: bool = True,
+            partition_by: Optional[List[str]] = None,
+            storage_format: Union[str, StorageFormat] = "parquet",
+            write_options: Optional[WriteOptions] = None,
+            use_process_pool: bool = False,
+            single_flight: bool = True,
+            max_variants: int = 1):
         self.func = func
         self.asset_name = asset_name
         self.verbose = verbose
@@ -94,6 +272,19 @@ class PolarsParquetAsset:
         self.dependency_assets = dependency_assets if dependency_assets is not None else []
         self.force_reload = force_reload
         self.is_temporary = is_temporary
+        self.lazy = lazy
+        self.use_memory_cache = use_memory_cache
+        self.partition_by = partition_by
+        self.storage_format = get_storage_format(storage_format)
+        self.write_options = write_options
+        self.use_process_pool = use_process_pool
+        self.single_flight = single_flight
+        self.max_variants = max_variants
+        # Set on the copies returned by `variant`, None for the asset itself
+        self.variant_key: Optional[str] = None
+
+        if partition_by and not self.storage_format.supports_partitioning:
+            raise ValueError(f"The {self.storage_format.name} storage format does not support partition_by")
 
         # By default, use the function name as the asset name
         if asset_name is None:
@@ -106,6 +297,10 @@ class PolarsParquetAsset:
 
         self._register()
 
+    def __repr__(self) -> str:
+        # Stable across processes, since assets can be the default values of materialize parameters
+        return f"{type(self).__name__}({self.asset_name!r})"
+
     def _register(self):
         ASSET_MANAGER.register(self.asset_name, self)
 
@@ -113,50 +308,464 @@ class PolarsParquetAsset:
         if self.verbose:
             print(message)
 
-    def parquet_path(self):
-        if self.is_temporary:
-            return f"{self.project.scratch_path}/{self.asset_name}.parquet"
-        else:
-            asset_path = self.project.asset_path
-            path = f"{asset_path}/{self.asset_name}.parquet"
-            return path
+    def storage_path(self) -> str:
+        return self.project.scratch_path if self.is_temporary else self.project.asset_path
+
+    def data_path(self) -> str:
+        if self.variant_key is not None:
+            return f"{self.variants_path()}/{self.variant_key}.{self.storage_format.extension}"
+        return f"{self.storage_path()}/{self.asset_name}.{self.storage_format.extension}"
+
+    def variants_path(self) -> str:
+        return f"{self.storage_path()}/{self.asset_name}.variants"
+
+    def catalog_name(self) -> str:
+        return self.asset_name if self.variant_key is None else f"{self.asset_name}.{self.variant_key}"
+
+    def parquet_path(self) -> str:
+        # Kept for compatibility, the data is only parquet with the default storage format
+        return self.data_path()
+
+    def manifest_path(self):
+        return f"{self.data_path()}.manifest.json"
+
+    def committed_path(self, manifest: Optional[dict] = None) -> str:
+        """
+        The path of the data the manifest points to
 
-    def materialize(self, *args, **kwargs) -> pl.DataFrame:
+        Partitioned assets write each build to a new version directory under the data path, and the
+        manifest names the version once it is complete, so readers never see a mix of two builds.
+
+        :param manifest: The manifest already read, if any, saving the request to read it again
+        :return: The version directory of a partitioned asset, otherwise the data path
+        """
+
+        if manifest is None:
+            manifest = self._read_manifest()
+        version = manifest.get("version") if manifest is not None else None
+        return f"{self.data_path()}/{version}" if version else self.data_path()
+
+    def build_lock(self) -> BuildLock:
+        """
+        The lease that makes concurrent builds of this asset, in any process, run one at a time
+        """
+
+        return BuildLock(f"{self.data_path()}.lock")
+
+    def materialize(self, *args, **kwargs) -> Union[pl.DataFrame, pl.LazyFrame]:
         assert (self.func is not None)
         return self.func(*args, **kwargs)
 
-    def _load_from_cache(self) -> pl.DataFrame:
-        return read_parquet(self.parquet_path())
+    def _materialize_in_process(self, *args, **kwargs) -> pl.DataFrame:
+        # Assets without a function are subclasses overriding `materialize`, and are pickled whole
+        target = self.func if self.func is not None else self
+        return PROCESS_POOL.run(target, args, kwargs, exchange_directory(self.project.scratch_path, self.asset_name))
+
+    def _memory_cache_enabled(self) -> bool:
+        return self.use_memory_cache and MEMORY_CACHE.enabled
+
+    def _read_from_storage(self, record: Optional[AssetCallRecord], manifest: Optional[dict] = None) -> pl.DataFrame:
+        start = time.perf_counter()
+        df = self.storage_format.read(self.committed_path(manifest))
+        if record is not None:
+            record.read_seconds += time.perf_counter() - start
+            size_bytes = manifest.get("size_bytes") if manifest is not None else None
+            record.bytes_read += size_bytes if size_bytes is not None else self.cache_size() or 0
+        return df
+
+    def _load_from_cache(self, record: Optional[AssetCallRecord] = None, manifest: Optional[dict] = None) -> pl.DataFrame:
+        # `manifest` is the manifest already read by the refresh, if any, saving the requests to read it again
+        if not self._memory_cache_enabled():
+            df = self._read_from_storage(record, manifest)
+        else:
+            key = (self.data_path(), manifest["output"] if manifest is not None else self.fingerprint())
+            cached_df = MEMORY_CACHE.get(key)
+            if cached_df is None:
+                df = self._read_from_storage(record, manifest)
+                MEMORY_CACHE.put(key, df)
+            else:
+                df = cached_df
+
+        if record is not None:
+            record.rows = df.height
+            record.observe_memory(int(df.estimated_size()))
+        return df
+
+    def _scan_from_cache(self) -> pl.LazyFrame:
+        return self.storage_format.scan(self.committed_path())
+
+    def _write_to_cache(self, df: Union[pl.DataFrame, pl.LazyFrame], inputs: dict) -> dict:
+        if self.partition_by:
+            return self._write_version(df, inputs)
+
+        # Write to a staging path and publish it once complete, so a failed write leaves the previous data
+        with staged_write(self.data_path()) as staging_path:
+            self.storage_format.write(df, staging_path, options=self.write_options)
+
+            # The manifest marks the cache as incomplete until the new data is published
+            self._write_manifest(inputs, None)
+
+        # The written data is fingerprinted by content, or by a build id when it was streamed to storage
+        output_fingerprint = frame_fingerprint(df) if isinstance(df, pl.DataFrame) else f"build-{uuid.uuid4().hex}"
+        entry = write_catalog_entry(self, output_fingerprint)
+        return self._write_manifest(inputs, output_fingerprint, size_bytes=entry.size_bytes)
+
+    def _write_version(self, df: Union[pl.DataFrame, pl.LazyFrame], inputs: dict) -> dict:
+        # Partitioned data is many files, which cannot be published at once, so each build is written
+        # to a new version directory and committed by the manifest naming it
+        if isinstance(df, pl.LazyFrame):
+            # Partitioned writes collect the frame anyway, collecting it here lets its content be fingerprinted
+            df = df.collect(streaming=True)
+
+        previous = self._read_manifest()
+        if file_exists(self.data_path()) and not is_directory(self.data_path()):
+            # Written as a single file before the asset was partitioned
+            remove(self.data_path())
+
+        version = f"_version-{uuid.uuid4().hex}"
+        version_path = f"{self.data_path()}/{version}"
+        try:
+            self.storage_format.write(df, version_path, partition_by=self.partition_by, options=self.write_options)
+            output_fingerprint = frame_fingerprint(df)
+            entry = write_catalog_entry(self, output_fingerprint, version_path)
+        except BaseException:
+            remove(version_path)
+            raise
+
+        manifest = self._write_manifest(
+            inputs,
+            output_fingerprint,
+            size_bytes=entry.size_bytes,
+            version=version,
+            partition_fingerprints={column: _partition_fingerprints(df, column) for column in self.partition_by or []},
+        )
+
+        # Readers that resolved the previous version may still be reading it, so it is kept until the next build
+        keep = {version, previous.get("version") if previous is not None else None}
+        self._remove_versions(keep)
+        return manifest
+
+    def _remove_versions(self, keep: set):
+        # Removes versions other than `keep`, and data written before versions were used
+        root = self.data_path()
+        files = list_nested_partitions(root, self.storage_format.extension)
+        children = {file_path[len(root) + 1:].split("/")[0] for file_path in files}
+        for child in children - keep:
+            remove(f"{root}/{child}")
+
+    def _read_manifest(self) -> Optional[dict]:
+        if not file_exists(self.manifest_path()):
+            return None
+        try:
+            return json.loads(read_text(self.manifest_path()))
+        except json.JSONDecodeError:
+            return {"inputs": {}, "output": None}
+
+    def _write_manifest(self, inputs: dict, output_fingerprint: Optional[str], **fields) -> dict:
+        manifest = {
+            "asset_name": self.asset_name,
+            "inputs": inputs,
+            "output": output_fingerprint,
+            **fields,
+        }
+        with staged_write(self.manifest_path()) as staging_path:
+            write_text(json.dumps(manifest, indent=2, sort_keys=True), staging_path)
+        return manifest
+
+    def _deferred_defaults(self) -> Dict[str, Deferred]:
+        # Parameters of materialize whose default value is an asset or a `Deferred`
+        try:
+            signature = inspect.signature(self.func if self.func is not None else self.materialize)
+        except (TypeError, ValueError):
+            return {}
+
+        defaults = {}
+        for name, parameter in signature.parameters.items():
+            deferred = as_deferred(parameter.default)
+            if deferred is not None and parameter.kind in (parameter.POSITIONAL_OR_KEYWORD, parameter.KEYWORD_ONLY):
+                defaults[name] = deferred
+        return defaults
+
+    def resolved_dependencies(self) -> List["PolarsParquetAsset"]:
+        dependencies = [
+            ASSET_MANAGER.assets[dependency] if isinstance(dependency, str) else dependency
+            for dependency in self.dependency_assets
+        ]
+        dependencies += [deferred.asset for deferred in self._deferred_defaults().values() if deferred.asset is not None]
+
+        unique: Dict[str, "PolarsParquetAsset"] = {}
+        for dependency in dependencies:
+            unique.setdefault(dependency.asset_name, dependency)
+        return list(unique.values())
+
+    def _deferred_arguments(self, args: tuple, kwargs: dict, leading: tuple = ()) -> Tuple[tuple, dict]:
+        # Fill in the parameters left to deferred defaults. Upstream assets passed as arguments are
+        # not dependencies of the asset itself, their fingerprints are part of this call's arguments.
+        # `leading` stands in for arguments that materialize receives before `args`.
+        try:
+            signature = inspect.signature(self.func if self.func is not None else self.materialize)
+            bound = signature.bind_partial(*leading, *args, **kwargs)
+        except (TypeError, ValueError):
+            bound = None
+        if bound is not None:
+            defaults = {
+                name: deferred
+                for name, deferred in self._deferred_defaults().items()
+                if name not in bound.arguments
+            }
+            kwargs = {**kwargs, **defaults}
+        return args, kwargs
+
+    @staticmethod
+    def _argument_fingerprint(*args, **kwargs) -> str:
+        # Deferred arguments are fingerprinted without being computed
+        def key(value: Any) -> Any:
+            deferred = as_deferred(value)
+            return ("Deferred", deferred.fingerprint()) if deferred is not None else value
+
+        return argument_fingerprint(*(key(value) for value in args), **{name: key(value) for name, value in kwargs.items()})
+
+    @staticmethod
+    def _resolve_arguments(args: tuple, kwargs: dict) -> Tuple[tuple, dict]:
+        def resolve(value: Any) -> Any:
+            deferred = as_deferred(value)
+            return deferred.resolve() if deferred is not None else value
 
-    def _write_to_cache(self, df: pl.DataFrame):
-        write_parquet(df, self.parquet_path())
+        return tuple(resolve(value) for value in args), {name: resolve(value) for name, value in kwargs.items()}
 
-        # To prevent identical timestamps, sleep for 10 ms
-        sleep(0.01)
+    @staticmethod
+    def _variant_key(args: tuple, kwargs: dict) -> str:
+        # Deferred arguments are keyed by what they are, not by their current data, so that a
+        # change upstream rebuilds the same variant
+        def key(value: Any) -> Any:
+            deferred = as_deferred(value)
+            return ("Deferred", deferred.key()) if deferred is not None else value
+
+        return argument_fingerprint(*(key(value) for value in args), **{name: key(value) for name, value in kwargs.items()})[:16]
+
+    def variant(self, *args, **kwargs) -> "PolarsParquetAsset":
+        """
+        The asset cached for these arguments
+
+        With `max_variants` above 1, each set of arguments is cached separately under
+        `variants_path()`, keyed by a hash of the arguments that includes the content of
+        DataFrames. Otherwise, and for calls without arguments, this is the asset itself.
+        """
+
+        if self.max_variants <= 1 or self.variant_key is not None or not (args or kwargs):
+            return self
+
+        if not file_exists(self.variants_path()):
+            make_directories(self.variants_path(), exist_ok=True)
+        return self._with_variant_key(self._variant_key(args, kwargs))
+
+    def _with_variant_key(self, variant_key: str) -> "PolarsParquetAsset":
+        # A copy sharing the configuration of the asset, which holds no per-call state
+        variant = copy.copy(self)
+        variant.variant_key = variant_key
+        return variant
+
+    def variants(self) -> pl.DataFrame:
+        """
+        The cached variants of the asset, least recently built first
+
+        :return: One row per variant, with its key, data path and build time
+        """
+
+        suffix = f".{self.storage_format.extension}.manifest.json"
+        manifests = file_sizes(self.variants_path(), "json") if file_exists(self.variants_path()) else {}
+        rows = [
+            {
+                "variant_key": path.rsplit("/", 1)[-1][:-len(suffix)],
+                "path": path[:-len(".manifest.json")],
+                "built_at": file_last_modified(path),
+            }
+            for path in manifests
+            if path.endswith(suffix)
+        ]
+        return pl.DataFrame(rows, schema={
+            "variant_key": pl.Utf8,
+            "path": pl.Utf8,
+            "built_at": pl.Datetime("us", "UTC"),
+        }).sort("built_at")
+
+    def _remove_variant(self, variant_key: str) -> bool:
+        # Take the variant's lease, so that a variant another caller is building is not removed
+        variant = self._with_variant_key(variant_key)
+        lock = variant.build_lock()
+        if not lock.try_acquire():
+            return False
+        try:
+            # The data goes first, so that an interrupted removal is seen as a missing variant
+            remove(variant.data_path())
+            remove(variant.manifest_path())
+            remove(catalog_path(variant))
+        finally:
+            lock.release()
+        return True
+
+    def _evict_variants(self):
+        # Remove the least recently built variants beyond the cap, keeping this one. Variants
+        # being built are skipped, and removed by a later eviction.
+        keys = [key for key in self.variants()["variant_key"].to_list() if key != self.variant_key]
+        for key in keys[:max(len(keys) + 1 - self.max_variants, 0)]:
+            self._verbose_log(f"Removing variant {key} of {self.asset_name}")
+            self._remove_variant(key)
+
+    def _input_fingerprints(self, *args, **kwargs) -> dict:
+        materialize_func = self.func if self.func is not None else type(self).materialize
+        return {
+            "code": code_fingerprint(materialize_func),
+            "arguments": self._argument_fingerprint(*args, **kwargs),
+            "dependencies": {
+                asset.asset_name: asset.fingerprint()
+                for asset in self.resolved_dependencies()
+            },
+            "write_options": self.write_options.to_dict() if self.write_options is not None else None,
+        }
+
+    def fingerprint(self) -> Optional[str]:
+        """
+        Fingerprint of the cached data, taken from the manifest when available
+
+        :return: The fingerprint, or None if the asset has not been built or its last build did not complete
+        """
+
+        manifest = self._read_manifest()
+        if manifest is not None:
+            return manifest["output"]
+        if file_exists(self.data_path()):
+            return self.storage_format.fingerprint(self.data_path())
+        return None
 
     def has_updated_dependencies(self) -> bool:
-        for dependency in self.dependency_assets:
-            if isinstance(dependency, str):
-                asset = ASSET_MANAGER.assets[dependency]
-            else:
-                asset = dependency
-            if asset.last_modified() is None:
+        last_modified = self.last_modified()
+        for asset in self.resolved_dependencies():
+            dependency_last_modified = asset.last_modified()
+            if dependency_last_modified is None or last_modified is None:
                 return True
-            if asset.last_modified() > self.last_modified():
+            if dependency_last_modified > last_modified:
                 return True
         return False
 
-    def __call__(self, *args, **kwargs) -> pl.DataFrame:
-
-        # Check to see if the asset needs to be built then cached, before loading from cache
-        if self.force_reload or not file_exists(self.parquet_path()) or self.has_updated_dependencies():
-            self._verbose_log(f"Cache miss for {self.parquet_path()}")
+    def _cache_miss_reason(self, inputs: dict, manifest: Optional[dict]) -> Optional[str]:
+        if self.force_reload:
+            return "force_reload"
+        if not file_exists(self.committed_path(manifest) if manifest is not None else self.data_path()):
+            return "missing"
+
+        if manifest is None:
+            # Cached without a manifest (written externally or by an older version), fall back to timestamps
+            return "updated_dependencies" if self.has_updated_dependencies() else None
+        if manifest["output"] is None:
+            return "incomplete"
+
+        for key in ("code", "arguments", "dependencies", "write_options"):
+            if manifest["inputs"].get(key) != inputs[key]:
+                return f"changed_{key}"
+        return None
+
+    def refresh(self, *args, **kwargs):
+        """
+        Build the asset if the cache is missing or stale, without loading it
+        """
+
+        variant = self.variant(*args, **kwargs)
+        if variant is not self:
+            return variant.refresh(*args, **kwargs)
+
+        with ASSET_MANAGER.instrumentation.track(self.asset_name) as record:
+            self._refresh(record, *args, **kwargs)
+
+    def _refresh(self, record: AssetCallRecord, *args, **kwargs) -> Optional[dict]:
+        # Returns the manifest of the cached data, or None if the asset has none
+        if self.is_temporary:
+            SCRATCH_CACHE.touch(self.data_path())
+
+        args, kwargs = self._deferred_arguments(args, kwargs)
+        inputs = self._input_fingerprints(*args, **kwargs)
+        manifest = self._read_manifest()
+        reason = self._cache_miss_reason(inputs, manifest)
+        if reason is None:
+            return manifest
+
+        if not self.single_flight:
+            return self._build(record, reason, inputs, *args, **kwargs)
+
+        with self.build_lock() as lock:
+            record.lock_wait_seconds = lock.waited_seconds
+            # Another process may have built the asset while this one waited for the lock
+            if reason != "force_reload":
+                invalidate_metadata(self.data_path())
+                invalidate_metadata(self.manifest_path())
+                manifest = self._read_manifest()
+                reason = self._cache_miss_reason(inputs, manifest)
+                if reason is None:
+                    return manifest
+            return self._build(record, reason, inputs, *args, **kwargs)
+
+    def _build(self, record: AssetCallRecord, reason: str, inputs: dict, *args, **kwargs) -> dict:
+        args, kwargs = self._resolve_arguments(args, kwargs)
+        record.cache_hit = False
+        record.reason = reason
+        record.observe_memory(_estimated_size(*args, *kwargs.values()))
+
+        self._verbose_log(f"Cache miss ({reason}) for {self.data_path()}")
+        start = time.perf_counter()
+        df: Union[pl.DataFrame, pl.LazyFrame]
+        if self.use_process_pool:
+            df = self._materialize_in_process(*args, **kwargs)
+        else:
             df = self.materialize(*args, **kwargs)
+        record.materialize_seconds = time.perf_counter() - start
+
+        self._verbose_log(f"Writing to {self.data_path()}")
+        start = time.perf_counter()
+        if self.write_options is not None:
+            df = self.write_options.prepare(df)
+        manifest = self._write_to_cache(df, inputs)
+        record.write_seconds = time.perf_counter() - start
+        record.bytes_written = manifest["size_bytes"]
+
+        if self.variant_key is not None:
+            self._evict_variants()
 
-            self._verbose_log(f"Writing to {self.parquet_path()}")
-            self._write_to_cache(df)
+        if self.is_temporary and SCRATCH_CACHE.enabled:
+            SCRATCH_CACHE.evict(self.project.scratch_path, keep={self.data_path()})
 
-        return self._load_from_cache()
+        if isinstance(df, pl.DataFrame):
+            record.rows = df.height
+            record.observe_memory(_estimated_size(df, *args, *kwargs.values()))
+
+            # Write-through, so that loading a fresh build does not read it back from storage. Partitioned
+            # data is read back with its partition columns moved and its rows grouped, so it is not cached.
+            if self._memory_cache_enabled() and not self.partition_by:
+                MEMORY_CACHE.put((self.data_path(), manifest["output"]), df)
+        return manifest
+
+    def __call__(self, *args, **kwargs) -> Union[pl.DataFrame, pl.LazyFrame]:
+        variant = self.variant(*args, **kwargs)
+        if variant is not self:
+            return variant(*args, **kwargs)
+
+        if self.lazy:
+            return self.scan(*args, **kwargs)
+
+        with ASSET_MANAGER.instrumentation.track(self.asset_name) as record:
+            manifest = self._refresh(record, *args, **kwargs)
+            return self._load_from_cache(record, manifest)
+
+    def scan(self, *args, **kwargs) -> pl.LazyFrame:
+        """
+        Build the asset if needed, then return a LazyFrame backed by the cached data
+
+        Downstream queries get projection and predicate pushdown, so only the
+        required columns and row groups are read from the cache.
+        """
+
+        variant = self.variant(*args, **kwargs)
+        variant.refresh(*args, **kwargs)
+        return variant._scan_from_cache()
 
     @classmethod
     def decorator(cls, **kwargs):
@@ -166,8 +775,38 @@ class PolarsParquetAsset:
 
         return wrapper
 
+    def catalog_entry(self) -> Optional[CatalogEntry]:
+        """
+        The catalog entry recorded when the cached data was written
+
+        :return: The entry, or None if the asset has not been built or was rewritten without updating its entry
+        """
+
+        entry = read_catalog_entry(self)
+        if entry is None or entry.fingerprint is None or entry.fingerprint != self.fingerprint():
+            return None
+        return entry
+
+    def num_rows(self) -> Optional[int]:
+        entry = self.catalog_entry()
+        if entry is not None:
+            return entry.num_rows
+        if file_exists(self.committed_path()):
+            return self._scan_from_cache().select(pl.len()).collect().item()
+        return None
+
+    def cache_size(self) -> Optional[int]:
+        entry = self.catalog_entry()
+        if entry is not None:
+            return entry.size_bytes
+        committed_path = self.committed_path()
+        if file_exists(committed_path):
+            return self.storage_format.size(committed_path)
+        else:
+            return None
+
     def last_modified(self) -> Optional[datetime]:
-        if file_exists(self.parquet_path()):
-            return file_last_modified(self.parquet_path())
+        if file_exists(self.data_path()):
+            return file_last_modified(self.data_path())
         else:
             return None
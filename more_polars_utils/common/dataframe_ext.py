@@ -3,6 +3,7 @@ from typing import Optional, Sequence
 
 from polars import Expr
 from more_polars_utils.common.io import write_parquet, write_csv
+from more_polars_utils.common.sketches import SpaceSaving, HyperLogLog
 from polars.type_aliases import IntoExpr
 
 
@@ -34,20 +35,33 @@ def frequency_count(
         self: pl.DataFrame,
         group_by_column: IntoExpr,
         count_column: str = "count",
-        frequency_column: str = "frequency"
+        frequency_column: str = "frequency",
+        approximate: bool = False,
+        top_k: Optional[int] = None,
+        chunk_size: int = 1_000_000
 ) -> pl.DataFrame:
     """
     Group by `group_by_column` then generate `count` and `frequency` columns for the grouped data
 
+    With `approximate=True`, the counts come from a Space-Saving sketch updated one chunk at a time,
+    so memory stays bounded for high-cardinality columns. Each `count` is then an upper bound, and
+    an extra `{count_column}_error` column bounds the overestimate.
+
     :param self: The dataframe
     :param group_by_column: The column to group by
     :param count_column: The desired name for the `count` column
     :param frequency_column: The desired name for the `frequency` column
+    :param approximate: Estimate the counts with a bounded-memory sketch
+    :param top_k: Only return the `top_k` most frequent values
+    :param chunk_size: The number of rows aggregated at a time when approximating
     :return: The dataframe
     """
     df_count = len(self)
 
-    return (
+    if approximate:
+        return _approximate_frequency_count(self, group_by_column, count_column, frequency_column, top_k, chunk_size)
+
+    df = (
         self
         .group_by(group_by_column)
         .agg(
@@ -56,9 +70,63 @@ def frequency_count(
         .with_columns(
             **{frequency_column: (pl.col(count_column) / pl.lit(df_count))}
         )
-        .sort(count_column, descending=True)
     )
 
+    if top_k is not None:
+        return df.top_k(top_k, by=count_column).sort(count_column, descending=True)
+    return df.sort(count_column, descending=True)
+
+
+def _approximate_frequency_count(
+        df: pl.DataFrame,
+        group_by_column: IntoExpr,
+        count_column: str,
+        frequency_column: str,
+        top_k: Optional[int],
+        chunk_size: int
+) -> pl.DataFrame:
+    values = df.select(group_by_column)
+    if values.width != 1:
+        raise ValueError(f"Approximate frequency counts need a single column, but {group_by_column} selects {values.columns}")
+    column = values.columns[0]
+
+    sketch = SpaceSaving(capacity=max(10 * top_k, 1000) if top_k else 1000)
+    for chunk in values.iter_slices(chunk_size):
+        sketch.update(
+            chunk
+            .group_by(column)
+            .agg(pl.len().alias("count"))
+            .rename({column: "value"})
+        )
+
+    return (
+        sketch.top(top_k)
+        .select(
+            pl.col("value").alias(column),
+            pl.col("count").alias(count_column),
+            (pl.col("count") / pl.lit(len(df))).alias(frequency_column),
+            pl.col("error").alias(f"{count_column}_error"),
+        )
+    )
+
+
+def approximate_n_unique(self: pl.DataFrame, column: IntoExpr, precision: int = 14,
+                         chunk_size: int = 1_000_000) -> float:
+    """
+    Estimate the number of distinct values of a column with a HyperLogLog sketch
+
+    :param self: The dataframe
+    :param column: The column
+    :param precision: The sketch uses 2 ** precision registers, the relative error is about 1.04 / sqrt(2 ** precision)
+    :param chunk_size: The number of rows added to the sketch at a time
+    :return: The estimated number of distinct values
+    """
+
+    sketch = HyperLogLog(precision)
+    for chunk in self.select(column).iter_slices(chunk_size):
+        sketch.update(chunk.to_series())
+    return sketch.estimate()
+
 
 def check_unique(self: pl.DataFrame, subset: str | Expr | Sequence[str | Expr] | None = None) -> bool:
     """
@@ -69,6 +137,11 @@ def check_unique(self: pl.DataFrame, subset: str | Expr | Sequence[str | Expr] |
     :return: True if the column has unique values, False otherwise
     """
 
+    # Duplicates often appear early, so check a small prefix before the whole dataframe
+    probe = self.head(10_000)
+    if probe.height < self.height and probe.n_unique(subset) < probe.height:
+        return False
+
     return self.height == self.n_unique(subset)
 
 
@@ -111,12 +184,104 @@ def show_vertical(self: pl.DataFrame, limit: int = 1) -> None:
         print(vertical_df)
 
 
+def lazy_print_count(self: pl.LazyFrame, label: Optional[str] = None) -> pl.LazyFrame:
+    """
+    Print the row count when the query executes, without terminating a method chain
+
+    :param self: The lazyframe
+    :param label: Optional label to prefix the print statement
+    :return: The lazyframe
+    """
+
+    def _print_count(df: pl.DataFrame) -> pl.DataFrame:
+        print_count(df, label)
+        return df
+
+    # Filters and slices must not be pushed below the count
+    return self.map_batches(_print_count, predicate_pushdown=False, slice_pushdown=False)
+
+
+def lazy_frequency_count(
+        self: pl.LazyFrame,
+        group_by_column: IntoExpr,
+        count_column: str = "count",
+        frequency_column: str = "frequency"
+) -> pl.LazyFrame:
+    """
+    Group by `group_by_column` then generate `count` and `frequency` columns, as part of the query plan
+
+    :param self: The lazyframe
+    :param group_by_column: The column to group by
+    :param count_column: The desired name for the `count` column
+    :param frequency_column: The desired name for the `frequency` column
+    :return: The lazyframe
+    """
+
+    return (
+        self
+        .group_by(group_by_column)
+        .agg(
+            pl.len().alias(count_column)
+        )
+        .with_columns(
+            **{frequency_column: (pl.col(count_column) / pl.col(count_column).sum())}
+        )
+        .sort(count_column, descending=True)
+    )
+
+
+def lazy_check_unique(
+        self: pl.LazyFrame,
+        subset: str | Expr | Sequence[str | Expr] | None = None,
+        unique_column: str = "is_unique"
+) -> pl.LazyFrame:
+    """
+    Check if a column has unique values, as part of the query plan
+
+    :param self: The lazyframe
+    :param subset: One or more columns in the lazyframe
+    :param unique_column: The name of the boolean result column
+    :return: A lazyframe with a single row and a single boolean column
+    """
+
+    keys = pl.struct(pl.all()) if subset is None else pl.struct(subset)
+    return self.select(
+        (pl.len() == keys.n_unique()).alias(unique_column)
+    )
+
+
+@pl.api.register_lazyframe_namespace("more")
+class MoreLazyFrame:
+    """
+    The `more_` methods for lazyframes, available as `lf.more.<method>`
+    """
+
+    def __init__(self, lf: pl.LazyFrame):
+        self._lf = lf
+
+    def print_count(self, label: Optional[str] = None) -> pl.LazyFrame:
+        return lazy_print_count(self._lf, label)
+
+    def frequency_count(self, group_by_column: IntoExpr, count_column: str = "count",
+                        frequency_column: str = "frequency") -> pl.LazyFrame:
+        return lazy_frequency_count(self._lf, group_by_column, count_column, frequency_column)
+
+    def check_unique(self, subset: str | Expr | Sequence[str | Expr] | None = None) -> pl.LazyFrame:
+        return lazy_check_unique(self._lf, subset)
+
+
 # Add the methods to the DataFrame class
 pl.DataFrame.more_print_count = print_count            # type: ignore[attr-defined]
 pl.DataFrame.more_frequency_count = frequency_count    # type: ignore[attr-defined]
 pl.DataFrame.more_check_unique = check_unique          # type: ignore[attr-defined]
+pl.DataFrame.more_approximate_n_unique = approximate_n_unique  # type: ignore[attr-defined]
 pl.DataFrame.more_print_csv = print_csv                # type: ignore[attr-defined]
 pl.DataFrame.more_show = show                          # type: ignore[attr-defined]
 pl.DataFrame.more_show_vertical = show_vertical        # type: ignore[attr-defined]
 pl.DataFrame.more_write_parquet = write_parquet        # type: ignore[attr-defined]
 pl.DataFrame.more_write_csv = write_csv                # type: ignore[attr-defined]
+
+# Add the same methods to the LazyFrame class
+pl.LazyFrame.more_print_count = lazy_print_count            # type: ignore[attr-defined]
+pl.LazyFrame.more_frequency_count = lazy_frequency_count    # type: ignore[attr-defined]
+pl.LazyFrame.more_check_unique = lazy_check_unique          # type: ignore[attr-defined]
@@ -0,0 +1,100 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+import polars as pl
+from polars import Expr
+from polars.type_aliases import IntoExpr
+
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset
+from more_polars_utils.common.dataframe_ext import lazy_frequency_count
+from more_polars_utils.common.io import scan_parquet
+
+
+@dataclass(frozen=True)
+class UniquenessResult:
+    is_unique: bool
+    duplicates: pl.DataFrame
+
+    def __bool__(self) -> bool:
+        return self.is_unique
+
+
+def _scan(source: Union[str, PolarsParquetAsset]) -> pl.LazyFrame:
+    if isinstance(source, PolarsParquetAsset):
+        return source.scan()
+    return scan_parquet(source)
+
+
+def _duplicate_keys(keys: pl.LazyFrame, sample_size: int) -> pl.LazyFrame:
+    return (
+        keys
+        .group_by(keys.columns)
+        .agg(pl.len().alias("count"))
+        .filter(pl.col("count") > 1)
+        .head(sample_size)
+    )
+
+
+def frequency_count_dataset(
+        source: Union[str, PolarsParquetAsset],
+        group_by_column: IntoExpr,
+        count_column: str = "count",
+        frequency_column: str = "frequency",
+        top_k: Optional[int] = None
+) -> pl.DataFrame:
+    """
+    Exact `frequency_count` over a parquet dataset that does not fit in memory
+
+    Only the grouped column is read, and the aggregation runs on the streaming engine.
+
+    :param source: A parquet path, or an asset
+    :param group_by_column: The column to group by
+    :param count_column: The desired name for the `count` column
+    :param frequency_column: The desired name for the `frequency` column
+    :param top_k: Only return the `top_k` most frequent values
+    :return: The dataframe
+    """
+
+    lf = lazy_frequency_count(_scan(source), group_by_column, count_column, frequency_column)
+    if top_k is not None:
+        lf = lf.head(top_k)
+    return lf.collect(streaming=True)
+
+
+def check_unique_dataset(
+        source: Union[str, PolarsParquetAsset],
+        subset: str | Expr | Sequence[str | Expr] | None = None,
+        partitions: int = 16,
+        sample_size: int = 10,
+        probe_rows: int = 100_000
+) -> UniquenessResult:
+    """
+    Exact `check_unique` over a parquet dataset that does not fit in memory
+
+    The first `probe_rows` rows are checked first, since duplicates often appear early. The keys are
+    then hash-partitioned and each partition is checked on the streaming engine in turn, so only
+    about 1 / `partitions` of the distinct keys are held at once. The check stops at the first
+    partition with a duplicate.
+
+    :param source: A parquet path, or an asset
+    :param subset: One or more key columns, defaults to all columns
+    :param partitions: The number of hash partitions
+    :param sample_size: The maximum number of duplicated keys to return
+    :param probe_rows: The number of leading rows to check before partitioning
+    :return: Whether the keys are unique, with a sample of duplicated keys and their counts
+    """
+
+    lf = _scan(source)
+    keys = lf if subset is None else lf.select(subset)
+
+    duplicates = _duplicate_keys(keys.head(probe_rows), sample_size).collect()
+    if duplicates.height > 0:
+        return UniquenessResult(False, duplicates)
+
+    bucket = pl.struct(pl.all()).hash(seed=0) % partitions
+    for partition in range(partitions):
+        duplicates = _duplicate_keys(keys.filter(bucket == partition), sample_size).collect(streaming=True)
+        if duplicates.height > 0:
+            return UniquenessResult(False, duplicates)
+
+    return UniquenessResult(True, duplicates)
@@ -0,0 +1,82 @@
+import hashlib
+from typing import Any, Callable, Optional
+
+from more_polars_utils.common.fingerprint import code_fingerprint, argument_fingerprint
+
+
+def _is_asset(value: Any) -> bool:
+    # Duck-typed, since assets depend on this module
+    return all(callable(getattr(value, name, None)) for name in ("refresh", "fingerprint", "variant"))
+
+
+class Deferred:
+    """
+    An asset argument that is only computed when the asset receiving it has to be built
+
+    On a cache hit the receiving asset never calls `func`, so nothing is loaded. Whether the cache
+    is valid is decided from `fingerprint()` instead:
+
+    - for an asset, its fingerprint after refreshing it, so upstream changes are picked up;
+    - otherwise the `fingerprint` given, such as `parquet_fingerprint(path)` of a file `func` reads;
+    - otherwise the code and arguments of `func`, which do not see changes of the data it reads.
+
+    Assets passed directly as arguments are deferred the same way, so `Deferred` is only needed
+    for other functions, or for assets called with arguments.
+
+        customer_orders(orders, Deferred(pl.read_parquet, path, fingerprint=parquet_fingerprint(path)))
+
+    :param func: The function, or asset, computing the argument
+    :param args: Positional arguments of `func`
+    :param fingerprint: A fingerprint of the value `func` returns
+    :param kwargs: Keyword arguments of `func`
+    """
+
+    def __init__(self, func: Callable, *args, fingerprint: Optional[str] = None, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self._fingerprint = fingerprint
+
+    @property
+    def asset(self) -> Optional[Any]:
+        return self.func if _is_asset(self.func) else None
+
+    def fingerprint(self) -> Optional[str]:
+        if self.asset is not None:
+            asset = self.asset.variant(*self.args, **self.kwargs)
+            asset.refresh(*self.args, **self.kwargs)
+            return asset.fingerprint()
+        if self._fingerprint is not None:
+            return self._fingerprint
+
+        digest = hashlib.sha256()
+        digest.update(code_fingerprint(self.func).encode())
+        digest.update(argument_fingerprint(*self.args, **self.kwargs).encode())
+        return digest.hexdigest()
+
+    def key(self) -> str:
+        """
+        What the argument is, independently of its current data
+        """
+
+        name = getattr(self.func, "asset_name", None) or code_fingerprint(self.func)
+        return f"{name}:{argument_fingerprint(*self.args, **self.kwargs)}"
+
+    def resolve(self) -> Any:
+        return self.func(*self.args, **self.kwargs)
+
+    def __repr__(self) -> str:
+        name = getattr(self.func, "asset_name", getattr(self.func, "__qualname__", repr(self.func)))
+        return f"Deferred({name})"
+
+
+def as_deferred(value: Any) -> Optional[Deferred]:
+    """
+    The deferred form of an asset argument, or None if it is an ordinary value
+    """
+
+    if isinstance(value, Deferred):
+        return value
+    if _is_asset(value):
+        return Deferred(value)
+    return None
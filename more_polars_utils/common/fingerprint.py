@@ -0,0 +1,211 @@
+import hashlib
+import io
+import json
+import types
+import uuid
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import polars as pl
+
+from more_polars_utils.common.io import is_directory, list_nested_partitions, parquet_footer, parquet_file_size, \
+    file_last_modified, file_exists, read_text
+
+
+def _update_code(digest, code: types.CodeType):
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        # Nested code objects (lambdas, comprehensions) have a repr containing their memory address
+        if isinstance(const, types.CodeType):
+            _update_code(digest, const)
+        else:
+            digest.update(repr(const).encode())
+
+
+def _update_value(digest, value: Any):
+    if isinstance(value, pl.DataFrame):
+        digest.update(b"DataFrame")
+        digest.update(repr(value.schema).encode())
+        digest.update(str(value.height).encode())
+        if value.width > 0:
+            # The ordered buffer of row hashes, so that reordering the rows changes the fingerprint
+            buffer = io.BytesIO()
+            value.hash_rows(seed=0).to_frame().write_ipc(buffer)
+            digest.update(buffer.getvalue())
+    elif isinstance(value, pl.Series):
+        _update_value(digest, value.to_frame())
+    elif isinstance(value, pl.LazyFrame):
+        digest.update(b"LazyFrame")
+        _update_lazy_frame(digest, value)
+    elif isinstance(value, (list, tuple)):
+        digest.update(type(value).__name__.encode())
+        for item in value:
+            _update_value(digest, item)
+    elif isinstance(value, dict):
+        digest.update(b"dict")
+        for key in sorted(value, key=repr):
+            _update_value(digest, key)
+            _update_value(digest, value[key])
+    else:
+        digest.update(repr(value).encode())
+
+
+def _update_lazy_frame(digest, lf: pl.LazyFrame):
+    # The serialized plan holds the values of in-memory frames, but only the paths of scanned files,
+    # so the scanned files are fingerprinted as well
+    try:
+        plan = lf.serialize()
+    except Exception:
+        # A plan that cannot be serialized cannot be compared, so it never matches a cached result
+        digest.update(uuid.uuid4().bytes)
+        return
+
+    digest.update(plan.encode())
+    manifests: Dict[str, Optional[str]] = {}
+    for path in sorted(set(_scanned_paths(json.loads(plan)))):
+        digest.update(path.encode())
+        digest.update(_scanned_file_fingerprint(path, manifests).encode())
+
+
+def _scanned_paths(node: Any) -> Iterator[str]:
+    if isinstance(node, dict):
+        scan = node.get("Scan")
+        if isinstance(scan, dict):
+            yield from scan.get("paths", [])
+        for child in node.values():
+            yield from _scanned_paths(child)
+    elif isinstance(node, list):
+        for child in node:
+            yield from _scanned_paths(child)
+
+
+def _asset_output(path: str, manifests: Dict[str, Optional[str]]) -> Optional[str]:
+    # The output fingerprint recorded by the asset whose data is at `path`, or None if there is none
+    if path not in manifests:
+        manifest_path = f"{path}.manifest.json"
+        output = None
+        if file_exists(manifest_path):
+            try:
+                output = json.loads(read_text(manifest_path))["output"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                output = None
+            # An incomplete build has no output yet, and must not match a cached result
+            output = output if output is not None else uuid.uuid4().hex
+        manifests[path] = output
+    return manifests[path]
+
+
+def _data_path_candidates(path: str) -> Iterator[str]:
+    # The file's parent directories from the top, then the file itself, skipping the bucket or root directory
+    scheme, separator, rest = path.partition("://")
+    if separator:
+        head = f"{scheme}://"
+    else:
+        head, rest = ("/" if path.startswith("/") else ""), path
+    segments = rest.strip("/").split("/")
+    for count in range(2, len(segments) + 1):
+        yield head + "/".join(segments[:count])
+
+
+def _scanned_file_fingerprint(path: str, manifests: Dict[str, Optional[str]]) -> str:
+    # Files written by an asset are identified by the asset's recorded output, found next to the
+    # asset's data path, which is the file itself or one of its parent directories
+    for data_path in _data_path_candidates(path):
+        output = _asset_output(data_path, manifests)
+        if output is not None:
+            return output
+
+    if not file_exists(path):
+        return "missing"
+    digest = hashlib.sha256()
+    digest.update(file_fingerprint(path).encode())
+    if path.endswith(".parquet"):
+        digest.update(parquet_footer(path))
+    return digest.hexdigest()
+
+
+def code_fingerprint(func: Callable) -> str:
+    """
+    Fingerprint the bytecode of a function, ignoring its file name and line numbers
+
+    :param func: The function
+    :return: A hex digest that changes when the function body or its defaults change
+    """
+
+    digest = hashlib.sha256()
+    code = getattr(func, "__code__", None)
+    if code is None:
+        digest.update(repr(func).encode())
+    else:
+        _update_code(digest, code)
+        _update_value(digest, getattr(func, "__defaults__", None))
+        _update_value(digest, getattr(func, "__kwdefaults__", None))
+    return digest.hexdigest()
+
+
+def frame_fingerprint(df: pl.DataFrame) -> str:
+    """
+    Fingerprint the content of a dataframe: its schema and its rows, in order
+
+    :param df: The dataframe
+    :return: A hex digest of the content
+    """
+
+    digest = hashlib.sha256()
+    _update_value(digest, df)
+    return digest.hexdigest()
+
+
+def argument_fingerprint(*args, **kwargs) -> str:
+    """
+    Fingerprint call arguments, hashing the contents of any DataFrames
+
+    LazyFrames are hashed by their serialized plan, which includes the values of in-memory frames,
+    and by the fingerprints of the files they scan. A plan that cannot be serialized gets a new
+    fingerprint on every call.
+
+    :return: A hex digest of the arguments
+    """
+
+    digest = hashlib.sha256()
+    _update_value(digest, args)
+    _update_value(digest, kwargs)
+    return digest.hexdigest()
+
+
+def parquet_fingerprint(path: str) -> str:
+    """
+    Fingerprint a parquet file, or a directory of parquet files, from the parquet footers alone
+
+    The footer holds the schema, row counts, sizes and column statistics of every row group, but
+    not the values themselves: a change that keeps the sizes and statistics, such as reordering
+    rows, keeps the fingerprint. Assets record a fingerprint of their content when they write it,
+    so this is only a fallback for data written by other means.
+
+    :param path: The parquet file or directory
+    :return: A hex digest of the footers
+    """
+
+    digest = hashlib.sha256()
+    if is_directory(path):
+        prefix_length = len(path.rstrip("/")) + 1
+        for partition in sorted(list_nested_partitions(path)):
+            digest.update(partition[prefix_length:].encode())
+            digest.update(parquet_footer(partition))
+    else:
+        digest.update(parquet_footer(path))
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: str) -> str:
+    """
+    Fingerprint a file from its size and modification time, for formats without content statistics
+
+    :param path: The file
+    :return: A hex digest of the file metadata
+    """
+
+    digest = hashlib.sha256()
+    digest.update(str(parquet_file_size(path)).encode())
+    digest.update(file_last_modified(path).isoformat().encode())
+    return digest.hexdigest()
@@ -0,0 +1,228 @@
+import hashlib
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import polars as pl
+
+from more_polars_utils.common.catalog import catalog_path, write_catalog_entry
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset
+from more_polars_utils.common.instrumentation import AssetCallRecord
+from more_polars_utils.common.fingerprint import code_fingerprint, frame_fingerprint
+from more_polars_utils.common.io import file_exists, list_nested_partitions, parquet_footer, write_parquet, \
+    staged_write, remove, invalidate_metadata
+
+
+def _partition_value(relative_path: str, partition_key: str) -> Optional[str]:
+    for segment in relative_path.split("/")[:-1]:
+        if segment.startswith(f"{partition_key}="):
+            return segment[len(partition_key) + 1:]
+    return None
+
+
+def _files_fingerprint(root: str, files: List[str]) -> str:
+    digest = hashlib.sha256()
+    for file_path in sorted(files):
+        digest.update(file_path[len(root.rstrip("/")) + 1:].encode())
+        digest.update(parquet_footer(file_path))
+    return digest.hexdigest()
+
+
+def partition_fingerprints(asset: PolarsParquetAsset, partition_key: str) -> Dict[str, str]:
+    """
+    Fingerprint each hive partition of an asset
+
+    Assets answer from the fingerprints of the partition contents recorded in their manifest when
+    they were written. Data written by other means is fingerprinted from the parquet footers of the
+    files in each partition, which miss changes that keep the sizes and statistics.
+
+    :param asset: A hive-partitioned asset
+    :param partition_key: The partition column
+    :return: Mapping of partition value to fingerprint
+    """
+
+    manifest = asset._read_manifest()
+    if manifest is not None and manifest["output"] is not None:
+        if isinstance(asset, IncrementalParquetAsset) and asset.partition_key == partition_key:
+            return {value: record["output"] for value, record in manifest["partitions"].items()}
+        if partition_key in manifest.get("partition_fingerprints", {}):
+            return manifest["partition_fingerprints"][partition_key]
+
+    root = asset.committed_path(manifest)
+    if not file_exists(root):
+        return {}
+
+    files_by_value: Dict[str, List[str]] = {}
+    for file_path in list_nested_partitions(root):
+        value = _partition_value(file_path[len(root.rstrip("/")) + 1:], partition_key)
+        if value is not None:
+            files_by_value.setdefault(value, []).append(file_path)
+
+    return {value: _files_fingerprint(root, files) for value, files in files_by_value.items()}
+
+
+class IncrementalParquetAsset(PolarsParquetAsset):
+    """
+    An asset stored as hive partitions of `partition_key`, rebuilt one partition at a time
+
+    The upstream `dependency_assets` must be hive-partitioned by the same key. On each call, only
+    the partitions whose upstream data is new or changed are materialized, by calling the function
+    with the partition value (the raw directory value, as a string) followed by the call arguments:
+
+        @IncrementalParquetAsset.decorator(partition_key="day", dependency_assets=["events"])
+        def daily_totals(day: str) -> pl.DataFrame:
+            return events.scan().filter(pl.col("day").cast(pl.Utf8) == day).group_by("user_id").len().collect()
+
+    Partitions that disappear upstream are removed. A change to the function or the call arguments
+    rebuilds every partition. While the upstream has no partitions, the asset has no data and reads
+    as an empty frame of just the partition column.
+    """
+
+    def __init__(self, func: Optional[Callable] = None, *, partition_key: str, **kwargs):
+        self.partition_key = partition_key
+        super().__init__(func, **kwargs)
+
+    def partition_path(self, value: str) -> str:
+        return f"{self.parquet_path()}/{self.partition_key}={value}"
+
+    def _upstream_partitions(self) -> Dict[str, Dict[str, str]]:
+        upstream: Dict[str, Dict[str, str]] = {}
+        for asset in self.resolved_dependencies():
+            for value, fingerprint in partition_fingerprints(asset, self.partition_key).items():
+                upstream.setdefault(value, {})[asset.asset_name] = fingerprint
+        return upstream
+
+    def _is_empty(self) -> bool:
+        manifest = self._read_manifest()
+        return manifest is not None and manifest["output"] is not None and not manifest.get("partitions")
+
+    def _scan_from_cache(self) -> pl.LazyFrame:
+        if self._is_empty():
+            return pl.LazyFrame(schema={self.partition_key: pl.Utf8})
+        return super()._scan_from_cache()
+
+    def _read_from_storage(self, record: Optional[AssetCallRecord], manifest: Optional[dict] = None) -> pl.DataFrame:
+        if self._is_empty():
+            return pl.DataFrame(schema={self.partition_key: pl.Utf8})
+        return super()._read_from_storage(record, manifest)
+
+    def _write_partition(self, value: str, df: Union[pl.DataFrame, pl.LazyFrame], root: Optional[str] = None) -> str:
+        # Partitions are staged one at a time, unless `root` is itself a staging path of the whole asset
+        kwargs = {}
+        if self.write_options is not None:
+            df = self.write_options.prepare(df)
+            kwargs = self.write_options.parquet_kwargs()
+
+        if isinstance(df, pl.LazyFrame):
+            df = df.collect(streaming=True)
+        if self.partition_key in df.columns:
+            df = df.drop(self.partition_key)
+
+        if root is None:
+            with staged_write(self.partition_path(value)) as staging_path:
+                write_parquet(df, staging_path, max_rows_per_file=max(df.height, 1), **kwargs)
+        else:
+            write_parquet(df, f"{root}/{self.partition_key}={value}", max_rows_per_file=max(df.height, 1), **kwargs)
+
+        return frame_fingerprint(df)
+
+    def _refresh(self, record: AssetCallRecord, *args, **kwargs):
+        # The partition value is the first argument of materialize
+        args, kwargs = self._deferred_arguments(args, kwargs, leading=(None,))
+
+        # Check without the lock first, so that up to date assets never take it
+        if self._plan(*args, **kwargs) is None:
+            return
+
+        if not self.single_flight:
+            self._update_partitions(record, *args, **kwargs)
+            return
+
+        with self.build_lock() as lock:
+            record.lock_wait_seconds = lock.waited_seconds
+            invalidate_metadata(self.parquet_path())
+            invalidate_metadata(self.manifest_path())
+            self._update_partitions(record, *args, **kwargs)
+
+    def _plan(self, *args, **kwargs) -> Optional[tuple]:
+        # The inputs, the partition records to keep, and the changed and removed partitions,
+        # or None if the asset is up to date
+
+        materialize_func = self.func if self.func is not None else type(self).materialize
+        inputs: Dict[str, Any] = {
+            "code": code_fingerprint(materialize_func),
+            "arguments": self._argument_fingerprint(*args, **kwargs),
+        }
+        if self.write_options is not None:
+            inputs["write_options"] = self.write_options.to_dict()
+
+        manifest = self._read_manifest()
+        full_rebuild = (
+            self.force_reload
+            or manifest is None
+            or not file_exists(self.parquet_path())
+            or manifest["inputs"] != inputs
+        )
+        records = {} if full_rebuild or manifest is None else dict(manifest.get("partitions", {}))
+
+        upstream = self._upstream_partitions()
+        changed = sorted(value for value in upstream if records.get(value, {}).get("inputs") != upstream[value])
+        removed = sorted(set(records) - set(upstream))
+        if not changed and not removed and manifest is not None and manifest["output"] is not None:
+            return None
+        return inputs, records, upstream, changed, removed, full_rebuild
+
+    def _update_partitions(self, record: AssetCallRecord, *args, **kwargs):
+        # Materialize the partitions whose upstream data is new or changed
+
+        plan = self._plan(*args, **kwargs)
+        if plan is None:
+            return
+        inputs, records, upstream, changed, removed, full_rebuild = plan
+        args, kwargs = self._resolve_arguments(args, kwargs)
+
+        record.cache_hit = False
+        record.reason = "full_rebuild" if full_rebuild else "changed_partitions"
+        self._verbose_log(
+            f"Incremental cache miss for {self.parquet_path()}: "
+            f"{len(changed)} changed and {len(removed)} removed partitions"
+        )
+
+        # The manifest marks the cache as incomplete until every partition is written
+        self._write_manifest(inputs, None, partitions=records)
+
+        for value in removed:
+            remove(self.partition_path(value))
+            del records[value]
+
+        if full_rebuild and changed:
+            # Readers keep the previous data until the rebuilt asset is published
+            with staged_write(self.parquet_path()) as staging_path:
+                self._materialize_partitions(record, records, upstream, changed, staging_path, *args, **kwargs)
+        else:
+            if full_rebuild:
+                remove(self.parquet_path())
+            self._materialize_partitions(record, records, upstream, changed, None, *args, **kwargs)
+
+        if not records:
+            # Nothing is left to describe in the catalog, or to read
+            remove(self.parquet_path())
+            remove(catalog_path(self))
+
+        output = hashlib.sha256()
+        for value in sorted(records):
+            output.update(f"{value}={records[value]['output']}".encode())
+        self._write_manifest(inputs, output.hexdigest(), partitions=records)
+        if records:
+            write_catalog_entry(self, output.hexdigest())
+
+    def _materialize_partitions(self, record: AssetCallRecord, records: dict, upstream: dict, changed: List[str],
+                                root: Optional[str], *args, **kwargs):
+        for value in changed:
+            self._verbose_log(f"Writing partition {self.partition_path(value)}")
+            start = time.perf_counter()
+            df = self.materialize(value, *args, **kwargs)
+            record.materialize_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            records[value] = {"inputs": upstream[value], "output": self._write_partition(value, df, root)}
+            record.write_seconds += time.perf_counter() - start
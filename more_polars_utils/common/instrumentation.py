@@ -0,0 +1,120 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict, fields
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+import polars as pl
+from polars.type_aliases import PolarsDataType
+
+LOGGER = logging.getLogger(__name__)
+
+# The number of records kept in memory, older records are dropped first
+MAX_RECORDS = 10_000
+
+
+@dataclass
+class AssetCallRecord:
+    asset_name: str
+    started_at: datetime
+    wall_seconds: float = 0.0
+    cache_hit: bool = True
+    reason: Optional[str] = None
+    materialize_seconds: float = 0.0
+    read_seconds: float = 0.0
+    write_seconds: float = 0.0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    rows: Optional[int] = None
+    peak_memory_bytes: int = 0
+    lock_wait_seconds: float = 0.0
+    error: Optional[str] = None
+
+    def observe_memory(self, estimated_bytes: int):
+        self.peak_memory_bytes = max(self.peak_memory_bytes, estimated_bytes)
+
+
+class AssetInstrumentation:
+    """
+    Collects an `AssetCallRecord` for every asset call
+
+    The latest `max_records` records are kept in memory and exposed as a dataframe. They can also
+    be appended to a local JSON-lines file, and passed to user hooks as they complete. Failures of
+    the file or of a hook are logged, and never affect the asset call.
+    """
+
+    def __init__(self, jsonl_path: Optional[str] = None, max_records: int = MAX_RECORDS):
+        self.enabled = True
+        self.jsonl_path = jsonl_path
+        self.hooks: List[Callable[[AssetCallRecord], None]] = []
+        self.records: Deque[AssetCallRecord] = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[AssetCallRecord], None]):
+        self.hooks.append(hook)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+    @contextmanager
+    def track(self, asset_name: str) -> Iterator[AssetCallRecord]:
+        record = AssetCallRecord(asset_name=asset_name, started_at=datetime.now(timezone.utc))
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record.error = repr(e)
+            raise
+        finally:
+            record.wall_seconds = time.perf_counter() - start
+            if self.enabled:
+                self._record(record)
+
+    def _record(self, record: AssetCallRecord):
+        with self._lock:
+            self.records.append(record)
+            if self.jsonl_path is not None:
+                try:
+                    with open(self.jsonl_path, "a") as f:
+                        f.write(json.dumps(asdict(record), default=str) + "\n")
+                except Exception:
+                    LOGGER.exception("Failed to append the record of %s to %s", record.asset_name, self.jsonl_path)
+
+        for hook in self.hooks:
+            try:
+                hook(record)
+            except Exception:
+                LOGGER.exception("Instrumentation hook %r failed for %s", hook, record.asset_name)
+
+    def to_frame(self) -> pl.DataFrame:
+        """
+        All records as a dataframe, one row per asset call
+        """
+
+        with self._lock:
+            records = list(self.records)
+
+        schema: Dict[str, PolarsDataType] = {
+            "asset_name": pl.Utf8,
+            "started_at": pl.Datetime(time_zone="UTC"),
+            "wall_seconds": pl.Float64,
+            "cache_hit": pl.Boolean,
+            "reason": pl.Utf8,
+            "materialize_seconds": pl.Float64,
+            "read_seconds": pl.Float64,
+            "write_seconds": pl.Float64,
+            "bytes_read": pl.Int64,
+            "bytes_written": pl.Int64,
+            "rows": pl.Int64,
+            "peak_memory_bytes": pl.Int64,
+            "lock_wait_seconds": pl.Float64,
+            "error": pl.Utf8,
+        }
+        assert (list(schema) == [field.name for field in fields(AssetCallRecord)])
+
+        return pl.DataFrame([asdict(record) for record in records], schema=schema)
@@ -1,14 +1,15 @@
+import asyncio
+import uuid
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Dict, Iterator, Tuple
 
-import more_polars_utils.common.io.local as io_local  # ignore: type
-import more_polars_utils.common.io.s3 as io_s3  # ignore: type
+from more_polars_utils.common.io.backends import backend_for, register_backend, set_filesystem  # noqa: F401
 
 
 def select_io(path: str):
-    if io_s3.is_s3_path(path):
-        return io_s3
-    else:
-        return io_local
+    return backend_for(path)
 
 
 def file_exists(path: str) -> bool:
@@ -23,6 +24,14 @@ def make_directories(path: str, *args, **kwargs):
     return select_io(path).make_directories(path, *args, **kwargs)
 
 
+def prefetch_metadata(path: str):
+    return select_io(path).prefetch_metadata(path)
+
+
+def invalidate_metadata(path: str):
+    return select_io(path).invalidate_metadata(path)
+
+
 def file_last_modified(path: str) -> datetime:
     return select_io(path).file_last_modified(path)
 
@@ -35,6 +44,10 @@ def read_parquet(path: str, *args, **kwargs):
     return select_io(path).read_parquet(path, *args, **kwargs)
 
 
+def scan_parquet(path: str, *args, **kwargs):
+    return select_io(path).scan_parquet(path, *args, **kwargs)
+
+
 def write_parquet(df, path: str, *args, **kwargs):
     return select_io(path).write_parquet(df, path, *args, **kwargs)
 
@@ -43,5 +56,122 @@ def write_csv(df, path: str, *args, **kwargs):
     return select_io(path).write_csv(df, path, *args, **kwargs)
 
 
-def parquet_file_size(path: str) -> int:
-    return select_io(path).parquet_file_size(path)
+def read_ipc(path: str, *args, **kwargs):
+    return select_io(path).read_ipc(path, *args, **kwargs)
+
+
+def scan_ipc(path: str, *args, **kwargs):
+    return select_io(path).scan_ipc(path, *args, **kwargs)
+
+
+def write_ipc(df, path: str, *args, **kwargs):
+    return select_io(path).write_ipc(df, path, *args, **kwargs)
+
+
+def parquet_file_size(path: str, *args, **kwargs) -> int:
+    return select_io(path).parquet_file_size(path, *args, **kwargs)
+
+
+def file_sizes(path: str, file_extension="parquet") -> Dict[str, int]:
+    return select_io(path).file_sizes(path, file_extension)
+
+
+def partition_sizes(path: str, file_extension="parquet", *args, **kwargs):
+    return select_io(path).partition_sizes(path, file_extension, *args, **kwargs)
+
+
+def read_text(path: str) -> str:
+    return select_io(path).read_text(path)
+
+
+def write_text(text: str, path: str):
+    return select_io(path).write_text(text, path)
+
+
+def remove_empty_directory(path: str):
+    return select_io(path).remove_empty_directory(path)
+
+
+def parquet_footer(path: str) -> bytes:
+    return select_io(path).parquet_footer(path)
+
+
+def remove(path: str):
+    return select_io(path).remove(path)
+
+
+def replace(source: str, destination: str):
+    return select_io(destination).replace(source, destination)
+
+
+@contextmanager
+def staged_write(path: str) -> Iterator[str]:
+    """
+    Stage a write to a temporary path next to `path`, then publish it with `replace` on success
+
+    The staged data is removed if the write fails, so a failed write leaves `path` unchanged. How
+    atomic publishing is depends on the backend, see `replace`.
+
+    :param path: The final path
+    :return: The temporary path to write to
+    """
+
+    staging_path = f"{path}.staging-{uuid.uuid4().hex}"
+    try:
+        yield staging_path
+    except BaseException:
+        remove(staging_path)
+        raise
+    replace(staging_path, path)
+
+
+# The maximum number of async io calls in flight at once, in each event loop
+ASYNC_CONCURRENCY = 32
+
+_ASYNC_LIMITS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[int, asyncio.Semaphore]]" = \
+    weakref.WeakKeyDictionary()
+
+
+def _async_limit() -> asyncio.Semaphore:
+    # Semaphores belong to an event loop, so each running loop gets its own
+    loop = asyncio.get_running_loop()
+    limit = _ASYNC_LIMITS.get(loop)
+    if limit is None or limit[0] != ASYNC_CONCURRENCY:
+        limit = (ASYNC_CONCURRENCY, asyncio.Semaphore(ASYNC_CONCURRENCY))
+        _ASYNC_LIMITS[loop] = limit
+    return limit[1]
+
+
+async def afile_exists(path: str) -> bool:
+    async with _async_limit():
+        return await select_io(path).afile_exists(path)
+
+
+async def ais_directory(path: str) -> bool:
+    async with _async_limit():
+        return await select_io(path).ais_directory(path)
+
+
+async def afile_last_modified(path: str) -> datetime:
+    async with _async_limit():
+        return await select_io(path).afile_last_modified(path)
+
+
+async def alist_nested_partitions(path: str, file_extension="parquet", *args, **kwargs) -> list[str]:
+    async with _async_limit():
+        return await select_io(path).alist_nested_partitions(path, file_extension, *args, **kwargs)
+
+
+async def aparquet_file_size(path: str, *args, **kwargs) -> int:
+    async with _async_limit():
+        return await select_io(path).aparquet_file_size(path, *args, **kwargs)
+
+
+async def aread_parquet(path: str, *args, **kwargs):
+    async with _async_limit():
+        return await select_io(path).aread_parquet(path, *args, **kwargs)
+
+
+async def awrite_parquet(df, path: str, *args, **kwargs):
+    async with _async_limit():
+        return await select_io(path).awrite_parquet(df, path, *args, **kwargs)
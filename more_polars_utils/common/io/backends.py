@@ -0,0 +1,58 @@
+import importlib
+from types import ModuleType
+from typing import Any, Dict
+
+# Maps a path prefix to the module implementing io for it. Modules are imported on first use of a
+# matching path, so remote filesystem clients are never imported by programs that only use local paths.
+BACKENDS: Dict[str, str] = {
+    "s3://": "more_polars_utils.common.io.s3",
+    "s3a://": "more_polars_utils.common.io.s3",
+}
+
+# The module for paths without a registered prefix
+LOCAL_BACKEND = "more_polars_utils.common.io.local"
+
+_LOADED: Dict[str, ModuleType] = {}
+
+
+def register_backend(prefix: str, module: str):
+    """
+    Route paths starting with `prefix` to `module`, which implements the functions of `io.local`
+
+    :param prefix: The path prefix, such as "gs://"
+    :param module: The importable name of the backend module
+    """
+
+    BACKENDS[prefix] = module
+
+
+def _load(module: str) -> ModuleType:
+    backend = _LOADED.get(module)
+    if backend is None:
+        backend = _LOADED[module] = importlib.import_module(module)
+    return backend
+
+
+def backend_for(path: str) -> ModuleType:
+    for prefix, module in BACKENDS.items():
+        if path.startswith(prefix):
+            return _load(module)
+    return _load(LOCAL_BACKEND)
+
+
+def set_filesystem(prefix: str, filesystem: Any):
+    """
+    Use a pre-configured fsspec filesystem for paths starting with `prefix`
+
+    The default filesystem is then never created, so its credentials, connection pool and
+    retry settings come from the injected instance:
+
+        set_filesystem("s3://", s3fs.S3FileSystem(profile="analytics", max_concurrency=32))
+
+    :param prefix: The path prefix of a registered backend
+    :param filesystem: The filesystem instance
+    """
+
+    if prefix not in BACKENDS:
+        raise ValueError(f"No io backend is registered for {prefix!r}")
+    _load(BACKENDS[prefix]).set_filesystem(filesystem)
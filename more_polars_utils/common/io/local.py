@@ -1,10 +1,17 @@
+import asyncio
 import os
+import shutil
+import uuid
 from datetime import datetime, timezone
 from glob import glob
 from os import PathLike
-from typing import Union, Optional
+from typing import Dict, Union, Optional, List
 
 import polars as pl
+from polars.type_aliases import IpcCompression
+
+from more_polars_utils.common.io.partitions import summarise_partitions, split_files
+from more_polars_utils.common.io.streaming import sink_parquet, sink_ipc
 
 
 def file_exists(path: Union[str, PathLike[str]]) -> bool:
@@ -19,6 +26,15 @@ def make_directories(path: Union[str, PathLike[str]], *args, **kwargs):
     os.makedirs(path, *args, **kwargs)
 
 
+def prefetch_metadata(path: Union[str, PathLike[str]]):
+    # Local metadata lookups are cheap, so there is nothing to prefetch
+    pass
+
+
+def invalidate_metadata(path: Optional[Union[str, PathLike[str]]] = None):
+    pass
+
+
 def file_last_modified(path: Union[str, PathLike[str]]) -> datetime:
     assert (file_exists(path))
     file_timestamp = os.path.getmtime(path)
@@ -31,23 +47,191 @@ def list_nested_partitions(path: Union[str, PathLike[str]], file_extension="parq
     return relevant_files
 
 
-def read_parquet(path: str, *args, **kwargs) -> pl.DataFrame:
-    assert (file_exists(path))
+# Arguments of pl.read_parquet that pl.scan_parquet does not accept
+EAGER_READ_ARGUMENTS = {"use_pyarrow", "pyarrow_options", "memory_map"}
+
+
+def _parquet_source(path: str) -> str:
     if is_directory(path):
         formatted_path = str(path)[:-1] if str(path).endswith('/') else str(path)
-        return pl.read_parquet(f"{formatted_path}/**/*.parquet", *args, **kwargs)
+        return f"{formatted_path}/**/*.parquet"
+    return path
+
+
+def scan_parquet(path: str, *args, **kwargs) -> pl.LazyFrame:
+    assert (file_exists(path))
+    kwargs.setdefault("hive_partitioning", True)
+    return pl.scan_parquet(_parquet_source(path), *args, **kwargs)
+
+
+def read_parquet(
+        path: str,
+        *args,
+        columns: Optional[List[str]] = None,
+        filters: Optional[pl.Expr] = None,
+        **kwargs) -> pl.DataFrame:
+    """
+    Read a parquet file or hive-partitioned directory, reading only the requested columns and matching rows
+
+    Other arguments are passed to `pl.scan_parquet`, or to `pl.read_parquet` when they include any
+    that only the eager reader accepts, such as `use_pyarrow` or `memory_map`.
+
+    :param path: The parquet file or directory
+    :param columns: Optional columns to read
+    :param filters: Optional predicate, used to prune partitions and row groups
+    :return: The dataframe
+    """
+
+    if args or EAGER_READ_ARGUMENTS.intersection(kwargs):
+        assert (file_exists(path))
+        lf = pl.read_parquet(_parquet_source(path), *args, **kwargs).lazy()
     else:
-        return pl.read_parquet(path, *args, **kwargs)
+        lf = scan_parquet(path, **kwargs)
+    if filters is not None:
+        lf = lf.filter(filters)
+    if columns is not None:
+        lf = lf.select(columns)
+    return lf.collect()
+
+
+def write_parquet(
+        df: Union[pl.DataFrame, pl.LazyFrame],
+        path: str,
+        *args,
+        partition_by: Optional[List[str]] = None,
+        max_rows_per_file: Optional[int] = None,
+        **kwargs):
+    """
+    Write a dataframe to a parquet file, or to a hive-partitioned directory
+
+    :param df: The dataframe, a LazyFrame is streamed to disk when written to a single file
+    :param path: The file, or the dataset directory when partitioning
+    :param partition_by: Columns to partition by, written as `column=value` directories
+    :param max_rows_per_file: Split the data into files of at most this many rows
+    """
 
+    if partition_by or max_rows_per_file:
+        if isinstance(df, pl.LazyFrame):
+            df = df.collect(streaming=True)
 
-def write_parquet(df: pl.DataFrame, path: str, *args, **kwargs):
-    df.write_parquet(path, *args, **kwargs)
+        # The dataset replaces anything previously written to the directory
+        remove(path)
+
+        for relative_path, file_df in split_files(df, partition_by, max_rows_per_file):
+            file_path = f"{path}/{relative_path}"
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            file_df.write_parquet(file_path, *args, **kwargs)
+    elif isinstance(df, pl.LazyFrame):
+        # Stream the query results to disk without collecting them in memory
+        sink_parquet(df, path, *args, **kwargs)
+    else:
+        df.write_parquet(path, *args, **kwargs)
 
 
 def write_csv(df: pl.DataFrame, path: str, *args, **kwargs):
     df.write_csv(path, *args, **kwargs)
 
 
+def scan_ipc(path: str, *args, **kwargs) -> pl.LazyFrame:
+    assert (file_exists(path))
+    kwargs.setdefault("memory_map", True)
+    return pl.scan_ipc(path, *args, **kwargs)
+
+
+def read_ipc(path: str, columns: Optional[List[str]] = None, **kwargs) -> pl.DataFrame:
+    """
+    Read an Arrow IPC file, memory-mapped by default
+
+    Uncompressed files written by `write_ipc` are read without decoding or copying, the
+    dataframe's buffers point directly into the page cache.
+
+    :param path: The IPC file
+    :param columns: Optional columns to read
+    :return: The dataframe
+    """
+
+    assert (file_exists(path))
+    kwargs.setdefault("memory_map", True)
+    # Rechunking would copy the memory-mapped buffers
+    kwargs.setdefault("rechunk", False)
+    return pl.read_ipc(path, columns=columns, **kwargs)
+
+
+def write_ipc(df: Union[pl.DataFrame, pl.LazyFrame], path: str, compression: IpcCompression = "uncompressed"):
+    """
+    Write a dataframe to an Arrow IPC file, uncompressed by default so that it can be memory-mapped
+
+    :param df: The dataframe, a LazyFrame is streamed to disk
+    :param path: The file
+    :param compression: "uncompressed", "lz4" or "zstd"
+    """
+
+    if isinstance(df, pl.LazyFrame):
+        sink_ipc(df, path, compression)
+    else:
+        df.write_ipc(path, compression=compression)
+
+
+def remove(path: str):
+    if is_directory(path):
+        shutil.rmtree(path)
+    elif file_exists(path):
+        os.remove(path)
+
+
+def replace(source: str, destination: str):
+    """
+    Move a staged file or directory to its final path, replacing anything already there
+
+    Files are swapped atomically with a single rename. Directories take two renames, moving the
+    existing directory aside first, so between them the path briefly does not exist. Readers see the
+    previous directory, the new one, or nothing, but never a partially written directory.
+    """
+
+    if not is_directory(source) and not is_directory(destination):
+        os.replace(source, destination)
+        return
+
+    previous = f"{destination}.replaced-{uuid.uuid4().hex}"
+    if file_exists(destination):
+        os.rename(destination, previous)
+    os.rename(source, destination)
+    remove(previous)
+
+
+def read_text(path: str) -> str:
+    with open(path, "r") as f:
+        return f.read()
+
+
+def write_text(text: str, path: str):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def remove_empty_directory(path: str):
+    """
+    Remove a directory only if it is empty, leaving it in place otherwise
+    """
+
+    try:
+        os.rmdir(path)
+    except OSError:
+        pass
+
+
+def parquet_footer(path: str) -> bytes:
+    """
+    Read the raw footer of a parquet file without reading any data pages
+    """
+
+    with open(path, "rb") as f:
+        f.seek(-8, os.SEEK_END)
+        footer_length = int.from_bytes(f.read(4), "little")
+        f.seek(-(8 + footer_length), os.SEEK_END)
+        return f.read(footer_length)
+
+
 def parquet_file_size(path: str, file_extension: str = "parquet", **kwargs) -> Optional[int]:
     assert (file_exists(path))
 
@@ -62,3 +246,59 @@ def parquet_file_size(path: str, file_extension: str = "parquet", **kwargs) -> O
     ]
 
     return sum(partition_sizes)
+
+
+def file_sizes(path: str, file_extension: str = "parquet") -> Dict[str, int]:
+    """
+    The size of a file, or of every file with `file_extension` under a directory
+
+    :return: Mapping of file path to size in bytes
+    """
+
+    assert (file_exists(path))
+    files = list_nested_partitions(path=path, file_extension=file_extension) if is_directory(path) else [path]
+    return {file: os.path.getsize(file) for file in files}
+
+
+def partition_sizes(path: str, file_extension: str = "parquet") -> pl.DataFrame:
+    """
+    Summarise the files of a partitioned dataset
+
+    :param path: The root directory of the dataset
+    :param file_extension: The extension of the data files
+    :return: One row per partition directory, relative to `path`, with `file_count` and `size_bytes`
+    """
+
+    files = {
+        partition: os.path.getsize(partition)
+        for partition in list_nested_partitions(path=path, file_extension=file_extension)
+    }
+    return summarise_partitions(path, files)
+
+
+async def afile_exists(path: Union[str, PathLike[str]]) -> bool:
+    return await asyncio.to_thread(file_exists, path)
+
+
+async def ais_directory(path: Union[str, PathLike[str]]) -> bool:
+    return await asyncio.to_thread(is_directory, path)
+
+
+async def afile_last_modified(path: Union[str, PathLike[str]]) -> datetime:
+    return await asyncio.to_thread(file_last_modified, path)
+
+
+async def alist_nested_partitions(path: Union[str, PathLike[str]], file_extension="parquet") -> list[str]:
+    return await asyncio.to_thread(list_nested_partitions, path, file_extension)
+
+
+async def aparquet_file_size(path: str, file_extension: str = "parquet", **kwargs) -> Optional[int]:
+    return await asyncio.to_thread(parquet_file_size, path, file_extension, **kwargs)
+
+
+async def aread_parquet(path: str, *args, **kwargs) -> pl.DataFrame:
+    return await asyncio.to_thread(read_parquet, path, *args, **kwargs)
+
+
+async def awrite_parquet(df: Union[pl.DataFrame, pl.LazyFrame], path: str, *args, **kwargs):
+    return await asyncio.to_thread(write_parquet, df, path, *args, **kwargs)
@@ -0,0 +1,218 @@
+import struct
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# Thrift compact protocol types
+_STOP = 0
+_TRUE = 1
+_FALSE = 2
+_BYTE = 3
+_I16 = 4
+_I32 = 5
+_I64 = 6
+_DOUBLE = 7
+_BINARY = 8
+_LIST = 9
+_SET = 10
+_MAP = 11
+_STRUCT = 12
+
+# Parquet physical types
+_BOOLEAN = 0
+_INT32 = 1
+_INT64 = 2
+_FLOAT = 4
+_DOUBLE_TYPE = 5
+_BYTE_ARRAY = 6
+
+# Parquet converted types
+_UTF8 = 0
+_DATE = 6
+
+_EPOCH = date(1970, 1, 1)
+
+
+class _CompactReader:
+    """
+    Reads Thrift compact protocol structs as dicts of field id to value
+
+    The protocol is self-describing, so any struct can be read without its IDL. Binary fields are
+    returned as bytes, nested structs as dicts, and lists and sets as lists.
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.position = 0
+
+    def _byte(self) -> int:
+        value = self.data[self.position]
+        self.position += 1
+        return value
+
+    def _varint(self) -> int:
+        result = 0
+        shift = 0
+        while True:
+            byte = self._byte()
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return result
+            shift += 7
+
+    def _zigzag(self) -> int:
+        value = self._varint()
+        return (value >> 1) ^ -(value & 1)
+
+    def _value(self, value_type: int) -> Any:
+        if value_type == _TRUE:
+            return True
+        if value_type == _FALSE:
+            return False
+        if value_type == _BYTE:
+            return struct.unpack("<b", bytes([self._byte()]))[0]
+        if value_type in (_I16, _I32, _I64):
+            return self._zigzag()
+        if value_type == _DOUBLE:
+            value = struct.unpack_from("<d", self.data, self.position)[0]
+            self.position += 8
+            return value
+        if value_type == _BINARY:
+            length = self._varint()
+            value = self.data[self.position:self.position + length]
+            self.position += length
+            return value
+        if value_type in (_LIST, _SET):
+            return self._list()
+        if value_type == _MAP:
+            return self._map()
+        if value_type == _STRUCT:
+            return self.read_struct()
+        raise ValueError(f"Unknown thrift compact type {value_type}")
+
+    def _list(self) -> List[Any]:
+        header = self._byte()
+        size = header >> 4
+        element_type = header & 0x0F
+        if size == 15:
+            size = self._varint()
+        if element_type in (_TRUE, _FALSE):
+            # Booleans in collections are encoded as one byte each
+            return [self._byte() == _TRUE for _ in range(size)]
+        return [self._value(element_type) for _ in range(size)]
+
+    def _map(self) -> Dict[Any, Any]:
+        size = self._varint()
+        if size == 0:
+            return {}
+        types = self._byte()
+        return {self._value(types >> 4): self._value(types & 0x0F) for _ in range(size)}
+
+    def read_struct(self) -> Dict[int, Any]:
+        fields: Dict[int, Any] = {}
+        field_id = 0
+        while True:
+            header = self._byte()
+            field_type = header & 0x0F
+            if field_type == _STOP:
+                return fields
+            delta = header >> 4
+            field_id = field_id + delta if delta else self._zigzag()
+            fields[field_id] = self._value(field_type)
+
+
+@dataclass
+class ColumnStatistics:
+    min: Any = None
+    max: Any = None
+    null_count: Optional[int] = None
+
+
+@dataclass
+class RowGroupMetadata:
+    num_rows: int
+    size_bytes: int
+    columns: Dict[str, ColumnStatistics] = field(default_factory=dict)
+
+
+@dataclass
+class ParquetMetadata:
+    num_rows: int
+    row_groups: List[RowGroupMetadata]
+    created_by: Optional[str] = None
+
+
+def _decode_statistic(value: Optional[bytes], column: Tuple[int, Optional[int], bool]) -> Any:
+    if value is None:
+        return None
+
+    physical_type, converted_type, is_string = column
+    if physical_type == _BOOLEAN:
+        return bool(value[0])
+    if physical_type == _INT32:
+        number = struct.unpack("<i", value)[0]
+        return (_EPOCH + timedelta(days=number)).isoformat() if converted_type == _DATE else number
+    if physical_type == _INT64:
+        return struct.unpack("<q", value)[0]
+    if physical_type == _FLOAT:
+        return struct.unpack("<f", value)[0]
+    if physical_type == _DOUBLE_TYPE:
+        return struct.unpack("<d", value)[0]
+    if physical_type == _BYTE_ARRAY and is_string:
+        return value.decode("utf-8", errors="replace")
+    return value.hex()
+
+
+def parse_parquet_footer(footer: bytes) -> ParquetMetadata:
+    """
+    Parse the row counts and column statistics of a parquet footer, as read by `parquet_footer`
+
+    Only the fields needed to plan reads are decoded. Statistics of dates are returned as ISO
+    strings, of strings as text, of other binary columns as hex, and of numbers as numbers.
+
+    :param footer: The thrift-encoded FileMetaData
+    :return: The metadata
+    """
+
+    file_metadata = _CompactReader(footer).read_struct()
+
+    # The schema is a depth-first list of elements, where groups give their number of children
+    leaves: Dict[str, Tuple[int, Optional[int], bool]] = {}
+    parents: List[Tuple[str, int]] = []
+    for element in file_metadata.get(2, [])[1:]:
+        prefix = parents[-1][0] if parents else ""
+        name = prefix + element[4].decode()
+        if parents:
+            parents[-1] = (parents[-1][0], parents[-1][1] - 1)
+
+        if element.get(5):
+            parents.append((name + ".", element[5]))
+        else:
+            logical_type = element.get(10) or {}
+            is_string = element.get(6) == _UTF8 or 1 in logical_type
+            leaves[name] = (element.get(1), element.get(6), is_string)
+
+        while parents and parents[-1][1] == 0:
+            parents.pop()
+
+    row_groups = []
+    for row_group in file_metadata.get(4, []):
+        columns = {}
+        for column_chunk in row_group.get(1, []):
+            column_metadata = column_chunk.get(3, {})
+            name = ".".join(part.decode() for part in column_metadata.get(3, []))
+            statistics = column_metadata.get(12, {})
+            leaf = leaves.get(name, (_BYTE_ARRAY, None, False))
+            columns[name] = ColumnStatistics(
+                min=_decode_statistic(statistics.get(6, statistics.get(2)), leaf),
+                max=_decode_statistic(statistics.get(5, statistics.get(1)), leaf),
+                null_count=statistics.get(3),
+            )
+        row_groups.append(RowGroupMetadata(num_rows=row_group[3], size_bytes=row_group[2], columns=columns))
+
+    created_by = file_metadata.get(6)
+    return ParquetMetadata(
+        num_rows=file_metadata.get(3, 0),
+        row_groups=row_groups,
+        created_by=created_by.decode() if created_by is not None else None,
+    )
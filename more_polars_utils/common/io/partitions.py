@@ -0,0 +1,75 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import polars as pl
+
+
+def summarise_partitions(path: str, file_sizes: Dict[str, int]) -> pl.DataFrame:
+    """
+    Group file sizes by the partition directory they belong to
+
+    :param path: The root directory of the dataset
+    :param file_sizes: Mapping of file path to size in bytes
+    :return: A dataframe with `partition`, `file_count` and `size_bytes` columns, sorted by partition
+    """
+
+    prefix_length = len(path.rstrip("/")) + 1
+    partitions = [
+        file_path[prefix_length:].rpartition("/")[0]
+        for file_path in file_sizes
+    ]
+
+    return (
+        pl.DataFrame(
+            {
+                "partition": partitions,
+                "size_bytes": list(file_sizes.values()),
+            },
+            schema={"partition": pl.Utf8, "size_bytes": pl.Int64},
+        )
+        .group_by("partition")
+        .agg(
+            pl.len().cast(pl.Int64).alias("file_count"),
+            pl.col("size_bytes").sum(),
+        )
+        .sort("partition")
+    )
+
+
+# Directory name used by hive for null partition values
+HIVE_NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def hive_value(value) -> str:
+    return HIVE_NULL_PARTITION if value is None else f"{value}"
+
+
+def hive_directory(partition_by: List[str], values: Tuple) -> str:
+    return "/".join(f"{column}={hive_value(value)}" for column, value in zip(partition_by, values))
+
+
+def split_files(
+        df: pl.DataFrame,
+        partition_by: Optional[List[str]] = None,
+        max_rows_per_file: Optional[int] = None) -> Iterator[Tuple[str, pl.DataFrame]]:
+    """
+    Split a dataframe into the files of a hive-partitioned dataset
+
+    :param df: The dataframe
+    :param partition_by: Columns to partition by, they are encoded in the directory names and dropped from the files
+    :param max_rows_per_file: The maximum number of rows in each file
+    :return: Pairs of file path, relative to the dataset root, and the rows of that file. An empty
+        dataframe is a single empty file at the root, keeping the partition columns in its schema.
+    """
+
+    partition_by = list(partition_by) if partition_by else []
+    groups = df.partition_by(partition_by, as_dict=True, include_key=False) if partition_by else {}
+    if not groups:
+        groups = {(): df}
+
+    for key, group in groups.items():
+        directory = hive_directory(partition_by, key if isinstance(key, tuple) else (key,))
+        rows_per_file = max_rows_per_file or max(group.height, 1)
+        for index, offset in enumerate(range(0, max(group.height, 1), rows_per_file)):
+            file_name = f"part-{index:05d}.parquet"
+            relative_path = f"{directory}/{file_name}" if directory else file_name
+            yield relative_path, group.slice(offset, rows_per_file)
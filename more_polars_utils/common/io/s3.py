@@ -1,34 +1,206 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from io import BytesIO
+from typing import Callable, Optional, Union, Dict, Tuple, List
 
 import polars as pl
+from polars.type_aliases import IpcCompression
 import s3fs  # type: ignore
+from fsspec.asyn import AsyncFileSystem  # type: ignore
 
-S3_FILESYSTEM = s3fs.S3FileSystem()
+from more_polars_utils.common.io.partitions import summarise_partitions, split_files
+from more_polars_utils.common.io.streaming import sink_parquet, sink_ipc
+
+# Created on first use, unless a filesystem is injected with `set_filesystem`
+S3_FILESYSTEM: Optional[s3fs.S3FileSystem] = None
+
+_FILESYSTEM_LOCK = threading.Lock()
+
+# Object metadata is cached for this many seconds, writes through this module invalidate it immediately
+METADATA_CACHE_TTL_SECONDS = 30.0
+
+# Maps a path (without protocol) to its expiry time and its info, or None if the object does not exist
+_METADATA_CACHE: Dict[str, Tuple[float, Optional[dict]]] = {}
+
+# Maps a prefix to the expiry time of a complete recursive listing of it
+_LISTED_PREFIXES: Dict[str, float] = {}
+
+_METADATA_LOCK = threading.Lock()
+
+# The number of sub-prefixes listed concurrently by recursive listings
+LISTING_CONCURRENCY = 16
+
+# The number of objects uploaded concurrently
+UPLOAD_CONCURRENCY = 8
+
+
+def _filesystem() -> s3fs.S3FileSystem:
+    global S3_FILESYSTEM
+    if S3_FILESYSTEM is None:
+        with _FILESYSTEM_LOCK:
+            if S3_FILESYSTEM is None:
+                S3_FILESYSTEM = s3fs.S3FileSystem()
+    return S3_FILESYSTEM
+
+
+def set_filesystem(filesystem: s3fs.S3FileSystem):
+    """
+    Use a pre-configured filesystem for every S3 path, instead of a default `s3fs.S3FileSystem()`
+    """
+
+    global S3_FILESYSTEM
+    S3_FILESYSTEM = filesystem
+    invalidate_metadata()
 
 
 def is_s3_path(path: str) -> bool:
     return path.startswith("s3://") or path.startswith("s3a://")
 
 
+def _metadata_key(path: str) -> str:
+    return _filesystem()._strip_protocol(path).rstrip("/")
+
+
+def _is_listed(key: str, now: float) -> bool:
+    return any(
+        expiry > now and (key == prefix or key.startswith(prefix + "/"))
+        for prefix, expiry in _LISTED_PREFIXES.items()
+    )
+
+
+def _lookup_info(key: str, now: float) -> Tuple[bool, Optional[dict]]:
+    with _METADATA_LOCK:
+        entry = _METADATA_CACHE.get(key)
+        if entry is not None and entry[0] > now:
+            return True, entry[1]
+        if _is_listed(key, now):
+            # A fresh listing of a parent prefix did not contain this path
+            return True, None
+    return False, None
+
+
+def _store_info(key: str, now: float, info: Optional[dict]):
+    with _METADATA_LOCK:
+        _METADATA_CACHE[key] = (now + METADATA_CACHE_TTL_SECONDS, info)
+
+
+def _cached_info(path: str) -> Optional[dict]:
+    key = _metadata_key(path)
+    now = time.monotonic()
+    cached, info = _lookup_info(key, now)
+    if cached:
+        return info
+
+    try:
+        info = _filesystem().info(path)
+    except FileNotFoundError:
+        info = None
+
+    _store_info(key, now, info)
+    return info
+
+
+def _store_listing(path: str, listing: Dict[str, dict]):
+    expiry = time.monotonic() + METADATA_CACHE_TTL_SECONDS
+    with _METADATA_LOCK:
+        for name, info in listing.items():
+            _METADATA_CACHE[name.rstrip("/")] = (expiry, info)
+        _LISTED_PREFIXES[_metadata_key(path)] = expiry
+
+
+def prefetch_metadata(path: str):
+    """
+    Cache the metadata of every object under a prefix with a single recursive listing
+
+    Until the cache expires, existence and timestamp checks under the prefix are answered
+    without a request per object.
+
+    :param path: The S3 prefix to list
+    """
+
+    _store_listing(path, _filesystem().find(path, withdirs=True, detail=True))
+
+
+def invalidate_metadata(path: Optional[str] = None):
+    """
+    Drop cached metadata for a path and the listings that contain it, or for everything if no path is given
+    """
+
+    with _METADATA_LOCK:
+        if path is None:
+            _METADATA_CACHE.clear()
+            _LISTED_PREFIXES.clear()
+            return
+
+        key = _metadata_key(path)
+        for cached_key in list(_METADATA_CACHE):
+            if cached_key == key or cached_key.startswith(key + "/") or key.startswith(cached_key + "/"):
+                del _METADATA_CACHE[cached_key]
+        for prefix in list(_LISTED_PREFIXES):
+            if key == prefix or key.startswith(prefix + "/"):
+                del _LISTED_PREFIXES[prefix]
+
+
 def file_exists(path: str) -> bool:
-    return S3_FILESYSTEM.exists(path)
+    return _cached_info(path) is not None
 
 
 def is_directory(path: str) -> bool:
-    return S3_FILESYSTEM.isdir(path)
+    info = _cached_info(path)
+    return info is not None and info.get("type") == "directory"
 
 
 def make_directories(path: str, *args, **kwargs):
-    S3_FILESYSTEM.makedirs(path, *args, **kwargs)
+    _filesystem().makedirs(path, *args, **kwargs)
+    invalidate_metadata(path)
 
 
 def file_last_modified(path: str) -> datetime:
-    assert (file_exists(path))
-    file_info = S3_FILESYSTEM.info(path)
+    file_info = _cached_info(path)
+    assert (file_info is not None)
     return file_info["LastModified"]
 
 
+def _list_files(path: str) -> Dict[str, dict]:
+    """
+    Recursively list the objects under a prefix, including their sizes, without a request per object
+
+    The top level is listed first, then each sub-prefix is paged through concurrently.
+    """
+
+    top_level = _filesystem().ls(path, detail=True)
+    files = {entry["name"]: entry for entry in top_level if entry["type"] != "directory"}
+    sub_prefixes = [entry["name"] for entry in top_level if entry["type"] == "directory"]
+
+    with ThreadPoolExecutor(max_workers=LISTING_CONCURRENCY) as executor:
+        for listing in executor.map(lambda prefix: _filesystem().find(prefix, detail=True), sub_prefixes):
+            files.update(listing)
+
+    expiry = time.monotonic() + METADATA_CACHE_TTL_SECONDS
+    with _METADATA_LOCK:
+        for name, info in files.items():
+            _METADATA_CACHE[name] = (expiry, info)
+
+    return files
+
+
+def _relevant_files(path: str, files: Dict[str, dict], file_extension: str, s3_protocol: str) -> Dict[str, int]:
+    return {
+        f"{s3_protocol}{name}": info.get("size", 0)
+        for name, info in files.items()
+        if info.get("type") != "directory" and name.endswith(file_extension) and f"{s3_protocol}{name}" != path
+    }
+
+
+def _list_relevant_files(path: str, file_extension: str, s3_protocol: str = "s3://") -> Dict[str, int]:
+    return _relevant_files(path, _list_files(path), file_extension, s3_protocol)
+
+
 def list_nested_partitions(path: str, file_extension="parquet", s3_protocol="s3://") -> list[str]:
     """
     Lists all `.parquet` files in a given S3 directory, including those in nested directories.
@@ -40,52 +212,416 @@ def list_nested_partitions(path: str, file_extension="parquet", s3_protocol="s3:
     list: A list of `.parquet` file paths.
     """
 
-    # Ensure the S3 directory ends with a slash (for directory context)
-    dir_path = path if path.endswith('/') else path + '/'
+    return list(_list_relevant_files(path, file_extension, s3_protocol))
 
-    # List all files and directories in the given S3 directory and its subdirectories
-    all_files = S3_FILESYSTEM.glob(dir_path + '**')  # '**' allows for recursive search in subdirectories
 
-    # Filter files based on the file extension
-    relevant_files = [
-        f"{s3_protocol}{f}"
-        for f in all_files
-        if f.endswith(file_extension) and f"{s3_protocol}{f}" != path
-    ]
+def _upload(write: Callable[[str], None], path: str):
+    # Objects are written to a local file by `write`, then uploaded from disk, so the encoded data is
+    # never held in memory next to the dataframe. Large files are uploaded as multipart by put_file.
+    with tempfile.TemporaryDirectory() as staging_dir:
+        staging_path = os.path.join(staging_dir, "staged")
+        write(staging_path)
+        _filesystem().put_file(staging_path, path)
 
-    return relevant_files
 
+def _upload_parquet(df: pl.DataFrame, path: str, *args, **kwargs):
+    _upload(lambda staging_path: df.write_parquet(staging_path, *args, **kwargs), path)
 
-def write_parquet(df: pl.DataFrame, path: str, *args, **kwargs):
-    with S3_FILESYSTEM.open(path, "wb") as f:
-        df.write_parquet(f, *args, **kwargs)
+
+def write_parquet(
+        df: Union[pl.DataFrame, pl.LazyFrame],
+        path: str,
+        *args,
+        partition_by: Optional[List[str]] = None,
+        max_rows_per_file: Optional[int] = None,
+        **kwargs):
+    """
+    Write a dataframe to a parquet object, or to a hive-partitioned prefix
+
+    Parameters:
+    df (pl.DataFrame): The dataframe, a LazyFrame is streamed to a local file when written to a single object
+    path (str): The object, or the dataset prefix when partitioning
+    partition_by (list): Columns to partition by, written as `column=value` prefixes
+    max_rows_per_file (int): Split the data into objects of at most this many rows
+    """
+
+    if partition_by or max_rows_per_file:
+        if isinstance(df, pl.LazyFrame):
+            df = df.collect(streaming=True)
+
+        # The dataset replaces anything previously written under the prefix
+        remove(path)
+
+        files = split_files(df, partition_by, max_rows_per_file)
+        with ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY) as executor:
+            uploads = [
+                executor.submit(_upload_parquet, file_df, f"{path}/{relative_path}", *args, **kwargs)
+                for relative_path, file_df in files
+            ]
+            for upload in uploads:
+                upload.result()
+    elif isinstance(df, pl.LazyFrame):
+        # Polars cannot sink directly to S3, so stream to a local file and upload it
+        _upload(lambda staging_path: sink_parquet(df, staging_path, *args, **kwargs), path)
+    else:
+        _upload_parquet(df, path, *args, **kwargs)
+    invalidate_metadata(path)
 
 
 def write_csv(df: pl.DataFrame, path: str, *args, **kwargs):
-    with S3_FILESYSTEM.open(path, "wb") as f:
+    with _filesystem().open(path, "wb") as f:
         df.write_csv(f, *args, **kwargs)
+    invalidate_metadata(path)
 
 
-def read_parquet(path: str, *args, **kwargs) -> pl.DataFrame:
-    assert (file_exists(path))
+def remove(path: str):
+    if file_exists(path):
+        _filesystem().rm(path, recursive=True)
+    invalidate_metadata(path)
+
+
+def replace(source: str, destination: str):
+    """
+    Publish a staged object or prefix to its final path with server-side copies
+
+    A single object is replaced atomically. A prefix is not: its objects are copied one by one, then
+    objects of the previous dataset that are not part of the new one are removed. Until then, readers
+    listing the prefix may see a mix of previous and new objects, though never a partial object.
+    """
+
+    if is_directory(source):
+        source_key = _metadata_key(source)
+        destination_key = _metadata_key(destination)
+        staged = [name[len(source_key):] for name in _list_files(source)]
+        previous = []
+        if is_directory(destination):
+            previous = [name[len(destination_key):] for name in _list_files(destination)]
+        elif file_exists(destination):
+            _filesystem().rm(destination)
+
+        with ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY) as executor:
+            copies = [
+                executor.submit(_filesystem().copy, f"{source_key}{name}", f"{destination_key}{name}")
+                for name in staged
+            ]
+            for copy in copies:
+                copy.result()
+
+        stale = [f"{destination_key}{name}" for name in set(previous) - set(staged)]
+        if stale:
+            _filesystem().rm(stale)
+    else:
+        if is_directory(destination):
+            _filesystem().rm(destination, recursive=True)
+        _filesystem().copy(source, destination)
+
+    remove(source)
+    invalidate_metadata(destination)
+
+
+def read_text(path: str) -> str:
+    with _filesystem().open(path, "r") as f:
+        return f.read()
+
+
+def write_text(text: str, path: str):
+    with _filesystem().open(path, "w") as f:
+        f.write(text)
+    invalidate_metadata(path)
+
+
+def remove_empty_directory(path: str):
+    # Prefixes exist only while they hold objects
+    invalidate_metadata(path)
+
+
+def parquet_footer(path: str) -> bytes:
+    """
+    Read the raw footer of a parquet object with ranged reads, without reading any data pages
+    """
+
+    with _filesystem().open(path, "rb", block_size=64 * 1024) as f:
+        f.seek(-8, os.SEEK_END)
+        footer_length = int.from_bytes(f.read(4), "little")
+        f.seek(-(8 + footer_length), os.SEEK_END)
+        return f.read(footer_length)
+
+
+def storage_options() -> Dict[str, str]:
+    """
+    Polars `storage_options` derived from the configuration of the S3 filesystem
+
+    Keeps the credentials used by Polars' native cloud reader in step with the ones used by s3fs.
+    Options that are not set explicitly are left to the default AWS credential chain.
+    """
+
+    filesystem = _filesystem()
+    client_kwargs = getattr(filesystem, "client_kwargs", None) or {}
+    options = {
+        "aws_access_key_id": getattr(filesystem, "key", None),
+        "aws_secret_access_key": getattr(filesystem, "secret", None),
+        "aws_session_token": getattr(filesystem, "token", None),
+        "aws_region": client_kwargs.get("region_name"),
+        "aws_endpoint_url": getattr(filesystem, "endpoint_url", None) or client_kwargs.get("endpoint_url"),
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def _parquet_source(path: str) -> str:
     if is_directory(path):
         formatted_path = str(path)[:-1] if str(path).endswith('/') else str(path)
-        return pl.read_parquet(f"{formatted_path}/**/*.parquet", *args, **kwargs)
+        return f"{formatted_path}/**/*.parquet"
+    return path
+
+
+def scan_parquet(path: str, *args, **kwargs) -> pl.LazyFrame:
+    """
+    Lazily scan a parquet object or hive-partitioned prefix with Polars' native cloud reader
+
+    Hive partition columns are kept, and projections and predicates are pushed down to skip
+    partitions and row groups, so only the required byte ranges are fetched.
+    """
+
+    assert (file_exists(path))
+    kwargs.setdefault("hive_partitioning", True)
+    kwargs.setdefault("storage_options", storage_options())
+    return pl.scan_parquet(_parquet_source(path), *args, **kwargs)
+
+
+# Arguments of pl.read_parquet that pl.scan_parquet does not accept
+EAGER_READ_ARGUMENTS = {"use_pyarrow", "pyarrow_options", "memory_map"}
+
+
+def read_parquet(
+        path: str,
+        *args,
+        columns: Optional[List[str]] = None,
+        filters: Optional[pl.Expr] = None,
+        **kwargs) -> pl.DataFrame:
+    """
+    Read a parquet object or hive-partitioned prefix, reading only the requested columns and matching rows
+
+    Other arguments are passed to `pl.scan_parquet`, or to `pl.read_parquet` when they include any
+    that only the eager reader accepts, such as `use_pyarrow` or `memory_map`.
+
+    Parameters:
+    path (str): The S3 object or prefix
+    columns (list): Optional columns to read
+    filters (pl.Expr): Optional predicate, used to prune partitions and row groups
+
+    Returns:
+    pl.DataFrame: The data
+    """
+
+    if args or EAGER_READ_ARGUMENTS.intersection(kwargs):
+        assert (file_exists(path))
+        kwargs.setdefault("storage_options", storage_options())
+        lf = pl.read_parquet(_parquet_source(path), *args, **kwargs).lazy()
     else:
-        return pl.read_parquet(path, *args, **kwargs)
+        lf = scan_parquet(path, **kwargs)
+    if filters is not None:
+        lf = lf.filter(filters)
+    if columns is not None:
+        lf = lf.select(columns)
+    return lf.collect()
 
 
-def parquet_file_size(path: str, file_extension: str = "parquet", **kwargs) -> Optional[int]:
+def scan_ipc(path: str, *args, **kwargs) -> pl.LazyFrame:
     assert (file_exists(path))
+    kwargs.setdefault("storage_options", storage_options())
+    return pl.scan_ipc(path, *args, **kwargs)
 
-    if is_directory(path):
-        partitions = list_nested_partitions(path=path, file_extension=file_extension, **kwargs)
+
+def read_ipc(path: str, columns: Optional[List[str]] = None, **kwargs) -> pl.DataFrame:
+    """
+    Read an Arrow IPC object, in a single request since objects cannot be memory-mapped
+    """
+
+    assert (file_exists(path))
+    kwargs.setdefault("memory_map", False)
+    with _filesystem().open(path, "rb") as f:
+        return pl.read_ipc(f.read(), columns=columns, **kwargs)
+
+
+def write_ipc(df: Union[pl.DataFrame, pl.LazyFrame], path: str, compression: IpcCompression = "uncompressed"):
+    if isinstance(df, pl.LazyFrame):
+        lf = df
+        _upload(lambda staging_path: sink_ipc(lf, staging_path, compression), path)
+    else:
+        _upload(lambda staging_path: df.write_ipc(staging_path, compression=compression), path)
+    invalidate_metadata(path)
+
+
+def parquet_file_size(path: str, file_extension: str = "parquet", **kwargs) -> Optional[int]:
+    info = _cached_info(path)
+    assert (info is not None)
+
+    if info.get("type") == "directory":
+        return sum(_list_relevant_files(path, file_extension, **kwargs).values())
+    else:
+        return info.get("size", 0)
+
+
+def file_sizes(path: str, file_extension: str = "parquet", s3_protocol="s3://") -> Dict[str, int]:
+    info = _cached_info(path)
+    assert (info is not None)
+
+    if info.get("type") == "directory":
+        return _list_relevant_files(path, file_extension, s3_protocol)
+    return {path: info.get("size", 0)}
+
+
+def partition_sizes(path: str, file_extension: str = "parquet", s3_protocol="s3://") -> pl.DataFrame:
+    """
+    Summarise the files of a partitioned dataset from a single listing
+
+    Parameters:
+    path (str): The S3 directory of the dataset (e.g., 's3://bucket-name/path/to/dataset')
+
+    Returns:
+    pl.DataFrame: One row per partition directory, relative to `path`, with `file_count` and `size_bytes`.
+    """
+
+    files = _list_relevant_files(path, file_extension, s3_protocol)
+    return summarise_partitions(path, files)
+
+
+async def _call_async(method: str, *args, **kwargs):
+    """
+    Await a filesystem call without blocking the event loop
+
+    s3fs is an fsspec async filesystem, so its coroutines run on the filesystem's own IO loop and
+    share its connection pool with the synchronous API. Filesystems without async support are
+    called from a worker thread.
+    """
+
+    filesystem = _filesystem()
+    if not isinstance(filesystem, AsyncFileSystem):
+        return await asyncio.to_thread(getattr(filesystem, method), *args, **kwargs)
+
+    coroutine = getattr(filesystem, f"_{method}")(*args, **kwargs)
+    if filesystem.asynchronous:
+        return await coroutine
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, filesystem.loop))
+
+
+async def _acached_info(path: str) -> Optional[dict]:
+    key = _metadata_key(path)
+    now = time.monotonic()
+    cached, info = _lookup_info(key, now)
+    if cached:
+        return info
+
+    try:
+        info = await _call_async("info", path)
+    except FileNotFoundError:
+        info = None
+
+    _store_info(key, now, info)
+    return info
+
+
+async def afile_exists(path: str) -> bool:
+    return await _acached_info(path) is not None
+
+
+async def ais_directory(path: str) -> bool:
+    info = await _acached_info(path)
+    return info is not None and info.get("type") == "directory"
+
+
+async def afile_last_modified(path: str) -> datetime:
+    file_info = await _acached_info(path)
+    assert (file_info is not None)
+    return file_info["LastModified"]
+
+
+async def _alist_relevant_files(path: str, file_extension: str, s3_protocol: str = "s3://") -> Dict[str, int]:
+    listing = await _call_async("find", path, withdirs=True, detail=True)
+    _store_listing(path, listing)
+    return _relevant_files(path, listing, file_extension, s3_protocol)
+
+
+async def alist_nested_partitions(path: str, file_extension="parquet", s3_protocol="s3://") -> list[str]:
+    return list(await _alist_relevant_files(path, file_extension, s3_protocol))
+
+
+async def aparquet_file_size(path: str, file_extension: str = "parquet", **kwargs) -> Optional[int]:
+    info = await _acached_info(path)
+    assert (info is not None)
+
+    if info.get("type") == "directory":
+        return sum((await _alist_relevant_files(path, file_extension, **kwargs)).values())
     else:
-        partitions = [path]
+        return info.get("size", 0)
+
+
+async def aread_parquet(
+        path: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[pl.Expr] = None,
+        **kwargs) -> pl.DataFrame:
+    """
+    Read a parquet object or hive-partitioned prefix without blocking the event loop
+
+    A single object is downloaded with one async request and decoded in a worker thread. A prefix
+    is read in a worker thread by Polars' native reader, which keeps hive partitioning and pushdown.
+    """
+
+    if await _acached_info(path) is None:
+        raise FileNotFoundError(path)
+    if await ais_directory(path):
+        return await asyncio.to_thread(read_parquet, path, columns=columns, filters=filters, **kwargs)
+
+    data = await _call_async("cat_file", path)
+
+    def decode() -> pl.DataFrame:
+        lf = pl.read_parquet(BytesIO(data), **kwargs).lazy()
+        if filters is not None:
+            lf = lf.filter(filters)
+        if columns is not None:
+            lf = lf.select(columns)
+        return lf.collect()
+
+    return await asyncio.to_thread(decode)
+
+
+async def awrite_parquet(
+        df: Union[pl.DataFrame, pl.LazyFrame],
+        path: str,
+        *args,
+        partition_by: Optional[List[str]] = None,
+        max_rows_per_file: Optional[int] = None,
+        **kwargs):
+    """
+    Write a dataframe to a parquet object, or to a hive-partitioned prefix, without blocking the event loop
+
+    Files are encoded to local files in worker threads and uploaded with async requests, at most
+    `UPLOAD_CONCURRENCY` at a time.
+    """
+
+    if isinstance(df, pl.LazyFrame):
+        df = await asyncio.to_thread(df.collect, streaming=True)
+
+    if partition_by or max_rows_per_file:
+        # The dataset replaces anything previously written under the prefix
+        if await afile_exists(path):
+            await _call_async("rm", path, recursive=True)
+        files = list(split_files(df, partition_by, max_rows_per_file))
+    else:
+        files = [("", df)]
+
+    uploads = asyncio.Semaphore(UPLOAD_CONCURRENCY)
 
-    partition_sizes = [
-        S3_FILESYSTEM.info(partition).get("size", 0)
-        for partition in partitions
-    ]
+    async def upload(relative_path: str, file_df: pl.DataFrame):
+        async with uploads:
+            file_path = f"{path}/{relative_path}" if relative_path else path
+            with tempfile.TemporaryDirectory() as staging_dir:
+                staging_path = os.path.join(staging_dir, "staged")
+                await asyncio.to_thread(file_df.write_parquet, staging_path, *args, **kwargs)
+                await _call_async("put_file", staging_path, file_path)
 
-    return sum(partition_sizes)
+    try:
+        await asyncio.gather(*(upload(relative_path, file_df) for relative_path, file_df in files))
+    finally:
+        invalidate_metadata(path)
@@ -0,0 +1,34 @@
+import polars as pl
+from polars.type_aliases import IpcCompression
+
+
+def sink_parquet(lf: pl.LazyFrame, path: str, *args, **kwargs):
+    """
+    Stream the results of a query to a local parquet file without collecting them in memory
+
+    Queries the streaming engine cannot sink, such as cumulative sums, window expressions or
+    order-preserving `unique`, are collected with the streaming engine where it applies, then written.
+
+    :param lf: The query
+    :param path: The local file
+    """
+
+    try:
+        lf.sink_parquet(path, *args, **kwargs)
+    except pl.exceptions.InvalidOperationError:
+        lf.collect(streaming=True).write_parquet(path, *args, **kwargs)
+
+
+def sink_ipc(lf: pl.LazyFrame, path: str, compression: IpcCompression = "uncompressed"):
+    """
+    Stream the results of a query to a local Arrow IPC file, collecting them first if they cannot be streamed
+
+    :param lf: The query
+    :param path: The local file
+    :param compression: "uncompressed", "lz4" or "zstd"
+    """
+
+    try:
+        lf.sink_ipc(path, compression=None if compression == "uncompressed" else compression)
+    except pl.exceptions.InvalidOperationError:
+        lf.collect(streaming=True).write_ipc(path, compression=compression)
@@ -0,0 +1,144 @@
+import importlib
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import polars as pl
+
+from more_polars_utils.common.io import make_directories, read_ipc, write_ipc, remove
+
+
+@dataclass(frozen=True)
+class _FrameReference:
+    # A dataframe argument, passed to the worker as the path of an Arrow IPC file
+    path: str
+    lazy: bool
+
+
+@dataclass(frozen=True)
+class _ObjectReference:
+    # A module-level object, resolved by importing its module in the worker
+    module: str
+    qualname: str
+
+    def resolve(self) -> Any:
+        target: Any = importlib.import_module(self.module)
+        for name in self.qualname.split("."):
+            target = getattr(target, name)
+        return target
+
+
+class ProcessPool:
+    """
+    A pool of worker processes shared by every asset that materializes out of process
+
+    Workers are started with the "spawn" method, since forking a process that has already
+    started Polars' thread pool can deadlock. The pool is created on first use and reused,
+    so independent assets built concurrently run on separate cores.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def configure(self, max_workers: Optional[int]):
+        """
+        Change the number of workers, shutting down the current workers once their tasks finish
+        """
+
+        self.shutdown()
+        self.max_workers = max_workers
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def run(self, func: Callable, args: tuple, kwargs: dict, exchange_path: str) -> pl.DataFrame:
+        """
+        Call `func` in a worker process, exchanging dataframes as Arrow IPC files
+
+        Dataframe and LazyFrame arguments are written to `exchange_path` and memory-mapped by the
+        worker, and the result is written back the same way, so no dataframe is pickled. Other
+        arguments are pickled as usual. `func` must be importable by the worker, such as a
+        module-level function, a module-level asset or a picklable asset instance.
+
+        :param func: The function to call
+        :param args: Positional arguments
+        :param kwargs: Keyword arguments
+        :param exchange_path: A directory for the exchanged files, removed afterwards
+        :return: The result, collected if `func` returned a LazyFrame
+        """
+
+        make_directories(exchange_path, exist_ok=True)
+        try:
+            worker_args = tuple(_to_worker(value, f"{exchange_path}/arg-{index}.arrow") for index, value in enumerate(args))
+            worker_kwargs = {key: _to_worker(value, f"{exchange_path}/kwarg-{key}.arrow") for key, value in kwargs.items()}
+            output_path = f"{exchange_path}/output.arrow"
+
+            self.executor().submit(_run, _callable_reference(func), worker_args, worker_kwargs, output_path).result()
+
+            # Read into memory rather than memory-mapping, since the exchange files are removed below
+            return read_ipc(output_path, memory_map=False)
+        finally:
+            remove(exchange_path)
+
+
+PROCESS_POOL = ProcessPool()
+
+
+def exchange_directory(scratch_path: str, name: str) -> str:
+    return f"{scratch_path}/_exchange/{name}-{uuid.uuid4().hex}"
+
+
+def _callable_reference(func: Callable) -> Any:
+    # Decorated assets replace their function in its module, so the function itself cannot be
+    # pickled by name. Send the name of the asset instead, and call its `materialize` in the worker.
+    module = getattr(func, "__module__", None)
+    qualname = getattr(func, "__qualname__", "")
+    if module is not None and "<locals>" not in qualname and "<lambda>" not in qualname:
+        try:
+            target = _ObjectReference(module, qualname).resolve()
+        except (ImportError, AttributeError):
+            return func
+        if getattr(target, "func", None) is func:
+            return _ObjectReference(module, qualname)
+    return func
+
+
+def _to_worker(value: Any, path: str) -> Any:
+    if isinstance(value, (pl.DataFrame, pl.LazyFrame)):
+        # LazyFrames are collected rather than streamed, since not every plan can be sunk
+        write_ipc(value.collect() if isinstance(value, pl.LazyFrame) else value, path)
+        return _FrameReference(path, lazy=isinstance(value, pl.LazyFrame))
+    return value
+
+
+def _from_worker(value: Any) -> Any:
+    if isinstance(value, _FrameReference):
+        df = read_ipc(value.path)
+        return df.lazy() if value.lazy else df
+    return value
+
+
+def _run(target: Any, args: Tuple, kwargs: Dict[str, Any], output_path: str):
+    if isinstance(target, _ObjectReference):
+        target = target.resolve()
+    func = target.materialize if hasattr(target, "materialize") else target
+
+    df = func(*(_from_worker(value) for value in args), **{key: _from_worker(value) for key, value in kwargs.items()})
+    write_ipc(df.collect() if isinstance(df, pl.LazyFrame) else df, output_path)
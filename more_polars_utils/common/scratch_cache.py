@@ -0,0 +1,165 @@
+import json
+import threading
+from datetime import datetime, timezone
+from typing import Collection, Dict, List, Optional
+
+import polars as pl
+
+from more_polars_utils.common.catalog import CatalogEntry, read_catalog_directory
+from more_polars_utils.common.io import file_exists, read_text, write_text, remove, staged_write
+
+
+class ScratchCache:
+    """
+    LRU byte budget for the temporary assets written to a project's scratch path
+
+    Assets are found through their catalog entries, so only assets written with a catalog are
+    managed. Accesses are recorded in memory and saved to `_scratch_access.json` in the scratch
+    path whenever the cache is enforced, so that other processes evict by the same recency.
+    Assets never accessed are ordered by when they were written. A budget of 0 disables eviction.
+    """
+
+    def __init__(self, max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._accessed: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def touch(self, path: str):
+        """
+        Record an access of the asset data at `path`
+        """
+
+        with self._lock:
+            self._accessed[path] = datetime.now(timezone.utc)
+
+    @staticmethod
+    def _access_path(scratch_path: str) -> str:
+        return f"{scratch_path}/_scratch_access.json"
+
+    def _last_accessed(self, scratch_path: str) -> Dict[str, datetime]:
+        accessed: Dict[str, datetime] = {}
+        access_path = self._access_path(scratch_path)
+        if file_exists(access_path):
+            try:
+                accessed = {path: datetime.fromisoformat(value) for path, value in json.loads(read_text(access_path)).items()}
+            except (json.JSONDecodeError, TypeError, ValueError):
+                accessed = {}
+
+        with self._lock:
+            for path, value in self._accessed.items():
+                if path not in accessed or value > accessed[path]:
+                    accessed[path] = value
+        return accessed
+
+    def _save_accessed(self, scratch_path: str, accessed: Dict[str, datetime]):
+        with staged_write(self._access_path(scratch_path)) as staging_path:
+            write_text(json.dumps({path: value.isoformat() for path, value in accessed.items()}), staging_path)
+
+    def usage(self, scratch_path: str, registered: Optional[Collection[str]] = None) -> pl.DataFrame:
+        """
+        The assets in a scratch path, least recently used first
+
+        :param scratch_path: The scratch path
+        :param registered: The data paths of the registered assets, to flag the rest
+        :return: One row per asset with its size, last access time and whether it is registered
+        """
+
+        accessed = self._last_accessed(scratch_path)
+        entries = _entries_by_recency(read_catalog_directory(scratch_path), accessed)
+        return pl.DataFrame(
+            [
+                {
+                    "asset_name": entry.asset_name,
+                    "path": entry.path,
+                    "size_bytes": entry.size_bytes,
+                    "last_accessed": _recency(entry, accessed),
+                    "registered": registered is None or _is_registered(entry.path, registered),
+                }
+                for _, entry in entries
+            ],
+            schema={
+                "asset_name": pl.Utf8,
+                "path": pl.Utf8,
+                "size_bytes": pl.Int64,
+                "last_accessed": pl.Datetime("us", "UTC"),
+                "registered": pl.Boolean,
+            },
+        )
+
+    def evict(self, scratch_path: str, max_bytes: Optional[int] = None, keep: Collection[str] = ()) -> List[str]:
+        """
+        Remove the least recently used assets until the scratch path fits in the budget
+
+        :param scratch_path: The scratch path
+        :param max_bytes: The budget, defaults to `max_bytes`
+        :param keep: Data paths that are never evicted, such as the asset being written
+        :return: The data paths of the evicted assets
+        """
+
+        budget = max_bytes if max_bytes is not None else self.max_bytes
+        accessed = self._last_accessed(scratch_path)
+        entries = _entries_by_recency(read_catalog_directory(scratch_path), accessed)
+
+        size_bytes = sum(entry.size_bytes for _, entry in entries)
+        evicted = []
+        for catalog_file, entry in entries:
+            if size_bytes <= budget:
+                break
+            if entry.path in keep:
+                continue
+            _remove_asset(catalog_file, entry)
+            size_bytes -= entry.size_bytes
+            evicted.append(entry.path)
+
+        with self._lock:
+            self.evictions += len(evicted)
+            for path in evicted:
+                self._accessed.pop(path, None)
+        self._save_accessed(scratch_path, {path: value for path, value in accessed.items() if path not in evicted})
+        return evicted
+
+    def remove_unregistered(self, scratch_path: str, registered: Collection[str]) -> List[str]:
+        """
+        Remove the assets in a scratch path whose data path, or directory, is not in `registered`
+
+        :return: The data paths of the removed assets
+        """
+
+        removed = []
+        for catalog_file, entry in read_catalog_directory(scratch_path).items():
+            if not _is_registered(entry.path, registered):
+                _remove_asset(catalog_file, entry)
+                removed.append(entry.path)
+
+        with self._lock:
+            for path in removed:
+                self._accessed.pop(path, None)
+        return removed
+
+
+SCRATCH_CACHE = ScratchCache()
+
+
+def _is_registered(path: str, registered: Collection[str]) -> bool:
+    return path in registered or path.rsplit("/", 1)[0] in registered
+
+
+def _recency(entry: CatalogEntry, accessed: Dict[str, datetime]) -> datetime:
+    written_at = datetime.fromisoformat(entry.written_at)
+    return max(accessed.get(entry.path, written_at), written_at)
+
+
+def _entries_by_recency(entries: Dict[str, CatalogEntry], accessed: Dict[str, datetime]) -> List[tuple]:
+    return sorted(entries.items(), key=lambda item: _recency(item[1], accessed))
+
+
+def _remove_asset(catalog_file: str, entry: CatalogEntry):
+    # The data goes first, so that an interrupted removal is seen as a missing asset
+    remove(entry.path)
+    remove(f"{entry.path}.manifest.json")
+    remove(catalog_file)
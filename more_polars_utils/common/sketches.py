@@ -0,0 +1,120 @@
+import math
+from typing import Optional
+
+import polars as pl
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitters sketch over chunks of pre-aggregated counts
+
+    Keeps at most `capacity` counters. Each counter's `count` is an upper bound of the true count
+    and `error` bounds the overestimate, so the true count lies in [count - error, count].
+    Any value without a counter occurred at most `threshold` times.
+    """
+
+    def __init__(self, capacity: int, value_dtype: Optional[pl.PolarsDataType] = None):
+        self.capacity = capacity
+        self.threshold = 0
+        self.counters = pl.DataFrame(
+            schema={"value": value_dtype or pl.Null, "count": pl.Int64, "error": pl.Int64}
+        )
+
+    def update(self, counts: pl.DataFrame):
+        """
+        Merge exact counts of a chunk into the sketch
+
+        :param counts: A dataframe with `value` and `count` columns, one row per distinct value
+        """
+
+        chunk = counts.select(
+            pl.col("value"),
+            pl.col("count").cast(pl.Int64).alias("chunk_count"),
+        )
+        if self.counters.schema["value"] == pl.Null:
+            self.counters = self.counters.with_columns(pl.col("value").cast(chunk.schema["value"]))
+
+        # Values new to the sketch may have occurred up to `threshold` times before
+        merged = (
+            pl.concat([
+                self.counters.with_columns(pl.lit(0, dtype=pl.Int64).alias("chunk_count")),
+                chunk.select(
+                    pl.col("value"),
+                    pl.lit(None, dtype=pl.Int64).alias("count"),
+                    pl.lit(None, dtype=pl.Int64).alias("error"),
+                    pl.col("chunk_count"),
+                ),
+            ])
+            .group_by("value")
+            .agg(
+                pl.col("count").max(),
+                pl.col("error").max(),
+                pl.col("chunk_count").sum(),
+            )
+            .select(
+                pl.col("value"),
+                (pl.col("count").fill_null(self.threshold) + pl.col("chunk_count")).alias("count"),
+                pl.col("error").fill_null(self.threshold),
+            )
+            .sort("count", descending=True)
+        )
+
+        dropped = merged.slice(self.capacity)
+        if dropped.height > 0:
+            self.threshold = max(self.threshold, int(dropped["count"].max()))  # type: ignore[arg-type]
+        self.counters = merged.head(self.capacity)
+
+    def top(self, k: Optional[int] = None) -> pl.DataFrame:
+        counters = self.counters.sort(["count", "error"], descending=[True, False])
+        return counters if k is None else counters.head(k)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch, mergeable across chunks
+
+    Uses 2 ** `precision` registers, with a relative standard error of about 1.04 / sqrt(2 ** precision).
+    """
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = pl.DataFrame(schema={"register": pl.UInt64, "rank": pl.Int64})
+
+    def update(self, values: pl.Series):
+        remainder_bits = 64 - self.precision
+        bucket_size = pl.lit(2 ** remainder_bits, dtype=pl.UInt64)
+
+        ranks = (
+            pl.DataFrame({"hash": values.hash(seed=0)})
+            .select(
+                (pl.col("hash") // bucket_size).alias("register"),
+                (pl.col("hash") % bucket_size).alias("remainder"),
+            )
+            .select(
+                pl.col("register"),
+                # One more than the number of leading zeros of the remaining bits
+                pl.when(pl.col("remainder") == 0)
+                .then(pl.lit(remainder_bits + 1))
+                .otherwise(pl.lit(remainder_bits) - pl.col("remainder").cast(pl.Float64).log(2).floor())
+                .cast(pl.Int64)
+                .alias("rank"),
+            )
+        )
+
+        self.registers = (
+            pl.concat([self.registers, ranks])
+            .group_by("register")
+            .agg(pl.col("rank").max())
+        )
+
+    def estimate(self) -> float:
+        registers = 2 ** self.precision
+        alpha = 0.7213 / (1 + 1.079 / registers)
+        empty_registers = registers - self.registers.height
+        harmonic_sum = empty_registers + float(self.registers.select((pl.lit(2.0) ** -pl.col("rank")).sum()).item())
+
+        estimate = alpha * registers * registers / harmonic_sum
+        if estimate <= 2.5 * registers and empty_registers > 0:
+            # Linear counting is more accurate for small cardinalities
+            estimate = registers * math.log(registers / empty_registers)
+        return estimate
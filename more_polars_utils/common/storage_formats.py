@@ -0,0 +1,135 @@
+from abc import ABC, abstractmethod
+from dataclasses import asdict
+from typing import Dict, List, Optional, Union
+
+import polars as pl
+
+from more_polars_utils.common.fingerprint import parquet_fingerprint, frame_fingerprint
+from more_polars_utils.common.io import read_parquet, scan_parquet, write_parquet, read_ipc, scan_ipc, write_ipc, \
+    parquet_file_size, parquet_footer
+from more_polars_utils.common.io.parquet_metadata import parse_parquet_footer
+from more_polars_utils.common.write_options import WriteOptions
+
+
+class StorageFormat(ABC):
+    """
+    How an asset is stored, read and fingerprinted
+
+    Subclasses are registered with `register_storage_format` and selected by name with the
+    `storage_format` argument of `PolarsParquetAsset`.
+    """
+
+    name: str = ""
+    extension: str = ""
+    supports_partitioning: bool = False
+
+    @abstractmethod
+    def read(self, path: str) -> pl.DataFrame:
+        ...
+
+    @abstractmethod
+    def scan(self, path: str) -> pl.LazyFrame:
+        ...
+
+    @abstractmethod
+    def write(self, df: Union[pl.DataFrame, pl.LazyFrame], path: str, partition_by: Optional[List[str]] = None,
+              options: Optional[WriteOptions] = None):
+        ...
+
+    @abstractmethod
+    def fingerprint(self, path: str) -> str:
+        ...
+
+    def size(self, path: str) -> int:
+        return parquet_file_size(path, file_extension=self.extension)
+
+    def describe_file(self, path: str) -> dict:
+        """
+        The row count and row group statistics of one data file, for the asset catalog
+        """
+
+        return {"num_rows": self.scan(path).select(pl.len()).collect().item(), "row_groups": []}
+
+
+class ParquetFormat(StorageFormat):
+    name = "parquet"
+    extension = "parquet"
+    supports_partitioning = True
+
+    def read(self, path: str) -> pl.DataFrame:
+        return read_parquet(path)
+
+    def scan(self, path: str) -> pl.LazyFrame:
+        return scan_parquet(path)
+
+    def write(self, df: Union[pl.DataFrame, pl.LazyFrame], path: str, partition_by: Optional[List[str]] = None,
+              options: Optional[WriteOptions] = None):
+        kwargs = options.parquet_kwargs() if options is not None else {}
+        write_parquet(df, path, partition_by=partition_by, **kwargs)
+
+    def fingerprint(self, path: str) -> str:
+        return parquet_fingerprint(path)
+
+    def describe_file(self, path: str) -> dict:
+        metadata = parse_parquet_footer(parquet_footer(path))
+        return {
+            "num_rows": metadata.num_rows,
+            "row_groups": [
+                {
+                    "num_rows": row_group.num_rows,
+                    "size_bytes": row_group.size_bytes,
+                    "columns": {name: asdict(statistics) for name, statistics in row_group.columns.items()},
+                }
+                for row_group in metadata.row_groups
+            ],
+        }
+
+
+class IpcFormat(StorageFormat):
+    """
+    Uncompressed Arrow IPC (Feather v2) files
+
+    Local files are memory-mapped on read, so repeated reads of an intermediate skip decompression
+    and decoding entirely. Files are larger than parquet and have no statistics for predicate
+    pushdown, so this suits short-lived local intermediates such as temporary assets.
+    """
+
+    name = "ipc"
+    extension = "arrow"
+
+    def read(self, path: str) -> pl.DataFrame:
+        return read_ipc(path)
+
+    def scan(self, path: str) -> pl.LazyFrame:
+        return scan_ipc(path)
+
+    def write(self, df: Union[pl.DataFrame, pl.LazyFrame], path: str, partition_by: Optional[List[str]] = None,
+              options: Optional[WriteOptions] = None):
+        # Codec options are ignored, compressed IPC files cannot be memory-mapped
+        assert (not partition_by)
+        write_ipc(df, path)
+
+    def fingerprint(self, path: str) -> str:
+        # The IPC footer only describes buffer layouts, and sizes and modification times collide for
+        # rewrites within the same second, so the values are hashed. Local files are memory-mapped.
+        return frame_fingerprint(self.read(path))
+
+
+STORAGE_FORMATS: Dict[str, StorageFormat] = {}
+
+
+def register_storage_format(storage_format: StorageFormat, *aliases: str):
+    for name in (storage_format.name, *aliases):
+        STORAGE_FORMATS[name] = storage_format
+
+
+def get_storage_format(storage_format: Union[str, StorageFormat]) -> StorageFormat:
+    if isinstance(storage_format, StorageFormat):
+        return storage_format
+    if storage_format not in STORAGE_FORMATS:
+        raise ValueError(f"Unknown storage format {storage_format!r}, expected one of {sorted(STORAGE_FORMATS)}")
+    return STORAGE_FORMATS[storage_format]
+
+
+register_storage_format(ParquetFormat())
+register_storage_format(IpcFormat(), "feather", "arrow")
@@ -0,0 +1,45 @@
+from dataclasses import dataclass, asdict
+from typing import List, Optional, Union
+
+import polars as pl
+
+
+@dataclass(frozen=True)
+class WriteOptions:
+    """
+    How an asset's data is laid out when written
+
+    Sorting by the columns that queries filter on clusters similar values into the same row
+    groups, so their min/max statistics are tight and filtered scans skip most row groups.
+    Smaller row groups prune more finely, at the cost of larger footers and less compression.
+
+    :param compression: The parquet codec, one of "uncompressed", "snappy", "gzip", "lz4", "zstd" or "brotli"
+    :param compression_level: The codec level, defaults to the codec's default
+    :param row_group_size: The maximum number of rows in each row group
+    :param statistics: Write min/max and null count statistics for each row group
+    :param sort_by: Columns to sort by before writing
+    """
+
+    compression: str = "zstd"
+    compression_level: Optional[int] = None
+    row_group_size: Optional[int] = None
+    statistics: bool = True
+    sort_by: Optional[List[str]] = None
+
+    def parquet_kwargs(self) -> dict:
+        return {
+            "compression": self.compression,
+            "compression_level": self.compression_level,
+            "row_group_size": self.row_group_size,
+            "statistics": self.statistics,
+        }
+
+    def prepare(self, df: Union[pl.DataFrame, pl.LazyFrame]) -> Union[pl.DataFrame, pl.LazyFrame]:
+        if self.sort_by:
+            return df.sort(self.sort_by)
+        return df
+
+    def to_dict(self) -> dict:
+        options = asdict(self)
+        options["sort_by"] = list(self.sort_by) if self.sort_by else None
+        return options
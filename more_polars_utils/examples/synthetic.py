@@ -0,0 +1,115 @@
+import os
+from datetime import date
+from typing import Iterator, Optional
+
+import polars as pl
+
+# At scale factor 1 there are 1,000,000 orders placed by 100,000 customers
+ORDERS_PER_SCALE_FACTOR = 1_000_000
+CUSTOMERS_PER_SCALE_FACTOR = 100_000
+ORDER_DAYS = 3 * 365
+
+_FIRST_ORDER_DATE = date(2021, 1, 1)
+_UINT64_RANGE = float(2 ** 64)
+
+
+def _uniform(index: pl.Expr, seed: int) -> pl.Expr:
+    # A deterministic pseudo-random number in [0, 1) for every row index
+    return index.hash(seed=seed).cast(pl.Float64) / _UINT64_RANGE
+
+
+def customer_count(scale_factor: float) -> int:
+    return max(int(CUSTOMERS_PER_SCALE_FACTOR * scale_factor), 1)
+
+
+def order_count(scale_factor: float) -> int:
+    return max(int(ORDERS_PER_SCALE_FACTOR * scale_factor), 1)
+
+
+def generate_customers(scale_factor: float = 1.0) -> pl.DataFrame:
+    """
+    Generate customers with the schema of `more_polars_utils.examples.small.customers_df`
+
+    :param scale_factor: 100,000 customers per unit of scale factor
+    :return: The customers dataframe
+    """
+
+    return (
+        pl.LazyFrame()
+        .select(pl.int_range(1, customer_count(scale_factor) + 1, dtype=pl.Int64).alias("customer_id"))
+        .with_columns(
+            pl.format("customer_{}", pl.col("customer_id")).alias("customer_name")
+        )
+        .collect()
+    )
+
+
+def generate_orders(scale_factor: float = 1.0, offset: int = 0, length: Optional[int] = None, seed: int = 0) -> pl.DataFrame:
+    """
+    Generate a slice of orders with the schema of `more_polars_utils.examples.small.orders_df`
+
+    Every column is derived from a hash of the order id, so any slice can be generated independently
+    and the same scale factor and seed always produce the same data. Customer ids are skewed, so a
+    few customers place many orders, which exercises frequency counts and joins realistically.
+
+    :param scale_factor: 1,000,000 orders per unit of scale factor
+    :param offset: The index of the first order of the slice
+    :param length: The number of orders in the slice, defaults to the rest of the orders
+    :param seed: Seed of the pseudo-random columns
+    :return: The orders dataframe
+    """
+
+    total_orders = order_count(scale_factor)
+    length = total_orders - offset if length is None else min(length, total_orders - offset)
+    customers = customer_count(scale_factor)
+    order_id = pl.col("order_id")
+
+    return (
+        pl.LazyFrame()
+        .select(pl.int_range(offset + 1, offset + length + 1, dtype=pl.Int64).alias("order_id"))
+        .with_columns(
+            ((_uniform(order_id, seed) ** 2) * customers).cast(pl.Int64).add(1).alias("customer_id"),
+            (
+                pl.lit(_FIRST_ORDER_DATE)
+                + pl.duration(days=(_uniform(order_id, seed + 1) * ORDER_DAYS).cast(pl.Int64))
+            ).dt.strftime("%Y-%m-%d").alias("order_date"),
+            ((_uniform(order_id, seed + 2) * 100_000).floor() / 100).alias("total"),
+        )
+        .collect()
+    )
+
+
+def iter_order_chunks(scale_factor: float = 1.0, rows_per_chunk: int = 10_000_000,
+                      seed: int = 0) -> Iterator[pl.DataFrame]:
+    """
+    Generate the orders of a scale factor in chunks, so that billions of rows never need to fit in memory
+    """
+
+    for offset in range(0, order_count(scale_factor), rows_per_chunk):
+        yield generate_orders(scale_factor, offset=offset, length=rows_per_chunk, seed=seed)
+
+
+def write_orders_dataset(path: str, scale_factor: float = 1.0, rows_per_chunk: int = 10_000_000,
+                         seed: int = 0) -> str:
+    """
+    Write the orders of a scale factor as a local dataset, hive-partitioned by `order_month`
+
+    :param path: The dataset directory
+    :param scale_factor: 1,000,000 orders per unit of scale factor
+    :param rows_per_chunk: The number of orders generated and written at a time
+    :param seed: Seed of the pseudo-random columns
+    :return: The dataset directory
+    """
+
+    for chunk_index, orders in enumerate(iter_order_chunks(scale_factor, rows_per_chunk, seed)):
+        partitions = orders.with_columns(
+            pl.col("order_date").str.slice(0, 7).alias("order_month")
+        ).partition_by(["order_month"], as_dict=True, include_key=False)
+
+        for key, partition in partitions.items():
+            month = key[0] if isinstance(key, tuple) else key
+            directory = f"{path}/order_month={month}"
+            os.makedirs(directory, exist_ok=True)
+            partition.write_parquet(f"{directory}/part-{chunk_index:05d}.parquet")
+
+    return path
@@ -0,0 +1,88 @@
+import tempfile
+import time
+import unittest
+
+import polars as pl
+
+from more_polars_utils.common.asset_build import topological_order, critical_path, run_graph
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset, ACTIVE_PROJECT, ProjectConfiguration, \
+    ASSET_MANAGER
+
+
+class AssetBuildTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_project_dir = tempfile.TemporaryDirectory()
+        self.temporary_scratch_dir = tempfile.TemporaryDirectory()
+
+        ACTIVE_PROJECT.set_configuration(
+            ProjectConfiguration(
+                project_name="test_project",
+                asset_path=self.temporary_project_dir.name,
+                scratch_path=self.temporary_scratch_dir.name,
+            )
+        )
+
+    def tearDown(self):
+        self.temporary_project_dir.cleanup()
+        self.temporary_scratch_dir.cleanup()
+
+    def test_topological_order(self):
+        graph = {"c": ["a", "b"], "b": ["a"], "a": []}
+        self.assertEqual(["a", "b", "c"], topological_order(graph))
+
+        with self.assertRaises(ValueError):
+            topological_order({"a": ["b"], "b": ["a"]})
+
+    def test_critical_path(self):
+        graph = {"a": [], "b": ["a"], "c": ["a"], "d": ["b", "c"]}
+        durations = {"a": 1.0, "b": 5.0, "c": 2.0, "d": 1.0}
+        self.assertEqual(["a", "b", "d"], critical_path(graph, durations))
+
+    def test_run_graph_concurrently(self):
+        graph = {"a": [], "b": [], "c": ["a", "b"]}
+        finished = []
+
+        def run(node):
+            time.sleep(0.2)
+            finished.append(node)
+
+        report = run_graph(graph, run, max_workers=2)
+
+        self.assertEqual("c", finished[-1])
+        self.assertLess(report.wall_seconds, 0.55)
+        self.assertEqual(2, len(report.critical_path))
+
+    def test_run_graph_memory_budget(self):
+        graph = {"a": [], "b": []}
+        active = []
+        peak = []
+
+        def run(node):
+            active.append(node)
+            peak.append(len(active))
+            time.sleep(0.05)
+            active.remove(node)
+
+        run_graph(graph, run, max_workers=2, costs={"a": 10, "b": 10}, budget=15)
+
+        self.assertEqual(1, max(peak))
+
+    def test_asset_manager_build(self):
+        @PolarsParquetAsset.decorator()
+        def build_source() -> pl.DataFrame:
+            return pl.DataFrame({"a": [1, 2, 3]})
+
+        @PolarsParquetAsset.decorator(dependency_assets=["build_source"])
+        def build_total() -> pl.DataFrame:
+            return build_source().select(pl.col("a").sum())
+
+        report = ASSET_MANAGER.build([build_total], max_workers=2)
+
+        self.assertEqual(["build_source", "build_total"], report.order)
+        self.assertEqual(["build_source", "build_total"], report.critical_path)
+        self.assertEqual(6, build_total().item())
+
+
+if __name__ == '__main__':
+    unittest.main()
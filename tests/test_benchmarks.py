@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from more_polars_utils.benchmarks import BenchmarkResult, run_benchmarks, save_baseline, load_baseline, compare_to_baseline
+from more_polars_utils.common.dataframe_assets import ASSET_MANAGER
+from more_polars_utils.common.io import read_parquet
+from more_polars_utils.examples.small import orders_df, customers_df
+from more_polars_utils.examples.synthetic import generate_orders, generate_customers, write_orders_dataset
+
+
+class SyntheticDataTestCase(unittest.TestCase):
+
+    def test_schema_matches_small_examples(self):
+        self.assertEqual(generate_orders(0.001).schema, orders_df.schema)
+        self.assertEqual(generate_customers(0.001).schema, customers_df.schema)
+
+    def test_scale_factor(self):
+        orders = generate_orders(0.01)
+        self.assertEqual(orders.height, 10_000)
+        self.assertEqual(generate_customers(0.01).height, 1_000)
+        self.assertTrue(orders["order_id"].is_unique().all())
+        self.assertTrue(orders["customer_id"].is_between(1, 1_000).all())
+
+    def test_slices_are_deterministic(self):
+        orders = generate_orders(0.01)
+        assert_frame_equal(generate_orders(0.01, offset=500, length=100), orders.slice(500, 100))
+        self.assertFalse(generate_orders(0.01, seed=1).equals(orders))
+
+    def test_write_orders_dataset(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_orders_dataset(f"{directory}/orders", 0.01, rows_per_chunk=3_000)
+
+            self.assertTrue(all(name.startswith("order_month=") for name in os.listdir(path)))
+            dataset = read_parquet(path).drop("order_month").sort("order_id")
+            assert_frame_equal(dataset, generate_orders(0.01))
+
+
+class BenchmarkTestCase(unittest.TestCase):
+
+    def test_run_and_compare(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results = run_benchmarks(directory, 0.001, names=["frequency_count", "asset_cache_hit"], repeat=1)
+            self.assertEqual([result.name for result in results], ["frequency_count", "asset_cache_hit"])
+            self.assertNotIn("benchmark_orders", ASSET_MANAGER.assets)
+
+            save_baseline(results, f"{directory}/baseline.json", 0.001)
+            baseline = load_baseline(f"{directory}/baseline.json")
+            self.assertEqual(baseline["scale_factor"], 0.001)
+
+        slower = [BenchmarkResult(result.name, 1, 1e6, 1e6, 1e6) for result in results]
+        comparison = compare_to_baseline(slower, baseline)
+        self.assertTrue(comparison["regression"].all())
+        self.assertFalse(compare_to_baseline(results, baseline)["regression"].any())
+        self.assertEqual(comparison.schema["ratio"], pl.Float64)
@@ -0,0 +1,222 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import polars as pl
+
+import more_polars_utils.common.build_lock as build_lock
+import more_polars_utils.common.io.s3 as io_s3
+from more_polars_utils.common.build_lock import BuildLock
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset, ACTIVE_PROJECT, ASSET_MANAGER, \
+    ProjectConfiguration
+from test_io_s3 import LocalS3FileSystem
+
+
+class BuildLockTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.path = f"{self.temporary_dir.name}/orders.parquet.lock"
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    def test_exclusive(self):
+        first = BuildLock(self.path)
+        second = BuildLock(self.path)
+
+        self.assertTrue(first.try_acquire())
+        self.assertFalse(second.try_acquire())
+
+        first.release()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(second.try_acquire())
+
+    def _write_foreign_lease(self, owner: str, expires_at: datetime) -> str:
+        os.makedirs(self.path, exist_ok=True)
+        lease_path = f"{self.path}/{owner}.json"
+        with open(lease_path, "w") as f:
+            json.dump({"owner": owner, "expires_at": expires_at.isoformat()}, f)
+        return lease_path
+
+    def test_expired_lease_is_taken_over(self):
+        crashed = self._write_foreign_lease("crashed", datetime.now(timezone.utc) - timedelta(seconds=1))
+
+        lock = BuildLock(self.path)
+
+        self.assertTrue(lock.try_acquire())
+        self.assertFalse(os.path.exists(crashed))
+        self.assertEqual([f"{lock.owner}.json"], os.listdir(self.path))
+
+    def test_contender_backs_off_from_a_live_lease(self):
+        self._write_foreign_lease("other", datetime.now(timezone.utc) + timedelta(seconds=60))
+
+        lock = BuildLock(self.path)
+
+        self.assertFalse(lock.try_acquire())
+        self.assertEqual(["other.json"], os.listdir(self.path))
+
+    def test_unreadable_lease_expires_by_age(self):
+        os.makedirs(self.path)
+        with open(f"{self.path}/writing.json", "w") as f:
+            f.write("{")
+
+        self.assertFalse(BuildLock(self.path).try_acquire())
+        self.assertTrue(BuildLock(self.path, lease_seconds=-1).try_acquire())
+
+    def test_lease_is_renewed_while_held(self):
+        with BuildLock(self.path, lease_seconds=0.3):
+            time.sleep(0.6)
+            self.assertFalse(BuildLock(self.path).try_acquire())
+
+    def test_stalled_holder_gives_up_a_lease_taken_over(self):
+        lock = BuildLock(self.path, lease_seconds=0.3)
+        with mock.patch.object(BuildLock, "_renew"):
+            lock.acquire()
+        time.sleep(0.4)
+
+        taker = BuildLock(self.path)
+        self.assertTrue(taker.try_acquire())
+
+        # The stalled holder renews late, sees the new lease and removes its own
+        with mock.patch.object(lock._stop_renewing, "wait", side_effect=[False, True]):
+            lock._renew()
+
+        self.assertTrue(lock.lost)
+        self.assertEqual([f"{taker.owner}.json"], os.listdir(self.path))
+        lock.release()
+        self.assertEqual([f"{taker.owner}.json"], os.listdir(self.path))
+
+    def test_holder_keeps_the_lease_while_contenders_check(self):
+        lock = BuildLock(self.path, lease_seconds=60)
+        with mock.patch.object(BuildLock, "_renew"):
+            lock.acquire()
+
+        # A contender's lease is listed while it checks whether the lease is held
+        contender = self._write_foreign_lease("contender", datetime.now(timezone.utc) + timedelta(seconds=60))
+        with mock.patch.object(lock._stop_renewing, "wait", side_effect=[False, True]):
+            lock._renew()
+
+        self.assertFalse(lock.lost)
+        self.assertEqual(sorted([f"{lock.owner}.json", "contender.json"]), sorted(os.listdir(self.path)))
+        os.remove(contender)
+        lock.release()
+
+    def test_s3_leases(self):
+        filesystem = LocalS3FileSystem()
+        with mock.patch.object(io_s3, "S3_FILESYSTEM", filesystem):
+            io_s3.invalidate_metadata()
+            first = BuildLock("s3://bucket/orders.parquet.lock")
+            second = BuildLock("s3://bucket/orders.parquet.lock")
+
+            self.assertTrue(first.try_acquire())
+            self.assertFalse(second.try_acquire())
+            first.release()
+            self.assertTrue(second.try_acquire())
+            second.release()
+            self.assertEqual([], filesystem.find("s3://bucket/orders.parquet.lock"))
+            io_s3.invalidate_metadata()
+
+
+class SingleFlightTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_project_dir = tempfile.TemporaryDirectory()
+        self.temporary_scratch_dir = tempfile.TemporaryDirectory()
+
+        ACTIVE_PROJECT.set_configuration(
+            ProjectConfiguration(
+                project_name="test_project",
+                asset_path=self.temporary_project_dir.name,
+                scratch_path=self.temporary_scratch_dir.name,
+            )
+        )
+        self.patcher = mock.patch.object(build_lock, "POLL_SECONDS", 0.01)
+        self.patcher.start()
+        ASSET_MANAGER.instrumentation.clear()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.temporary_project_dir.cleanup()
+        self.temporary_scratch_dir.cleanup()
+
+    def _call_concurrently(self, asset: PolarsParquetAsset, count: int = 4) -> list:
+        results: list = [None] * count
+
+        def call(index: int):
+            results[index] = asset()
+
+        threads = [threading.Thread(target=call, args=(index,)) for index in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_one_build_for_concurrent_callers(self):
+        calls = []
+
+        def slow_orders() -> pl.DataFrame:
+            calls.append(1)
+            time.sleep(0.2)
+            return pl.DataFrame({"id": [1, 2, 3]})
+
+        asset = PolarsParquetAsset(slow_orders, asset_name="slow_orders", use_memory_cache=False)
+
+        results = self._call_concurrently(asset)
+
+        self.assertEqual(1, len(calls))
+        self.assertTrue(all(result["id"].to_list() == [1, 2, 3] for result in results))
+        self.assertFalse(os.path.exists(f"{asset.data_path()}.lock"))
+
+        records = [record for record in ASSET_MANAGER.instrumentation.records if record.asset_name == "slow_orders"]
+        self.assertEqual(1, sum(not record.cache_hit for record in records))
+        self.assertGreater(max(record.lock_wait_seconds for record in records), 0.1)
+
+    def test_contended_force_reload(self):
+        def reloaded_orders() -> pl.DataFrame:
+            return pl.DataFrame({"id": [1, 2, 3]})
+
+        asset = PolarsParquetAsset(reloaded_orders, asset_name="reloaded_orders", use_memory_cache=False,
+                                   force_reload=True)
+        errors = []
+
+        def call_repeatedly():
+            for _ in range(40):
+                try:
+                    asset()
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=call_repeatedly) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+        self.assertFalse(os.path.exists(f"{asset.data_path()}.lock"))
+
+    def test_without_single_flight(self):
+        calls = []
+
+        def unlocked_orders() -> pl.DataFrame:
+            calls.append(1)
+            time.sleep(0.2)
+            return pl.DataFrame({"id": [1, 2, 3]})
+
+        asset = PolarsParquetAsset(unlocked_orders, asset_name="unlocked_orders", use_memory_cache=False,
+                                   single_flight=False)
+
+        self._call_concurrently(asset)
+
+        self.assertEqual(4, len(calls))
+
+
+if __name__ == '__main__':
+    unittest.main()
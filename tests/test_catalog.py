@@ -0,0 +1,121 @@
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+import polars as pl
+
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset, ACTIVE_PROJECT, ASSET_MANAGER, \
+    ProjectConfiguration
+from more_polars_utils.common.io import parquet_file_size, parquet_footer
+from more_polars_utils.common.io.parquet_metadata import parse_parquet_footer
+from more_polars_utils.common.write_options import WriteOptions
+
+
+class ParquetMetadataTestCase(unittest.TestCase):
+
+    def test_row_group_statistics(self):
+        df = pl.DataFrame({
+            "id": list(range(6)),
+            "name": ["a", "b", "c", "d", "e", None],
+            "day": [date(2024, 1, day) for day in range(1, 7)],
+            "nested": [{"x": 1.5 * i} for i in range(6)],
+        })
+
+        with tempfile.TemporaryDirectory() as directory:
+            df.write_parquet(f"{directory}/df.parquet", row_group_size=3)
+            metadata = parse_parquet_footer(parquet_footer(f"{directory}/df.parquet"))
+
+        self.assertEqual(6, metadata.num_rows)
+        self.assertEqual(6, sum(row_group.num_rows for row_group in metadata.row_groups))
+
+        last = metadata.row_groups[-1].columns
+        self.assertEqual(5, last["id"].max)
+        self.assertEqual("e", last["name"].max)
+        self.assertEqual(1, last["name"].null_count)
+        self.assertEqual("2024-01-06", last["day"].max)
+        self.assertEqual(7.5, last["nested.x"].max)
+
+
+class AssetCatalogTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sample_df = pl.DataFrame({
+            "day": ["2024-01-01"] * 3 + ["2024-01-02"] * 3,
+            "amount": [1, 2, 3, 40, 50, 60],
+        })
+
+        self.temporary_project_dir = tempfile.TemporaryDirectory()
+        self.temporary_scratch_dir = tempfile.TemporaryDirectory()
+
+        ACTIVE_PROJECT.set_configuration(
+            ProjectConfiguration(
+                project_name="test_project",
+                asset_path=self.temporary_project_dir.name,
+                scratch_path=self.temporary_scratch_dir.name,
+            )
+        )
+        ASSET_MANAGER.assets.clear()
+
+    def tearDown(self):
+        self.temporary_project_dir.cleanup()
+        self.temporary_scratch_dir.cleanup()
+
+    def test_entry_recorded_on_write(self):
+        @PolarsParquetAsset.decorator()
+        def orders() -> pl.DataFrame:
+            return self.sample_df
+
+        orders()
+        entry = orders.catalog_entry()
+
+        self.assertEqual(6, entry.num_rows)
+        self.assertEqual({"day": "String", "amount": "Int64"}, entry.schema)
+        self.assertEqual(parquet_file_size(orders.data_path()), entry.size_bytes)
+        self.assertEqual(1, entry.file_count)
+        self.assertEqual(["orders"], ASSET_MANAGER.catalog()["asset_name"].to_list())
+
+        # Sizes and row counts are answered from the catalog alone
+        with mock.patch.object(orders.storage_format, "size", side_effect=AssertionError):
+            self.assertEqual(entry.size_bytes, orders.cache_size())
+            self.assertEqual(6, orders.num_rows())
+
+    def test_prune_partitions_and_row_groups(self):
+        @PolarsParquetAsset.decorator(partition_by=["day"], write_options=WriteOptions(row_group_size=3))
+        def partitioned_orders() -> pl.DataFrame:
+            return self.sample_df
+
+        partitioned_orders()
+        entry = partitioned_orders.catalog_entry()
+        root = partitioned_orders.committed_path()
+
+        self.assertEqual([f"{root}/day=2024-01-02/part-00000.parquet"], entry.prune("day", "2024-01-02", "2024-01-02"))
+        self.assertEqual([f"{root}/day=2024-01-01/part-00000.parquet"], entry.prune("amount", max_value=10))
+        self.assertEqual(2, len(entry.prune("amount")))
+        self.assertEqual({"1", "3", "40", "60"}, set(entry.row_groups()["min"]) | set(entry.row_groups()["max"]))
+
+    def test_stale_entry_is_ignored(self):
+        @PolarsParquetAsset.decorator()
+        def orders() -> pl.DataFrame:
+            return self.sample_df
+
+        orders()
+        self.sample_df.head(1).write_parquet(orders.data_path())
+        orders._write_manifest({}, "rewritten")
+
+        self.assertIsNone(orders.catalog_entry())
+        self.assertEqual(1, orders.num_rows())
+
+    def test_ipc_entry(self):
+        @PolarsParquetAsset.decorator(storage_format="ipc", is_temporary=True)
+        def orders_ipc() -> pl.DataFrame:
+            return self.sample_df
+
+        orders_ipc()
+
+        self.assertEqual(6, orders_ipc.catalog_entry().num_rows)
+        self.assertEqual("ipc", orders_ipc.catalog_entry().storage_format)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import os
 import tempfile
 import unittest
+from unittest import mock
+
 import polars as pl
 
 from polars.testing import assert_frame_equal
@@ -125,3 +127,182 @@ class PolarsParquetAssetTestCase(unittest.TestCase):
         # Since new_dataframe_1 was created before new_dataframe_2,
         # new_dataframe_1's timestamp should be less than new_dataframe_2's timestamp
         self.assertLess(new_dataframe_1.last_modified(), new_dataframe_2.last_modified())
+
+    def test_manifest_skips_rebuild_when_touched(self):
+        calls = []
+
+        @PolarsParquetAsset.decorator()
+        def new_dataframe() -> pl.DataFrame:
+            calls.append(1)
+            return self.sample_df
+
+        new_dataframe()
+        self.assertTrue(os.path.exists(new_dataframe.manifest_path()))
+
+        # Touching the cached file should not trigger a rebuild
+        os.utime(new_dataframe.parquet_path())
+        new_dataframe()
+
+        self.assertEqual(1, len(calls))
+
+    def test_manifest_rebuilds_on_changed_arguments(self):
+        @PolarsParquetAsset.decorator()
+        def filtered(df: pl.DataFrame, customer_id: int) -> pl.DataFrame:
+            return df.filter(pl.col("customer_id") == customer_id)
+
+        self.assertEqual(1, filtered(self.sample_df, 1).height)
+        self.assertEqual(2, filtered(self.sample_df, 2).height)
+        self.assertEqual(1, filtered(self.sample_df.head(2), 2).height)
+
+    def test_manifest_rebuilds_on_changed_dependency(self):
+        upstream_df = {"df": self.sample_df}
+        calls = []
+
+        @PolarsParquetAsset.decorator(force_reload=True)
+        def upstream() -> pl.DataFrame:
+            return upstream_df["df"]
+
+        @PolarsParquetAsset.decorator(dependency_assets=["upstream"])
+        def downstream() -> pl.DataFrame:
+            calls.append(1)
+            return upstream().select(pl.col("amount").sum())
+
+        upstream()
+        downstream()
+        downstream()
+        self.assertEqual(1, len(calls))
+
+        upstream_df["df"] = self.sample_df.head(1)
+        upstream()
+        self.assertEqual(100, downstream().item())
+        self.assertEqual(2, len(calls))
+
+    def test_dependency_change_with_same_statistics(self):
+        upstream_df = {"df": pl.DataFrame({"x": [1, 5, 9]})}
+
+        @PolarsParquetAsset.decorator(force_reload=True)
+        def same_size_upstream() -> pl.DataFrame:
+            return upstream_df["df"]
+
+        @PolarsParquetAsset.decorator(dependency_assets=["same_size_upstream"])
+        def same_size_downstream() -> pl.DataFrame:
+            return same_size_upstream().select(pl.col("x").sum())
+
+        same_size_upstream()
+        self.assertEqual(15, same_size_downstream().item())
+
+        # Same size, row count and min/max statistics
+        upstream_df["df"] = pl.DataFrame({"x": [1, 4, 9]})
+        same_size_upstream()
+        self.assertEqual(14, same_size_downstream().item())
+
+    def test_rebuild_on_changed_lazy_frame_argument(self):
+        upstream_df = {"df": pl.DataFrame({"x": [1, 5, 9]})}
+
+        @PolarsParquetAsset.decorator(force_reload=True)
+        def scanned_upstream() -> pl.DataFrame:
+            return upstream_df["df"]
+
+        @PolarsParquetAsset.decorator()
+        def lazy_sum(lf: pl.LazyFrame) -> pl.DataFrame:
+            return lf.select(pl.col("x").sum()).collect()
+
+        self.assertEqual(15, lazy_sum(upstream_df["df"].lazy()).item())
+        self.assertEqual(14, lazy_sum(pl.LazyFrame({"x": [1, 4, 9]})).item())
+
+        self.assertEqual(15, lazy_sum(scanned_upstream.scan()).item())
+        upstream_df["df"] = pl.DataFrame({"x": [1, 4, 9]})
+        self.assertEqual(14, lazy_sum(scanned_upstream.scan()).item())
+
+    def test_failed_write_keeps_previous_asset(self):
+        results = {"lf": self.sample_df.lazy()}
+
+        @PolarsParquetAsset.decorator(force_reload=True)
+        def new_dataframe() -> pl.LazyFrame:
+            return results["lf"]
+
+        new_dataframe()
+
+        # The query fails while being written to the cache
+        results["lf"] = pl.LazyFrame({"amount": ["not a number"]}).select(pl.col("amount").cast(pl.Int64))
+        with self.assertRaises(pl.ComputeError):
+            new_dataframe()
+
+        assert_frame_equal(pl.read_parquet(new_dataframe.parquet_path()), self.sample_df)
+        self.assertEqual(["_catalog", "new_dataframe.parquet", "new_dataframe.parquet.manifest.json"],
+                         sorted(os.listdir(self.temporary_project_dir.name)))
+
+    def test_interrupted_publish_forces_rebuild(self):
+        calls = []
+
+        @PolarsParquetAsset.decorator()
+        def new_dataframe() -> pl.DataFrame:
+            calls.append(1)
+            return self.sample_df
+
+        # Crash after the data is published, but before the manifest is completed
+        with mock.patch("more_polars_utils.common.dataframe_assets.write_catalog_entry", side_effect=OSError):
+            with self.assertRaises(OSError):
+                new_dataframe()
+        self.assertIsNone(new_dataframe.fingerprint())
+
+        assert_frame_equal(new_dataframe(), self.sample_df)
+        self.assertEqual(2, len(calls))
+
+    def test_empty_partitioned_asset(self):
+        @PolarsParquetAsset.decorator(partition_by=["customer_id"])
+        def no_orders() -> pl.DataFrame:
+            return self.sample_df.head(0)
+
+        self.assertEqual(0, no_orders().height)
+        self.assertEqual(set(self.sample_df.columns), set(no_orders.scan().collect().columns))
+
+    def test_partitioned_builds_are_versioned(self):
+        results = {"df": self.sample_df}
+
+        @PolarsParquetAsset.decorator(partition_by=["customer_id"], force_reload=True)
+        def partitioned_orders() -> pl.DataFrame:
+            return results["df"]
+
+        partitioned_orders()
+        first_version = partitioned_orders.committed_path()
+
+        # A reader that resolved the first version keeps reading it while the next build is published
+        results["df"] = self.sample_df.head(1)
+        self.assertEqual(1, partitioned_orders().height)
+        self.assertEqual(3, pl.read_parquet(f"{first_version}/**/*.parquet").height)
+
+        # A failed build is discarded, and older versions are removed once no reader can have resolved them
+        results["df"] = pl.LazyFrame({"amount": ["not a number"]}).select(pl.col("amount").cast(pl.Int64))
+        with self.assertRaises(pl.ComputeError):
+            partitioned_orders()
+        results["df"] = self.sample_df.tail(2)
+        self.assertEqual(2, partitioned_orders().height)
+
+        versions = os.listdir(partitioned_orders.data_path())
+        self.assertEqual(2, len(versions))
+        self.assertNotIn(os.path.basename(first_version), versions)
+        self.assertEqual(2, partitioned_orders.scan().collect().height)
+
+    def test_lazy_asset(self):
+        @PolarsParquetAsset.decorator(lazy=True)
+        def new_dataframe() -> pl.DataFrame:
+            return self.sample_df
+
+        new_lf = new_dataframe()
+
+        self.assertIsInstance(new_lf, pl.LazyFrame)
+        assert_frame_equal(new_lf.collect(), self.sample_df)
+
+    def test_scan_asset(self):
+        # A materialize function may return a LazyFrame, which is streamed to the cache
+        @PolarsParquetAsset.decorator()
+        def new_dataframe() -> pl.LazyFrame:
+            return self.sample_df.lazy().filter(pl.col("customer_id") == 2)
+
+        filtered_df = new_dataframe.scan().select("order_id").collect()
+
+        assert_frame_equal(filtered_df, pl.DataFrame({"order_id": ["b", "c"]}))
+
+        expected_path = f"{self.temporary_project_dir.name}/new_dataframe.parquet"
+        self.assertTrue(os.path.exists(expected_path))
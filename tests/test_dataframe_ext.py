@@ -1,9 +1,11 @@
+import contextlib
+import io
 import unittest
 
 import polars as pl
 
 import more_polars_utils.examples.small as more_examples
-from more_polars_utils.common.dataframe_ext import print_count, check_unique
+from more_polars_utils.common.dataframe_ext import print_count, check_unique, frequency_count, approximate_n_unique
 
 
 class DataFrameTestCase(unittest.TestCase):
@@ -27,6 +29,58 @@ class DataFrameTestCase(unittest.TestCase):
         ])
         self.assertTrue(expected_df.frame_equal(customer_order_frequency))
 
+    def test_approximate_frequency_count(self):
+        # A skewed column: value i appears 1000 // i times
+        df = pl.DataFrame({"value": [i for i in range(1, 2001) for _ in range(1000 // i)]})
+
+        exact_df = frequency_count(df, "value", top_k=5)
+        approximate_df = frequency_count(df, "value", approximate=True, top_k=5, chunk_size=500)
+
+        self.assertEqual(["value", "count", "frequency", "count_error"], approximate_df.columns)
+        self.assertEqual(exact_df["value"].to_list(), approximate_df["value"].to_list())
+        for exact, estimate, error in zip(exact_df["count"], approximate_df["count"], approximate_df["count_error"]):
+            self.assertLessEqual(estimate - error, exact)
+            self.assertLessEqual(exact, estimate)
+
+    def test_approximate_frequency_count_of_several_columns(self):
+        df = pl.DataFrame({"a": [1, 2], "b": [3, 4]})
+
+        with self.assertRaisesRegex(ValueError, "selects \\['a', 'b'\\]"):
+            frequency_count(df, pl.col("a", "b"), approximate=True)
+
+    def test_approximate_n_unique(self):
+        df = pl.DataFrame({"value": list(range(50_000)) * 2})
+
+        self.assertAlmostEqual(50_000, approximate_n_unique(df, "value", chunk_size=10_000), delta=50_000 * 0.05)
+
+    def test_lazy_methods(self):
+        orders_lf = more_examples.orders_df.lazy()
+
+        self.assertTrue(orders_lf.more.check_unique("order_id").collect().item())
+        self.assertFalse(orders_lf.more_check_unique("customer_id").collect().item())
+
+        frequency_lf = orders_lf.more.frequency_count("customer_id")
+        self.assertIsInstance(frequency_lf, pl.LazyFrame)
+        self.assertEqual(
+            frequency_count(more_examples.orders_df, "customer_id").to_dicts(),
+            frequency_lf.collect().to_dicts(),
+        )
+
+    def test_lazy_print_count(self):
+        output = io.StringIO()
+        lf = (
+            more_examples.orders_df.lazy()
+            .more_print_count("orders")
+            .filter(pl.col("customer_id") == 1)
+            .more.print_count("customer_1_orders")
+        )
+        self.assertEqual("", output.getvalue())
+
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(3, lf.collect().height)
+
+        self.assertEqual("orders: 6\ncustomer_1_orders: 3\n", output.getvalue())
+
     def test_print_count(self):
         orders_df = more_examples.orders_df
         orders_df = print_count(orders_df, "orders_df rows count")
@@ -0,0 +1,64 @@
+import tempfile
+import unittest
+
+import polars as pl
+
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset, ACTIVE_PROJECT, ProjectConfiguration
+from more_polars_utils.common.dataset_checks import frequency_count_dataset, check_unique_dataset
+from more_polars_utils.common.dataframe_ext import frequency_count
+
+
+class DatasetChecksTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.path = f"{self.temporary_dir.name}/facts.parquet"
+        self.df = pl.DataFrame({
+            "id": list(range(10_000)),
+            "group": [i % 7 for i in range(10_000)],
+        })
+        self.df.write_parquet(self.path)
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    def test_frequency_count_dataset(self):
+        self.assertEqual(
+            frequency_count(self.df, "group").sort("group").to_dicts(),
+            frequency_count_dataset(self.path, "group").sort("group").to_dicts(),
+        )
+        self.assertEqual(2, frequency_count_dataset(self.path, "group", top_k=2).height)
+
+    def test_check_unique_dataset(self):
+        self.assertTrue(check_unique_dataset(self.path, "id"))
+
+        result = check_unique_dataset(self.path, "group", sample_size=3)
+        self.assertFalse(result)
+        self.assertEqual(3, result.duplicates.height)
+
+    def test_check_unique_dataset_late_duplicate(self):
+        pl.concat([self.df, self.df.tail(1)]).write_parquet(self.path)
+
+        result = check_unique_dataset(self.path, ["id"], probe_rows=100)
+
+        self.assertFalse(result.is_unique)
+        self.assertEqual([{"id": 9_999, "count": 2}], result.duplicates.to_dicts())
+
+    def test_check_unique_asset(self):
+        ACTIVE_PROJECT.set_configuration(
+            ProjectConfiguration(
+                project_name="test_project",
+                asset_path=self.temporary_dir.name,
+                scratch_path=self.temporary_dir.name,
+            )
+        )
+
+        @PolarsParquetAsset.decorator()
+        def facts() -> pl.DataFrame:
+            return self.df
+
+        self.assertTrue(check_unique_dataset(facts, ["id", "group"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import polars as pl
+
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset, ACTIVE_PROJECT, ASSET_MANAGER, \
+    ProjectConfiguration
+from more_polars_utils.common.deferred import Deferred
+
+
+class DeferredInputsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_project_dir = tempfile.TemporaryDirectory()
+        self.temporary_scratch_dir = tempfile.TemporaryDirectory()
+
+        ACTIVE_PROJECT.set_configuration(
+            ProjectConfiguration(
+                project_name="test_project",
+                asset_path=self.temporary_project_dir.name,
+                scratch_path=self.temporary_scratch_dir.name,
+            )
+        )
+        self.orders_df = pl.DataFrame({"order_id": [1, 2, 3], "customer_id": [1, 1, 2]})
+
+        @PolarsParquetAsset.decorator(asset_name="deferred_orders", use_memory_cache=False)
+        def orders() -> pl.DataFrame:
+            return self.orders_df
+
+        self.orders = orders
+
+    def tearDown(self):
+        self.temporary_project_dir.cleanup()
+        self.temporary_scratch_dir.cleanup()
+
+    def test_asset_argument_is_not_loaded_on_a_cache_hit(self):
+        @PolarsParquetAsset.decorator(asset_name="deferred_counts")
+        def counts(orders: pl.DataFrame) -> pl.DataFrame:
+            return orders.group_by("customer_id").len().sort("customer_id")
+
+        self.assertEqual([2, 1], counts(self.orders)["len"].to_list())
+
+        with mock.patch.object(self.orders, "_load_from_cache", wraps=self.orders._load_from_cache) as load:
+            self.assertEqual([2, 1], counts(self.orders)["len"].to_list())
+            load.assert_not_called()
+
+        # Arguments are fingerprinted with the call, they are not dependencies of the asset itself
+        self.assertEqual([], counts.resolved_dependencies())
+
+    def test_argument_dependencies_do_not_leak_between_calls(self):
+        @PolarsParquetAsset.decorator(asset_name="deferred_other_orders", use_memory_cache=False)
+        def other_orders() -> pl.DataFrame:
+            return self.orders_df.head(1)
+
+        calls = []
+
+        def define_count():
+            @PolarsParquetAsset.decorator(asset_name="deferred_count")
+            def count(orders: pl.DataFrame) -> pl.DataFrame:
+                calls.append(1)
+                return orders.select(pl.len())
+            return count
+
+        count = define_count()
+        count(self.orders)
+        count(other_orders)
+
+        # A new process calling with the same argument finds the cached result
+        self.assertEqual(1, define_count()(other_orders).item())
+        self.assertEqual(2, len(calls))
+
+    def test_upstream_change_rebuilds(self):
+        @PolarsParquetAsset.decorator(asset_name="deferred_total")
+        def total(orders: pl.DataFrame) -> pl.DataFrame:
+            return orders.select(pl.len())
+
+        self.assertEqual(3, total(self.orders).item())
+
+        self.orders_df = pl.DataFrame({"order_id": [1], "customer_id": [1]})
+        self.orders.force_reload = True
+        self.orders()
+        self.orders.force_reload = False
+
+        self.assertEqual(1, total(self.orders).item())
+
+    def test_default_arguments(self):
+        orders = self.orders
+
+        @PolarsParquetAsset.decorator(asset_name="deferred_first_order")
+        def first_order(orders: pl.DataFrame = orders) -> pl.DataFrame:
+            return orders.head(1)
+
+        self.assertEqual([orders], first_order.resolved_dependencies())
+
+        report = ASSET_MANAGER.build([first_order])
+
+        self.assertEqual(["deferred_orders", "deferred_first_order"], report.order)
+        self.assertEqual([1], first_order()["order_id"].to_list())
+
+    def test_deferred_function(self):
+        calls = []
+
+        def load_customers() -> pl.DataFrame:
+            calls.append(1)
+            return pl.DataFrame({"customer_id": [1, 2], "name": ["Alice", "Bob"]})
+
+        @PolarsParquetAsset.decorator(asset_name="deferred_named_orders")
+        def named_orders(orders: pl.DataFrame, customers: pl.DataFrame) -> pl.DataFrame:
+            return orders.join(customers, on="customer_id").sort("order_id")
+
+        df = named_orders(self.orders, Deferred(load_customers, fingerprint="customers-v1"))
+        named_orders(self.orders, Deferred(load_customers, fingerprint="customers-v1"))
+
+        self.assertEqual(["Alice", "Alice", "Bob"], df["name"].to_list())
+        self.assertEqual(1, len(calls))
+
+        named_orders(self.orders, Deferred(load_customers, fingerprint="customers-v2"))
+        self.assertEqual(2, len(calls))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import unittest
+
+import polars as pl
+
+from more_polars_utils.common.fingerprint import code_fingerprint, argument_fingerprint, parquet_fingerprint
+
+
+class FingerprintTestCase(unittest.TestCase):
+
+    def test_code_fingerprint(self):
+        def add_one(x):
+            return x + 1
+
+        def add_one_again(y):
+            return y + 1
+
+        def add_two(x):
+            return x + 2
+
+        self.assertEqual(code_fingerprint(add_one), code_fingerprint(add_one_again))
+        self.assertNotEqual(code_fingerprint(add_one), code_fingerprint(add_two))
+
+    def test_argument_fingerprint(self):
+        df = pl.DataFrame({"a": [1, 2, 3]})
+
+        self.assertEqual(argument_fingerprint(df, limit=1), argument_fingerprint(df.clone(), limit=1))
+        self.assertNotEqual(argument_fingerprint(df, limit=1), argument_fingerprint(df, limit=2))
+        self.assertNotEqual(argument_fingerprint(df), argument_fingerprint(df.with_columns(pl.col("a") * 2)))
+        self.assertNotEqual(argument_fingerprint(df), argument_fingerprint(df.reverse()))
+
+    def test_lazy_frame_fingerprint(self):
+        a = pl.DataFrame({"x": [1, 2, 3]})
+        b = pl.DataFrame({"x": [1, 2, 4]})
+
+        self.assertEqual(argument_fingerprint(a.lazy()), argument_fingerprint(a.clone().lazy()))
+        self.assertNotEqual(argument_fingerprint(a.lazy()), argument_fingerprint(b.lazy()))
+        self.assertNotEqual(argument_fingerprint(a.lazy()), argument_fingerprint(a.lazy().filter(pl.col("x") > 1)))
+
+    def test_lazy_frame_fingerprint_of_scanned_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = f"{directory}/df.parquet"
+            pl.DataFrame({"x": [1, 5, 9]}).write_parquet(path)
+            fingerprint = argument_fingerprint(pl.scan_parquet(path))
+            self.assertEqual(fingerprint, argument_fingerprint(pl.scan_parquet(path)))
+
+            pl.DataFrame({"x": [1, 4, 9]}).write_parquet(path)
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+            self.assertNotEqual(fingerprint, argument_fingerprint(pl.scan_parquet(path)))
+
+            # Files of an asset are identified by the output recorded in its manifest
+            with open(f"{path}.manifest.json", "w") as f:
+                json.dump({"output": "first"}, f)
+            fingerprint = argument_fingerprint(pl.scan_parquet(path))
+            with open(f"{path}.manifest.json", "w") as f:
+                json.dump({"output": "second"}, f)
+            self.assertNotEqual(fingerprint, argument_fingerprint(pl.scan_parquet(path)))
+
+    def test_parquet_fingerprint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = f"{directory}/df.parquet"
+
+            pl.DataFrame({"a": [1, 2, 3]}).write_parquet(path)
+            fingerprint = parquet_fingerprint(path)
+            pl.DataFrame({"a": [1, 2, 3]}).write_parquet(path)
+            self.assertEqual(fingerprint, parquet_fingerprint(path))
+
+            pl.DataFrame({"a": [1, 2, 4]}).write_parquet(path)
+            self.assertNotEqual(fingerprint, parquet_fingerprint(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import tempfile
+import unittest
+
+import polars as pl
+
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset, ACTIVE_PROJECT, ProjectConfiguration
+from more_polars_utils.common.incremental_assets import IncrementalParquetAsset
+
+
+class IncrementalParquetAssetTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_project_dir = tempfile.TemporaryDirectory()
+        self.temporary_scratch_dir = tempfile.TemporaryDirectory()
+
+        ACTIVE_PROJECT.set_configuration(
+            ProjectConfiguration(
+                project_name="test_project",
+                asset_path=self.temporary_project_dir.name,
+                scratch_path=self.temporary_scratch_dir.name,
+            )
+        )
+
+        self.events_df = pl.DataFrame({
+            "day": ["2024-01-01", "2024-01-01", "2024-01-02"],
+            "user_id": [1, 2, 1],
+            "amount": [10, 20, 30],
+        })
+
+    def tearDown(self):
+        self.temporary_project_dir.cleanup()
+        self.temporary_scratch_dir.cleanup()
+
+    def test_only_changed_partitions_are_materialized(self):
+        source = {"df": self.events_df}
+        materialized = []
+
+        @PolarsParquetAsset.decorator(partition_by=["day"], force_reload=True)
+        def events() -> pl.DataFrame:
+            return source["df"]
+
+        @IncrementalParquetAsset.decorator(partition_key="day", dependency_assets=["events"])
+        def daily_totals(day: str) -> pl.DataFrame:
+            materialized.append(day)
+            return (
+                events.scan()
+                .filter(pl.col("day").cast(pl.Utf8) == day)
+                .group_by("user_id")
+                .agg(pl.col("amount").sum())
+                .collect()
+            )
+
+        events()
+        totals = daily_totals().sort(["day", "user_id"])
+        self.assertEqual([10, 20, 30], totals["amount"].to_list())
+        self.assertEqual(["2024-01-01", "2024-01-02"], materialized)
+
+        # Nothing changed upstream
+        daily_totals()
+        self.assertEqual(2, len(materialized))
+
+        # A new day arrives, and the existing days are rewritten with identical content
+        source["df"] = pl.concat([self.events_df, pl.DataFrame({"day": ["2024-01-03"], "user_id": [3], "amount": [5]})])
+        events()
+        totals = daily_totals().sort(["day", "user_id"])
+
+        self.assertEqual(["2024-01-01", "2024-01-02", "2024-01-03"], materialized)
+        self.assertEqual([10, 20, 30, 5], totals["amount"].to_list())
+
+        # Removed upstream partitions are removed downstream
+        source["df"] = self.events_df.filter(pl.col("day") == "2024-01-02")
+        events()
+        self.assertEqual([30], daily_totals()["amount"].to_list())
+        self.assertEqual(["day=2024-01-02"], os.listdir(daily_totals.parquet_path()))
+
+    def test_partition_changes_with_same_statistics(self):
+        source = {"df": pl.DataFrame({"day": ["a", "a", "a"], "x": [1, 5, 9]})}
+
+        @PolarsParquetAsset.decorator(partition_by=["day"], force_reload=True)
+        def sampled_events() -> pl.DataFrame:
+            return source["df"]
+
+        @IncrementalParquetAsset.decorator(partition_key="day", dependency_assets=["sampled_events"])
+        def daily_sums(day: str) -> pl.DataFrame:
+            return sampled_events.scan().filter(pl.col("day").cast(pl.Utf8) == day).select(pl.col("x").sum()).collect()
+
+        sampled_events()
+        self.assertEqual([15], daily_sums()["x"].to_list())
+
+        source["df"] = pl.DataFrame({"day": ["a", "a", "a"], "x": [1, 4, 9]})
+        sampled_events()
+        self.assertEqual([14], daily_sums()["x"].to_list())
+
+    def test_full_rebuild_keeps_previous_data_until_published(self):
+        @PolarsParquetAsset.decorator(partition_by=["day"])
+        def rebuilt_events() -> pl.DataFrame:
+            return self.events_df
+
+        observed = []
+
+        @IncrementalParquetAsset.decorator(partition_key="day", dependency_assets=["rebuilt_events"])
+        def daily_counts(day: str, scale: int = 1) -> pl.DataFrame:
+            observed.append(os.listdir(daily_counts.parquet_path()) if os.path.exists(daily_counts.parquet_path()) else [])
+            return rebuilt_events.scan().filter(pl.col("day").cast(pl.Utf8) == day).select(pl.len() * scale).collect()
+
+        rebuilt_events()
+        daily_counts()
+        observed.clear()
+
+        # New arguments rebuild every partition, while readers still see the previous build
+        counts = daily_counts(scale=10).sort("day")
+
+        self.assertEqual([["day=2024-01-01", "day=2024-01-02"]] * 2, [sorted(listing) for listing in observed])
+        self.assertEqual([20, 10], counts["len"].to_list())
+        self.assertEqual(["day=2024-01-01", "day=2024-01-02"], sorted(os.listdir(daily_counts.parquet_path())))
+
+    def test_upstream_without_partitions(self):
+        source = {"df": self.events_df}
+
+        @PolarsParquetAsset.decorator(force_reload=True)
+        def unpartitioned_events() -> pl.DataFrame:
+            return source["df"]
+
+        @IncrementalParquetAsset.decorator(partition_key="day", dependency_assets=["unpartitioned_events"])
+        def empty_totals(day: str) -> pl.DataFrame:
+            return unpartitioned_events.scan().filter(pl.col("day") == day).select(pl.col("amount").sum()).collect()
+
+        unpartitioned_events()
+        empty_totals.refresh()
+
+        self.assertEqual(0, empty_totals().height)
+        self.assertEqual(["day"], empty_totals.scan().collect().columns)
+        self.assertFalse(os.path.exists(empty_totals.parquet_path()))
+        self.assertIsNone(empty_totals.catalog_entry())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+import polars as pl
+
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset, ACTIVE_PROJECT, ProjectConfiguration, \
+    ASSET_MANAGER
+from more_polars_utils.common.instrumentation import AssetInstrumentation
+
+
+class InstrumentationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_project_dir = tempfile.TemporaryDirectory()
+        self.temporary_scratch_dir = tempfile.TemporaryDirectory()
+
+        ACTIVE_PROJECT.set_configuration(
+            ProjectConfiguration(
+                project_name="test_project",
+                asset_path=self.temporary_project_dir.name,
+                scratch_path=self.temporary_scratch_dir.name,
+            )
+        )
+        ASSET_MANAGER.instrumentation.clear()
+
+    def tearDown(self):
+        ASSET_MANAGER.instrumentation.clear()
+        ASSET_MANAGER.instrumentation.hooks = []
+        ASSET_MANAGER.instrumentation.jsonl_path = None
+        self.temporary_project_dir.cleanup()
+        self.temporary_scratch_dir.cleanup()
+
+    def test_metrics(self):
+        @PolarsParquetAsset.decorator()
+        def instrumented() -> pl.DataFrame:
+            return pl.DataFrame({"a": [1, 2, 3]})
+
+        instrumented()
+        instrumented()
+
+        metrics = ASSET_MANAGER.metrics()
+
+        self.assertEqual(["instrumented", "instrumented"], metrics["asset_name"].to_list())
+        self.assertEqual([False, True], metrics["cache_hit"].to_list())
+        self.assertEqual(["missing", None], metrics["reason"].to_list())
+        self.assertEqual([3, 3], metrics["rows"].to_list())
+
+        miss, hit = metrics.to_dicts()
+        self.assertGreater(miss["bytes_written"], 0)
+        self.assertEqual(0, hit["bytes_written"])
+        self.assertEqual(miss["bytes_written"], hit["bytes_read"])
+        self.assertGreater(hit["peak_memory_bytes"], 0)
+
+    def test_bytes_read_come_from_the_manifest(self):
+        @PolarsParquetAsset.decorator()
+        def sized() -> pl.DataFrame:
+            return pl.DataFrame({"a": [1, 2, 3]})
+
+        sized()
+        with mock.patch.object(PolarsParquetAsset, "cache_size") as cache_size:
+            sized()
+
+        cache_size.assert_not_called()
+        miss, hit = ASSET_MANAGER.metrics().to_dicts()
+        self.assertEqual(miss["bytes_written"], hit["bytes_read"])
+
+    def test_hooks_and_jsonl(self):
+        with tempfile.NamedTemporaryFile(suffix=".jsonl") as jsonl_file:
+            records = []
+            ASSET_MANAGER.instrumentation.add_hook(records.append)
+            ASSET_MANAGER.instrumentation.jsonl_path = jsonl_file.name
+
+            @PolarsParquetAsset.decorator()
+            def failing() -> pl.DataFrame:
+                raise ValueError("bad input")
+
+            with self.assertRaises(ValueError):
+                failing()
+
+            self.assertEqual(1, len(records))
+            self.assertEqual("ValueError('bad input')", records[0].error)
+
+            with open(jsonl_file.name) as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual("failing", lines[0]["asset_name"])
+            self.assertFalse(lines[0]["cache_hit"])
+
+    def test_empty_metrics(self):
+        self.assertEqual(0, ASSET_MANAGER.metrics().height)
+
+    def test_records_are_bounded(self):
+        instrumentation = AssetInstrumentation(max_records=2)
+        for asset_name in ["a", "b", "c"]:
+            with instrumentation.track(asset_name):
+                pass
+
+        self.assertEqual(["b", "c"], instrumentation.to_frame()["asset_name"].to_list())
+
+    def test_failing_hook_and_jsonl_only_log(self):
+        def failing_hook(record):
+            raise RuntimeError("hook failed")
+
+        instrumentation = AssetInstrumentation(jsonl_path=f"{self.temporary_scratch_dir.name}/missing/metrics.jsonl")
+        instrumentation.add_hook(failing_hook)
+
+        with self.assertLogs("more_polars_utils.common.instrumentation", level="ERROR") as logs:
+            with self.assertRaises(ValueError):
+                with instrumentation.track("failing"):
+                    raise ValueError("bad input")
+
+        self.assertEqual(2, len(logs.records))
+        self.assertEqual("ValueError('bad input')", instrumentation.records[0].error)
+
+
+if __name__ == '__main__':
+    unittest.main()
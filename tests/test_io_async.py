@@ -0,0 +1,148 @@
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+
+import polars as pl
+from fsspec.asyn import AsyncFileSystem
+
+
+import more_polars_utils.common.io as io
+import more_polars_utils.common.io.s3 as io_s3
+from test_io_s3 import LocalS3FileSystem
+
+
+class AsyncLocalS3FileSystem(AsyncFileSystem):
+    """
+    Async view of a LocalS3FileSystem, standing in for s3fs' coroutine API
+    """
+
+    protocol = ("s3", "s3a")
+    cachable = False
+
+    def __init__(self, filesystem: LocalS3FileSystem, **kwargs):
+        super().__init__(**kwargs)
+        self.filesystem = filesystem
+
+    async def _info(self, path, **kwargs):
+        return self.filesystem.info(path, **kwargs)
+
+    async def _ls(self, path, detail=True, **kwargs):
+        return self.filesystem.ls(path, detail=detail, **kwargs)
+
+    async def _find(self, path, maxdepth=None, withdirs=False, **kwargs):
+        return self.filesystem.find(path, maxdepth=maxdepth, withdirs=withdirs, **kwargs)
+
+    async def _cat_file(self, path, start=None, end=None, **kwargs):
+        return self.filesystem.cat_file(path, start=start, end=end, **kwargs)
+
+    async def _pipe_file(self, path, value, **kwargs):
+        return self.filesystem.pipe_file(path, value, **kwargs)
+
+    async def _put_file(self, lpath, rpath, **kwargs):
+        return self.filesystem.put_file(lpath, rpath, **kwargs)
+
+    async def _rm(self, path, recursive=False, **kwargs):
+        return self.filesystem.rm(path, recursive=recursive, **kwargs)
+
+
+class AsyncS3TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.filesystem = LocalS3FileSystem()
+        self.patcher = mock.patch.object(io_s3, "S3_FILESYSTEM", AsyncLocalS3FileSystem(self.filesystem))
+        self.patcher.start()
+        io_s3.invalidate_metadata()
+
+        self.df = pl.DataFrame({"day": ["a", "a", "b"], "id": [1, 2, 3]})
+
+    def tearDown(self):
+        io_s3.invalidate_metadata()
+        self.patcher.stop()
+
+    def test_round_trip(self):
+        async def round_trip():
+            await io.awrite_parquet(self.df, "s3://bucket/orders.parquet")
+            exists = await io.afile_exists("s3://bucket/orders.parquet")
+            df = await io.aread_parquet("s3://bucket/orders.parquet", columns=["id"], filters=pl.col("day") == "a")
+            size = await io.aparquet_file_size("s3://bucket/orders.parquet")
+            last_modified = await io.afile_last_modified("s3://bucket/orders.parquet")
+            return exists, df, size, last_modified
+
+        exists, df, size, last_modified = asyncio.run(round_trip())
+
+        self.assertTrue(exists)
+        self.assertEqual([1, 2], df["id"].to_list())
+        self.assertEqual(len(self.filesystem.cat("s3://bucket/orders.parquet")), size)
+        self.assertIsNotNone(last_modified)
+
+    def test_partitioned(self):
+        async def partitioned():
+            await io.awrite_parquet(self.df, "s3://bucket/events", partition_by=["day"])
+            files = await io.alist_nested_partitions("s3://bucket/events")
+            return files, await io.aparquet_file_size("s3://bucket/events")
+
+        files, size = asyncio.run(partitioned())
+
+        self.assertEqual(
+            ["s3://bucket/events/day=a/part-00000.parquet", "s3://bucket/events/day=b/part-00000.parquet"],
+            sorted(files),
+        )
+        self.assertEqual(sum(len(self.filesystem.cat(file)) for file in files), size)
+
+    def test_concurrent_checks_share_the_cache(self):
+        for index in range(20):
+            self.filesystem.pipe(f"s3://bucket/assets/{index}.parquet", b"x")
+
+        async def check_all():
+            paths = [f"s3://bucket/assets/{index}.parquet" for index in range(25)]
+            return await asyncio.gather(*(io.afile_exists(path) for path in paths * 2))
+
+        with mock.patch.object(io, "ASYNC_CONCURRENCY", 4):
+            results = asyncio.run(check_all())
+
+        self.assertEqual(([True] * 20 + [False] * 5) * 2, results)
+
+    def test_concurrency_limit(self):
+        in_flight = []
+        peak = []
+
+        async def slow_exists(path):
+            in_flight.append(path)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(path)
+            return True
+
+        async def check_all():
+            return await asyncio.gather(*(io.afile_exists(f"s3://bucket/{index}") for index in range(10)))
+
+        with mock.patch.object(io, "ASYNC_CONCURRENCY", 3), mock.patch.object(io_s3, "afile_exists", slow_exists):
+            asyncio.run(check_all())
+
+        self.assertEqual(3, max(peak))
+
+
+class AsyncLocalTestCase(unittest.TestCase):
+
+    def test_round_trip(self):
+        df = pl.DataFrame({"id": [1, 2, 3]})
+
+        async def round_trip(path):
+            await io.awrite_parquet(df, f"{path}/df.parquet")
+            return (
+                await io.afile_exists(f"{path}/df.parquet"),
+                await io.aread_parquet(f"{path}/df.parquet"),
+                await io.alist_nested_partitions(path),
+            )
+
+        with tempfile.TemporaryDirectory() as path:
+            exists, read_df, files = asyncio.run(round_trip(path))
+
+        self.assertTrue(exists)
+        self.assertEqual(df.to_dicts(), read_df.to_dicts())
+        self.assertEqual([f"{path}/df.parquet"], files)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import types
+import unittest
+from unittest import mock
+
+import polars as pl
+
+import more_polars_utils
+import more_polars_utils.common.io as io
+import more_polars_utils.common.io.backends as backends
+import more_polars_utils.common.io.s3 as io_s3
+from test_io_s3 import LocalS3FileSystem
+
+
+class BackendsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # Restores whatever filesystem was configured before the test
+        self.patcher = mock.patch.object(io_s3, "S3_FILESYSTEM", None)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        io_s3.invalidate_metadata()
+
+    def test_import_does_not_load_remote_backends(self):
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(more_polars_utils.__file__)))
+        code = "import sys, more_polars_utils; print('s3fs' in sys.modules, 'fsspec' in sys.modules)"
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            check=True,
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": package_root},
+        ).stdout
+
+        self.assertEqual("False False", output.strip())
+
+    def test_set_filesystem(self):
+        io.set_filesystem("s3://", LocalS3FileSystem())
+        df = pl.DataFrame({"id": [1, 2, 3]})
+
+        io.write_parquet(df, "s3://bucket/ids.parquet")
+
+        self.assertTrue(io.file_exists("s3://bucket/ids.parquet"))
+        self.assertGreater(io.parquet_file_size("s3://bucket/ids.parquet"), 0)
+
+    def test_set_filesystem_unknown_prefix(self):
+        with self.assertRaises(ValueError):
+            io.set_filesystem("gs://", LocalS3FileSystem())
+
+    def test_register_backend(self):
+        backend = types.ModuleType("fake_backend")
+        backend.file_exists = lambda path: path == "fake://present"  # type: ignore
+        sys.modules["fake_backend"] = backend
+        io.register_backend("fake://", "fake_backend")
+        try:
+            self.assertTrue(io.file_exists("fake://present"))
+            self.assertFalse(io.file_exists("fake://missing"))
+        finally:
+            del backends.BACKENDS["fake://"]
+            backends._LOADED.pop("fake_backend", None)
+            del sys.modules["fake_backend"]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+
+import polars as pl
+
+import more_polars_utils.common.io.local as io_local
+from more_polars_utils.common.io import staged_write
+
+
+class LocalIOTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.path = self.temporary_dir.name
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    def test_partition_sizes(self):
+        for day in ["2024-01-01", "2024-01-02"]:
+            os.makedirs(f"{self.path}/events/day={day}")
+            for part in range(2):
+                pl.DataFrame({"a": [part]}).write_parquet(f"{self.path}/events/day={day}/part-{part}.parquet")
+
+        sizes = io_local.partition_sizes(f"{self.path}/events")
+
+        self.assertEqual(["day=2024-01-01", "day=2024-01-02"], sizes["partition"].to_list())
+        self.assertEqual([2, 2], sizes["file_count"].to_list())
+        self.assertEqual(io_local.parquet_file_size(f"{self.path}/events"), sizes["size_bytes"].sum())
+
+    def test_read_hive_partitioned_with_pushdown(self):
+        for day in ["2024-01-01", "2024-01-02"]:
+            os.makedirs(f"{self.path}/events/day={day}")
+            pl.DataFrame({"id": [1, 2], "value": [day, day]}).write_parquet(f"{self.path}/events/day={day}/part-0.parquet")
+
+        df = io_local.read_parquet(
+            f"{self.path}/events",
+            columns=["id", "day"],
+            filters=pl.col("day") == "2024-01-02",
+        )
+
+        self.assertEqual(["id", "day"], df.columns)
+        self.assertEqual(["2024-01-02", "2024-01-02"], df["day"].to_list())
+
+    def test_read_with_eager_reader_arguments(self):
+        path = f"{self.path}/df.parquet"
+        pl.DataFrame({"id": [1, 2, 3], "name": ["a", "b", "c"]}).write_parquet(path)
+
+        self.assertEqual(3, io_local.read_parquet(path, memory_map=True).height)
+        self.assertEqual(3, io_local.read_parquet(path, use_pyarrow=False).height)
+        df = io_local.read_parquet(path, columns=["name"], filters=pl.col("id") > 1, memory_map=False)
+        self.assertEqual(["b", "c"], df["name"].to_list())
+
+    def test_write_partitioned(self):
+        df = pl.DataFrame({"day": ["a", "a", "a", "b"], "id": [1, 2, 3, 4]})
+        path = f"{self.path}/events"
+
+        io_local.write_parquet(df, path, partition_by=["day"], max_rows_per_file=2)
+
+        self.assertEqual(
+            [f"{path}/day=a/part-00000.parquet", f"{path}/day=a/part-00001.parquet", f"{path}/day=b/part-00000.parquet"],
+            sorted(io_local.list_nested_partitions(path)),
+        )
+        self.assertEqual(df.sort("id").to_dicts(), io_local.read_parquet(path).select(["day", "id"]).sort("id").to_dicts())
+
+        # Rewriting the dataset replaces the previous partitions
+        io_local.write_parquet(df.filter(pl.col("day") == "b"), path, partition_by=["day"])
+        self.assertEqual([f"{path}/day=b/part-00000.parquet"], io_local.list_nested_partitions(path))
+
+    def test_write_partitioned_empty(self):
+        df = pl.DataFrame({"day": [], "id": []}, schema={"day": pl.Utf8, "id": pl.Int64})
+        path = f"{self.path}/events"
+
+        with staged_write(path) as staging_path:
+            io_local.write_parquet(df, staging_path, partition_by=["day"])
+
+        self.assertEqual([f"{path}/part-00000.parquet"], io_local.list_nested_partitions(path))
+        self.assertEqual({"day": pl.Utf8, "id": pl.Int64}, dict(io_local.read_parquet(path).schema))
+
+    def test_staged_write_publishes_on_success(self):
+        path = f"{self.path}/df.parquet"
+        pl.DataFrame({"a": [1]}).write_parquet(path)
+
+        with staged_write(path) as staging_path:
+            io_local.write_parquet(pl.DataFrame({"a": [2], "b": ["x"]}), staging_path, partition_by=["b"])
+            self.assertEqual([1], pl.read_parquet(path)["a"].to_list())
+
+        self.assertEqual([2], io_local.read_parquet(path)["a"].to_list())
+        self.assertEqual(["df.parquet"], os.listdir(self.path))
+
+    def test_staged_write_discards_on_failure(self):
+        path = f"{self.path}/df.parquet"
+        pl.DataFrame({"a": [1]}).write_parquet(path)
+
+        with self.assertRaises(RuntimeError):
+            with staged_write(path) as staging_path:
+                pl.DataFrame({"a": [2]}).write_parquet(staging_path)
+                raise RuntimeError("crashed mid-build")
+
+        self.assertEqual([1], pl.read_parquet(path)["a"].to_list())
+        self.assertEqual(["df.parquet"], os.listdir(self.path))
+
+    def test_ipc_round_trip(self):
+        df = pl.DataFrame({"id": [1, 2, 3], "name": ["a", "b", "c"]})
+
+        io_local.write_ipc(df, f"{self.path}/df.arrow")
+        io_local.write_ipc(df.lazy(), f"{self.path}/lazy.arrow")
+
+        self.assertEqual(df.to_dicts(), io_local.read_ipc(f"{self.path}/df.arrow").to_dicts())
+        self.assertEqual(df.to_dicts(), io_local.read_ipc(f"{self.path}/lazy.arrow").to_dicts())
+        self.assertEqual(["id"], io_local.scan_ipc(f"{self.path}/df.arrow").select("id").collect().columns)
+
+    def test_write_queries_that_cannot_be_streamed(self):
+        lf = pl.LazyFrame({"k": [1, 1, 2], "x": [1, 2, 3]})
+        queries = {
+            "cum_sum": (lf.with_columns(pl.col("x").cum_sum()), [1, 3, 6]),
+            "over": (lf.with_columns(pl.col("x").sum().over("k")), [3, 3, 3]),
+            "unique": (lf.unique(maintain_order=True), [1, 2, 3]),
+        }
+
+        for name, (query, expected) in queries.items():
+            io_local.write_parquet(query, f"{self.path}/{name}.parquet")
+            io_local.write_ipc(query, f"{self.path}/{name}.arrow")
+
+            self.assertEqual(expected, pl.read_parquet(f"{self.path}/{name}.parquet")["x"].to_list())
+            self.assertEqual(expected, io_local.read_ipc(f"{self.path}/{name}.arrow")["x"].to_list())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,225 @@
+import unittest
+from io import BytesIO
+from unittest import mock
+
+import polars as pl
+import s3fs  # type: ignore
+from fsspec.implementations.memory import MemoryFileSystem
+
+import more_polars_utils.common.io.s3 as io_s3
+
+
+class LocalS3FileSystem(MemoryFileSystem):
+    """
+    In-memory stand-in for s3fs that understands s3:// paths and counts metadata requests
+    """
+
+    protocol = ("s3", "s3a")
+    root_marker = ""
+    cachable = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.store = {}
+        self.pseudo_dirs = [""]
+        self.info_calls = 0
+        self.info_paths = []
+        self.find_calls = 0
+
+    @classmethod
+    def _strip_protocol(cls, path):
+        for protocol in ("s3://", "s3a://"):
+            if path.startswith(protocol):
+                path = path[len(protocol):]
+        return path.rstrip("/")
+
+    def info(self, path, **kwargs):
+        self.info_calls += 1
+        self.info_paths.append(path)
+        info = super().info(path, **kwargs)
+        if "created" in info:
+            info["LastModified"] = info["created"]
+        return info
+
+    def find(self, path, *args, **kwargs):
+        self.find_calls += 1
+        return super().find(path, *args, **kwargs)
+
+    def pipe_file(self, path, value, **kwargs):
+        # s3fs 2024.9.0 has no `mode`, and sends any other keyword argument on to put_object, which rejects it
+        if kwargs:
+            raise TypeError(f"Unsupported pipe_file arguments: {sorted(kwargs)}")
+        return super().pipe_file(path, value)
+
+
+class S3MetadataCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.filesystem = LocalS3FileSystem()
+        self.patcher = mock.patch.object(io_s3, "S3_FILESYSTEM", self.filesystem)
+        self.patcher.start()
+        io_s3.invalidate_metadata()
+
+        self.filesystem.pipe("s3://bucket/assets/a.parquet", b"a")
+        self.filesystem.pipe("s3://bucket/assets/b.parquet", b"bb")
+        # Older MemoryFileSystem versions look up the parent directories when writing
+        self.filesystem.info_calls = 0
+        self.filesystem.info_paths = []
+
+    def tearDown(self):
+        io_s3.invalidate_metadata()
+        self.patcher.stop()
+
+    def test_repeated_checks_are_cached(self):
+        self.assertTrue(io_s3.file_exists("s3://bucket/assets/a.parquet"))
+        self.assertTrue(io_s3.file_exists("s3://bucket/assets/a.parquet"))
+        self.assertFalse(io_s3.file_exists("s3://bucket/assets/c.parquet"))
+        self.assertFalse(io_s3.file_exists("s3://bucket/assets/c.parquet"))
+
+        self.assertEqual(2, self.filesystem.info_calls)
+
+    def test_prefetch_answers_checks_from_one_listing(self):
+        io_s3.prefetch_metadata("s3://bucket/assets")
+        info_calls = self.filesystem.info_calls
+
+        self.assertTrue(io_s3.file_exists("s3://bucket/assets/a.parquet"))
+        self.assertTrue(io_s3.file_exists("s3://bucket/assets/b.parquet"))
+        self.assertFalse(io_s3.file_exists("s3://bucket/assets/c.parquet"))
+        self.assertEqual(1, io_s3.parquet_file_size("s3://bucket/assets/a.parquet"))
+
+        self.assertEqual(1, self.filesystem.find_calls)
+        self.assertEqual(info_calls, self.filesystem.info_calls)
+
+    def test_writes_invalidate(self):
+        self.assertFalse(io_s3.file_exists("s3://bucket/assets/c.txt"))
+        io_s3.write_text("c", "s3://bucket/assets/c.txt")
+        self.assertTrue(io_s3.file_exists("s3://bucket/assets/c.txt"))
+
+    def test_ttl_expiry(self):
+        with mock.patch.object(io_s3, "METADATA_CACHE_TTL_SECONDS", 0.0):
+            io_s3.file_exists("s3://bucket/assets/a.parquet")
+            io_s3.file_exists("s3://bucket/assets/a.parquet")
+
+        self.assertEqual(2, self.filesystem.info_calls)
+
+
+class S3ListingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.filesystem = LocalS3FileSystem()
+        self.patcher = mock.patch.object(io_s3, "S3_FILESYSTEM", self.filesystem)
+        self.patcher.start()
+        io_s3.invalidate_metadata()
+
+        for day in ["2024-01-01", "2024-01-02"]:
+            for part in range(3):
+                self.filesystem.pipe(f"s3://bucket/events/day={day}/part-{part}.parquet", b"x" * (part + 1))
+        self.filesystem.pipe("s3://bucket/events/_SUCCESS", b"")
+
+    def tearDown(self):
+        io_s3.invalidate_metadata()
+        self.patcher.stop()
+
+    def test_list_nested_partitions(self):
+        partitions = io_s3.list_nested_partitions("s3://bucket/events")
+
+        self.assertEqual(6, len(partitions))
+        self.assertIn("s3://bucket/events/day=2024-01-02/part-2.parquet", partitions)
+
+    def test_parquet_file_size_without_per_object_requests(self):
+        self.assertEqual(12, io_s3.parquet_file_size("s3://bucket/events"))
+
+        # Object sizes come from the listing rather than a request per object
+        self.assertEqual([], [path for path in self.filesystem.info_paths if path.endswith(".parquet")])
+
+    def test_partition_sizes(self):
+        sizes = io_s3.partition_sizes("s3://bucket/events")
+
+        self.assertEqual(["day=2024-01-01", "day=2024-01-02"], sizes["partition"].to_list())
+        self.assertEqual([3, 3], sizes["file_count"].to_list())
+        self.assertEqual([6, 6], sizes["size_bytes"].to_list())
+
+    def test_write_partitioned(self):
+        df = pl.DataFrame({"day": ["a", "a", "a", "b"], "id": [1, 2, 3, 4]})
+
+        io_s3.write_parquet(df, "s3://bucket/exports", partition_by=["day"], max_rows_per_file=2)
+
+        self.assertEqual(
+            [
+                "s3://bucket/exports/day=a/part-00000.parquet",
+                "s3://bucket/exports/day=a/part-00001.parquet",
+                "s3://bucket/exports/day=b/part-00000.parquet",
+            ],
+            sorted(io_s3.list_nested_partitions("s3://bucket/exports")),
+        )
+        part = pl.read_parquet(BytesIO(self.filesystem.cat("s3://bucket/exports/day=a/part-00001.parquet")))
+        self.assertEqual([3], part["id"].to_list())
+
+    def test_objects_are_uploaded_from_local_files(self):
+        df = pl.DataFrame({"id": [1, 2, 3]})
+
+        # Objects are not encoded into an in-memory buffer first
+        with mock.patch.object(self.filesystem, "pipe_file", side_effect=AssertionError("buffered upload")):
+            io_s3.write_parquet(df, "s3://bucket/exports/df.parquet")
+            io_s3.write_ipc(df, "s3://bucket/exports/df.arrow")
+            io_s3.write_ipc(df.lazy(), "s3://bucket/exports/lazy.arrow")
+
+        self.assertEqual([1, 2, 3], pl.read_parquet(BytesIO(self.filesystem.cat("s3://bucket/exports/df.parquet")))["id"].to_list())
+        self.assertEqual(df.to_dicts(), io_s3.read_ipc("s3://bucket/exports/lazy.arrow").to_dicts())
+
+    def test_write_query_that_cannot_be_streamed(self):
+        lf = pl.LazyFrame({"k": [1, 1, 2], "x": [1, 2, 3]}).with_columns(pl.col("x").cum_sum())
+
+        io_s3.write_parquet(lf, "s3://bucket/exports/cum_sum.parquet")
+
+        part = pl.read_parquet(BytesIO(self.filesystem.cat("s3://bucket/exports/cum_sum.parquet")))
+        self.assertEqual([1, 3, 6], part["x"].to_list())
+
+    def test_replace_prefix(self):
+        self.filesystem.pipe("s3://bucket/events/day=2024-01-01/part-9.parquet", b"stale")
+        io_s3.replace("s3://bucket/events/day=2024-01-02", "s3://bucket/events/day=2024-01-01")
+
+        self.assertEqual(
+            [f"s3://bucket/events/day=2024-01-01/part-{part}.parquet" for part in range(3)],
+            sorted(io_s3.list_nested_partitions("s3://bucket/events")),
+        )
+        self.assertEqual(b"xxx", self.filesystem.cat("s3://bucket/events/day=2024-01-01/part-2.parquet"))
+
+    def test_replace_object(self):
+        io_s3.replace("s3://bucket/events/_SUCCESS", "s3://bucket/events/day=2024-01-01/part-0.parquet")
+
+        self.assertFalse(io_s3.file_exists("s3://bucket/events/_SUCCESS"))
+        self.assertEqual(b"", self.filesystem.cat("s3://bucket/events/day=2024-01-01/part-0.parquet"))
+
+    def test_ipc_round_trip(self):
+        df = pl.DataFrame({"id": [1, 2, 3], "name": ["a", "b", "c"]})
+
+        io_s3.write_ipc(df, "s3://bucket/scratch/df.arrow")
+
+        self.assertTrue(io_s3.file_exists("s3://bucket/scratch/df.arrow"))
+        self.assertEqual(df.to_dicts(), io_s3.read_ipc("s3://bucket/scratch/df.arrow").to_dicts())
+        self.assertEqual(["name"], io_s3.read_ipc("s3://bucket/scratch/df.arrow", columns=["name"]).columns)
+
+
+class S3StorageOptionsTestCase(unittest.TestCase):
+
+    def test_storage_options_follow_filesystem(self):
+        filesystem = s3fs.S3FileSystem(
+            key="key", secret="secret", endpoint_url="http://localhost:9000",
+            client_kwargs={"region_name": "eu-west-1"}, skip_instance_cache=True,
+        )
+
+        with mock.patch.object(io_s3, "S3_FILESYSTEM", filesystem):
+            self.assertEqual(
+                {
+                    "aws_access_key_id": "key",
+                    "aws_secret_access_key": "secret",
+                    "aws_region": "eu-west-1",
+                    "aws_endpoint_url": "http://localhost:9000",
+                },
+                io_s3.storage_options(),
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
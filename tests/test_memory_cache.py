@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset, ACTIVE_PROJECT, ProjectConfiguration
+from more_polars_utils.common.memory_cache import MemoryCache, MEMORY_CACHE
+from more_polars_utils.common.write_options import WriteOptions
+
+
+class MemoryCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_project_dir = tempfile.TemporaryDirectory()
+        self.temporary_scratch_dir = tempfile.TemporaryDirectory()
+
+        ACTIVE_PROJECT.set_configuration(
+            ProjectConfiguration(
+                project_name="test_project",
+                asset_path=self.temporary_project_dir.name,
+                scratch_path=self.temporary_scratch_dir.name,
+            )
+        )
+
+    def tearDown(self):
+        MEMORY_CACHE.max_bytes = 0
+        MEMORY_CACHE.clear()
+        self.temporary_project_dir.cleanup()
+        self.temporary_scratch_dir.cleanup()
+
+    def test_lru_eviction(self):
+        df = pl.DataFrame({"a": list(range(100))})
+        cache = MemoryCache(max_bytes=2 * df.estimated_size())
+
+        cache.put("a", df)
+        cache.put("b", df)
+        self.assertIsNotNone(cache.get("a"))
+
+        # "b" is now the least recently used entry
+        cache.put("c", df)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual({"entries": 2, "size_bytes": 2 * df.estimated_size(), "max_bytes": 2 * df.estimated_size(),
+                          "hits": 3, "misses": 1, "evictions": 1}, cache.stats())
+
+    def test_oversized_frame_is_not_cached(self):
+        cache = MemoryCache(max_bytes=1)
+        cache.put("a", pl.DataFrame({"a": [1, 2, 3]}))
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(0, cache.size_bytes)
+
+    def test_asset_write_through(self):
+        MEMORY_CACHE.max_bytes = 1024 * 1024
+        sample_df = pl.DataFrame({"a": [1, 2, 3]})
+
+        @PolarsParquetAsset.decorator()
+        def cached_dataframe() -> pl.DataFrame:
+            return sample_df
+
+        # The fresh build is served from memory
+        self.assertIs(sample_df, cached_dataframe())
+        self.assertIs(sample_df, cached_dataframe())
+        self.assertEqual(2, MEMORY_CACHE.hits)
+
+        # After the memory tier is cleared, the asset is read from parquet once then cached again
+        MEMORY_CACHE.clear()
+        assert_frame_equal(sample_df, cached_dataframe())
+        cached_dataframe()
+        self.assertEqual(3, MEMORY_CACHE.hits)
+
+    def test_write_through_caches_the_written_frame(self):
+        MEMORY_CACHE.max_bytes = 1024 * 1024
+
+        @PolarsParquetAsset.decorator(write_options=WriteOptions(sort_by=["a"]))
+        def sorted_dataframe() -> pl.DataFrame:
+            return pl.DataFrame({"a": [3, 1, 2]})
+
+        fresh_df = sorted_dataframe()
+        MEMORY_CACHE.clear()
+
+        assert_frame_equal(sorted_dataframe(), fresh_df)
+        self.assertEqual([1, 2, 3], fresh_df["a"].to_list())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset, ACTIVE_PROJECT, ProjectConfiguration
+from more_polars_utils.common.process_pool import PROCESS_POOL
+
+
+@PolarsParquetAsset.decorator(use_process_pool=True)
+def parsed_codes(raw: pl.DataFrame, offset: int = 0) -> pl.DataFrame:
+    return raw.with_columns(
+        pl.col("code").map_elements(lambda code: int(code.split("-")[1]) + offset, return_dtype=pl.Int64).alias("number"),
+        pl.lit(os.getpid()).alias("pid"),
+    )
+
+
+@PolarsParquetAsset.decorator(use_process_pool=True)
+def lazy_totals(raw: pl.LazyFrame) -> pl.LazyFrame:
+    return raw.group_by("code").agg(pl.len().alias("count")).sort("code")
+
+
+class SquaredAsset(PolarsParquetAsset):
+
+    def materialize(self, numbers: pl.DataFrame) -> pl.DataFrame:
+        return numbers.with_columns((pl.col("n") ** 2).alias("squared"))
+
+
+class ProcessPoolTestCase(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        PROCESS_POOL.shutdown()
+
+    def setUp(self):
+        self.temporary_project_dir = tempfile.TemporaryDirectory()
+        self.temporary_scratch_dir = tempfile.TemporaryDirectory()
+
+        ACTIVE_PROJECT.set_configuration(
+            ProjectConfiguration(
+                project_name="test_project",
+                asset_path=self.temporary_project_dir.name,
+                scratch_path=self.temporary_scratch_dir.name,
+            )
+        )
+        self.raw = pl.DataFrame({"code": ["a-1", "b-2", "a-3"]})
+
+    def tearDown(self):
+        self.temporary_project_dir.cleanup()
+        self.temporary_scratch_dir.cleanup()
+
+    def test_materialize_in_worker(self):
+        df = parsed_codes(self.raw, offset=10)
+
+        self.assertEqual([11, 12, 13], df["number"].to_list())
+        self.assertNotEqual(os.getpid(), df["pid"][0])
+        # The exchanged files are removed once the result is read back
+        self.assertEqual([], os.listdir(f"{self.temporary_scratch_dir.name}/_exchange"))
+
+        # Cache hits do not use the pool
+        assert_frame_equal(df, parsed_codes(self.raw, offset=10))
+
+    def test_lazy_frames(self):
+        df = lazy_totals(self.raw.lazy())
+
+        self.assertEqual({"code": ["a-1", "a-3", "b-2"], "count": [1, 1, 1]}, df.to_dict(as_series=False))
+
+    def test_pool_is_reused(self):
+        first = parsed_codes(self.raw, offset=1)
+        executor = PROCESS_POOL.executor()
+        second = parsed_codes(self.raw, offset=2)
+
+        self.assertIs(executor, PROCESS_POOL.executor())
+        self.assertEqual([2, 3, 4], first["number"].to_list())
+        self.assertEqual([3, 4, 5], second["number"].to_list())
+
+    def test_subclassed_asset(self):
+        asset = SquaredAsset(asset_name="squared", use_process_pool=True)
+
+        df = asset(pl.DataFrame({"n": [1, 2, 3]}))
+
+        self.assertEqual([1, 4, 9], df["squared"].to_list())
+
+    def test_worker_errors_are_raised(self):
+        with self.assertRaises(pl.exceptions.ColumnNotFoundError):
+            parsed_codes(pl.DataFrame({"other": ["a-1"]}))
+
+
+if __name__ == '__main__':
+    unittest.main()
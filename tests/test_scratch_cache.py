@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+import polars as pl
+
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset, ACTIVE_PROJECT, ASSET_MANAGER, \
+    ProjectConfiguration
+from more_polars_utils.common.scratch_cache import SCRATCH_CACHE
+
+
+class ScratchCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_project_dir = tempfile.TemporaryDirectory()
+        self.temporary_scratch_dir = tempfile.TemporaryDirectory()
+
+        ACTIVE_PROJECT.set_configuration(
+            ProjectConfiguration(
+                project_name="test_project",
+                asset_path=self.temporary_project_dir.name,
+                scratch_path=self.temporary_scratch_dir.name,
+            )
+        )
+        self.df = pl.DataFrame({"a": list(range(1000))})
+        self.assets = [
+            PolarsParquetAsset(lambda: self.df, asset_name=f"scratch_{index}", is_temporary=True, use_memory_cache=False)
+            for index in range(3)
+        ]
+
+    def tearDown(self):
+        SCRATCH_CACHE.max_bytes = 0
+        for asset in self.assets:
+            ASSET_MANAGER.assets.pop(asset.asset_name, None)
+        self.temporary_project_dir.cleanup()
+        self.temporary_scratch_dir.cleanup()
+
+    def test_least_recently_used_are_evicted(self):
+        first, second, third = self.assets
+        first()
+        second()
+        size_bytes = first.cache_size()
+
+        # Reading the first asset makes the second the least recently used
+        first()
+        SCRATCH_CACHE.max_bytes = 2 * size_bytes
+        third()
+
+        self.assertTrue(os.path.exists(first.data_path()))
+        self.assertFalse(os.path.exists(second.data_path()))
+        self.assertFalse(os.path.exists(second.manifest_path()))
+        self.assertTrue(os.path.exists(third.data_path()))
+        self.assertIsNone(second.catalog_entry())
+
+        # An evicted asset is rebuilt on its next call
+        self.assertEqual(1000, second().height)
+
+    def test_asset_being_written_is_kept(self):
+        first, _, _ = self.assets
+        SCRATCH_CACHE.max_bytes = 1
+
+        first()
+
+        self.assertTrue(os.path.exists(first.data_path()))
+
+    def test_usage(self):
+        first, second, _ = self.assets
+        first()
+        second()
+        first()
+
+        usage = ASSET_MANAGER.scratch_usage()
+
+        self.assertEqual(["scratch_1", "scratch_0"], usage["asset_name"].to_list())
+        self.assertEqual([True, True], usage["registered"].to_list())
+        self.assertEqual(2 * first.cache_size(), usage["size_bytes"].sum())
+
+    def test_collect_garbage(self):
+        first, second, _ = self.assets
+        first()
+        second()
+        del ASSET_MANAGER.assets[second.asset_name]
+
+        removed = ASSET_MANAGER.collect_garbage()
+
+        self.assertEqual([second.data_path()], removed)
+        self.assertTrue(os.path.exists(first.data_path()))
+        self.assertFalse(os.path.exists(second.data_path()))
+
+    def test_collect_garbage_with_budget(self):
+        first, second, third = self.assets
+        first()
+        second()
+        third()
+
+        removed = ASSET_MANAGER.collect_garbage(max_bytes=first.cache_size())
+
+        self.assertEqual([first.data_path(), second.data_path()], removed)
+        self.assertTrue(os.path.exists(third.data_path()))
+
+
+if __name__ == '__main__':
+    unittest.main()
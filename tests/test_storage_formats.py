@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset, ACTIVE_PROJECT, ProjectConfiguration
+from more_polars_utils.common.storage_formats import IpcFormat, StorageFormat, get_storage_format
+
+
+class StorageFormatTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sample_df = pl.DataFrame({"order_id": ["a", "b", "c"], "amount": [100, 200, 300]})
+
+        self.temporary_project_dir = tempfile.TemporaryDirectory()
+        self.temporary_scratch_dir = tempfile.TemporaryDirectory()
+
+        ACTIVE_PROJECT.set_configuration(
+            ProjectConfiguration(
+                project_name="test_project",
+                asset_path=self.temporary_project_dir.name,
+                scratch_path=self.temporary_scratch_dir.name,
+            )
+        )
+
+    def tearDown(self):
+        self.temporary_project_dir.cleanup()
+        self.temporary_scratch_dir.cleanup()
+
+    def test_ipc_temporary_asset(self):
+        calls = []
+
+        @PolarsParquetAsset.decorator(is_temporary=True, storage_format="ipc")
+        def intermediate() -> pl.DataFrame:
+            calls.append(1)
+            return self.sample_df
+
+        assert_frame_equal(intermediate(), self.sample_df)
+        assert_frame_equal(intermediate(), self.sample_df)
+        assert_frame_equal(intermediate.scan().filter(pl.col("amount") > 100).collect(), self.sample_df.slice(1))
+
+        self.assertEqual(1, len(calls))
+        self.assertTrue(os.path.exists(f"{self.temporary_scratch_dir.name}/intermediate.arrow"))
+        self.assertEqual(os.path.getsize(intermediate.data_path()), intermediate.cache_size())
+
+    def test_ipc_rebuild_invalidates_downstream(self):
+        amounts = [1, 2]
+
+        @PolarsParquetAsset.decorator(is_temporary=True, storage_format="ipc")
+        def upstream() -> pl.DataFrame:
+            return pl.DataFrame({"amount": amounts})
+
+        @PolarsParquetAsset.decorator(dependency_assets=[upstream])
+        def downstream() -> pl.DataFrame:
+            return upstream().select(pl.col("amount").sum())
+
+        self.assertEqual(3, downstream().item())
+
+        amounts.append(3)
+        upstream.force_reload = True
+        upstream()
+        upstream.force_reload = False
+
+        self.assertEqual(6, downstream().item())
+
+    def test_ipc_rewrite_with_same_size(self):
+        amounts = {"values": [1, 2]}
+
+        @PolarsParquetAsset.decorator(is_temporary=True, storage_format="ipc", force_reload=True)
+        def same_size_upstream() -> pl.DataFrame:
+            return pl.DataFrame({"amount": amounts["values"]})
+
+        @PolarsParquetAsset.decorator(dependency_assets=[same_size_upstream])
+        def same_size_downstream() -> pl.DataFrame:
+            return same_size_upstream().select(pl.col("amount").sum())
+
+        same_size_upstream()
+        first = same_size_upstream.storage_format.fingerprint(same_size_upstream.data_path())
+        self.assertEqual(3, same_size_downstream().item())
+
+        # Rewritten within the same second, with the same size
+        modified = os.path.getmtime(same_size_upstream.data_path())
+        amounts["values"] = [3, 4]
+        same_size_upstream()
+        os.utime(same_size_upstream.data_path(), (modified, modified))
+
+        self.assertNotEqual(first, same_size_upstream.storage_format.fingerprint(same_size_upstream.data_path()))
+        self.assertEqual(7, same_size_downstream().item())
+
+    def test_format_lookup(self):
+        self.assertIsInstance(get_storage_format("feather"), IpcFormat)
+        with self.assertRaises(ValueError):
+            get_storage_format("orc")
+        with self.assertRaises(ValueError):
+            PolarsParquetAsset(lambda: self.sample_df, storage_format="ipc", partition_by=["order_id"])
+
+    def test_incomplete_format(self):
+        class ReadOnlyFormat(StorageFormat):
+            def read(self, path: str) -> pl.DataFrame:
+                return pl.read_csv(path)
+
+        with self.assertRaises(TypeError):
+            ReadOnlyFormat()  # type: ignore[abstract]
+
+
+if __name__ == '__main__':
+    unittest.main()
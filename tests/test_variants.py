@@ -0,0 +1,145 @@
+import os
+import tempfile
+import unittest
+
+import polars as pl
+
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset, ACTIVE_PROJECT, ProjectConfiguration
+from more_polars_utils.common.deferred import Deferred
+from more_polars_utils.common.memory_cache import MEMORY_CACHE
+
+
+class VariantsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_project_dir = tempfile.TemporaryDirectory()
+        self.temporary_scratch_dir = tempfile.TemporaryDirectory()
+
+        ACTIVE_PROJECT.set_configuration(
+            ProjectConfiguration(
+                project_name="test_project",
+                asset_path=self.temporary_project_dir.name,
+                scratch_path=self.temporary_scratch_dir.name,
+            )
+        )
+        self.orders_df = pl.DataFrame({"region": ["eu", "eu", "us", "apac"], "total": [1.0, 2.0, 3.0, 4.0]})
+        self.calls = []
+
+        @PolarsParquetAsset.decorator(asset_name="regional_orders", max_variants=2, use_memory_cache=False)
+        def regional_orders(region: str) -> pl.DataFrame:
+            self.calls.append(region)
+            return self.orders_df.filter(pl.col("region") == region)
+
+        self.regional_orders = regional_orders
+
+    def tearDown(self):
+        self.temporary_project_dir.cleanup()
+        self.temporary_scratch_dir.cleanup()
+
+    def test_variants_are_cached_side_by_side(self):
+        self.assertEqual([1.0, 2.0], self.regional_orders("eu")["total"].to_list())
+        self.assertEqual([3.0], self.regional_orders("us")["total"].to_list())
+        self.assertEqual([1.0, 2.0], self.regional_orders("eu")["total"].to_list())
+
+        self.assertEqual(["eu", "us"], self.calls)
+        self.assertFalse(os.path.exists(self.regional_orders.data_path()))
+        self.assertEqual(2, self.regional_orders.variants().height)
+
+        eu = self.regional_orders.variant("eu")
+        self.assertTrue(eu.data_path().startswith(self.regional_orders.variants_path()))
+        self.assertEqual(2, eu.catalog_entry().num_rows)
+        self.assertEqual(1, self.regional_orders.variant("us").catalog_entry().num_rows)
+
+    def test_memory_cache_is_per_variant(self):
+        MEMORY_CACHE.max_bytes = 1024 * 1024
+        self.addCleanup(MEMORY_CACHE.clear)
+        self.addCleanup(setattr, MEMORY_CACHE, "max_bytes", 0)
+
+        @PolarsParquetAsset.decorator(max_variants=4)
+        def sweep(order: str) -> pl.DataFrame:
+            return pl.DataFrame({"x": [1, 2, 3]}).sort("x", descending=order == "desc")
+
+        self.assertEqual([1, 2, 3], sweep("asc")["x"].to_list())
+        self.assertEqual([3, 2, 1], sweep("desc")["x"].to_list())
+        self.assertEqual([1, 2, 3], sweep("asc")["x"].to_list())
+
+        self.assertEqual({sweep.variant("asc").data_path(), sweep.variant("desc").data_path()},
+                         {key[0] for key in MEMORY_CACHE._entries})
+
+    def test_scan(self):
+        self.assertEqual(2, self.regional_orders.scan("eu").select(pl.len()).collect().item())
+
+    def test_variant_cap(self):
+        self.regional_orders("eu")
+        self.regional_orders("us")
+        self.regional_orders("apac")
+
+        self.assertEqual(2, self.regional_orders.variants().height)
+        self.assertFalse(os.path.exists(self.regional_orders.variant("eu").data_path()))
+        self.assertIsNone(self.regional_orders.variant("eu").catalog_entry())
+
+        # The evicted variant is rebuilt on its next call
+        self.regional_orders("eu")
+        self.assertEqual(["eu", "us", "apac", "eu"], self.calls)
+
+    def test_variant_being_built_is_not_evicted(self):
+        self.regional_orders("eu")
+        self.regional_orders("us")
+
+        with self.regional_orders.variant("eu").build_lock():
+            self.regional_orders("apac")
+
+        self.assertTrue(os.path.exists(self.regional_orders.variant("eu").data_path()))
+        self.assertEqual(3, self.regional_orders.variants().height)
+
+        # The next build of a variant catches up
+        self.regional_orders("latam")
+        self.assertEqual(2, self.regional_orders.variants().height)
+
+    def test_variants_do_not_share_call_state(self):
+        eu = self.regional_orders.variant("eu")
+        us = self.regional_orders.variant("us")
+
+        self.assertIsNone(self.regional_orders.variant_key)
+        self.assertNotEqual(eu.variant_key, us.variant_key)
+        self.assertNotEqual(eu.data_path(), us.data_path())
+
+    def test_dataframe_arguments_are_keyed_by_content(self):
+        @PolarsParquetAsset.decorator(asset_name="order_totals", max_variants=4, use_memory_cache=False)
+        def order_totals(orders: pl.DataFrame) -> pl.DataFrame:
+            self.calls.append(orders.height)
+            return orders.select(pl.col("total").sum())
+
+        order_totals(self.orders_df)
+        order_totals(self.orders_df.head(2))
+        order_totals(self.orders_df.clone())
+
+        self.assertEqual([4, 2], self.calls)
+        self.assertEqual(3.0, order_totals(self.orders_df.head(2)).item())
+
+    def test_single_variant_by_default(self):
+        @PolarsParquetAsset.decorator(asset_name="regional_totals", use_memory_cache=False)
+        def regional_totals(region: str) -> pl.DataFrame:
+            self.calls.append(region)
+            return self.orders_df.filter(pl.col("region") == region).select(pl.col("total").sum())
+
+        regional_totals("eu")
+        regional_totals("us")
+        regional_totals("eu")
+
+        self.assertEqual(["eu", "us", "eu"], self.calls)
+        self.assertTrue(os.path.exists(regional_totals.data_path()))
+        self.assertEqual(0, regional_totals.variants().height)
+
+    def test_deferred_variant(self):
+        @PolarsParquetAsset.decorator(asset_name="regional_total")
+        def regional_total(orders: pl.DataFrame) -> pl.DataFrame:
+            return orders.select(pl.col("total").sum())
+
+        self.assertEqual(3.0, regional_total(Deferred(self.regional_orders, "eu")).item())
+        self.assertEqual(3.0, regional_total(Deferred(self.regional_orders, "us")).item())
+        self.assertEqual(["eu", "us"], self.calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
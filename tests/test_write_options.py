@@ -0,0 +1,83 @@
+import tempfile
+import unittest
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from more_polars_utils.benchmarks import benchmark_codecs
+from more_polars_utils.common.dataframe_assets import PolarsParquetAsset, ACTIVE_PROJECT, ASSET_MANAGER, \
+    ProjectConfiguration
+from more_polars_utils.common.write_options import WriteOptions
+
+
+class WriteOptionsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sample_df = pl.DataFrame({
+            "customer_id": [i % 7 for i in range(1_000)],
+            "amount": list(range(1_000)),
+        })
+
+        self.temporary_project_dir = tempfile.TemporaryDirectory()
+        self.temporary_scratch_dir = tempfile.TemporaryDirectory()
+
+        ACTIVE_PROJECT.set_configuration(
+            ProjectConfiguration(
+                project_name="test_project",
+                asset_path=self.temporary_project_dir.name,
+                scratch_path=self.temporary_scratch_dir.name,
+            )
+        )
+        ASSET_MANAGER.instrumentation.clear()
+
+    def tearDown(self):
+        self.temporary_project_dir.cleanup()
+        self.temporary_scratch_dir.cleanup()
+
+    def test_sorted_uncompressed_write(self):
+        @PolarsParquetAsset.decorator(write_options=WriteOptions(compression="uncompressed", sort_by=["customer_id"]))
+        def clustered() -> pl.DataFrame:
+            return self.sample_df
+
+        @PolarsParquetAsset.decorator()
+        def compressed() -> pl.DataFrame:
+            return self.sample_df
+
+        clustered()
+        compressed()
+
+        written = pl.read_parquet(clustered.data_path())
+        self.assertTrue(written["customer_id"].is_sorted())
+        assert_frame_equal(written.sort("amount"), self.sample_df)
+        self.assertGreater(clustered.cache_size(), compressed.cache_size())
+
+    def test_lazy_sorted_write(self):
+        @PolarsParquetAsset.decorator(write_options=WriteOptions(sort_by=["amount"], row_group_size=100))
+        def lazy_clustered() -> pl.LazyFrame:
+            return self.sample_df.lazy().sort("amount", descending=True)
+
+        self.assertEqual(list(range(1_000)), lazy_clustered()["amount"].to_list())
+
+    def test_changed_options_rebuild(self):
+        def build(options):
+            @PolarsParquetAsset.decorator(asset_name="tuned", write_options=options)
+            def tuned() -> pl.DataFrame:
+                return self.sample_df
+            tuned()
+
+        build(None)
+        build(None)
+        build(WriteOptions(compression="snappy"))
+
+        reasons = ASSET_MANAGER.metrics()["reason"].to_list()
+        self.assertEqual(["missing", None, "changed_write_options"], reasons)
+
+    def test_benchmark_codecs(self):
+        results = benchmark_codecs(self.sample_df, codecs=[("uncompressed", None), ("zstd", 3)], repeat=1)
+
+        self.assertEqual(["zstd", "uncompressed"], results["compression"].to_list())
+        self.assertTrue((results["compression_ratio"] > 0).all())
+
+
+if __name__ == '__main__':
+    unittest.main()